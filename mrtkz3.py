@@ -1,11 +1,164 @@
 # -*- coding: utf-8 -*-
 '''МОДУЛЬ РАСЧЕТА ТОКОВ КОРОТКОГО ЗАМЫКАНИЯ (М Р Т К З)
 
-Версия 3.15
+Версия 3.16
 
-г.Саратов 27.01.2021
+г.Саратов 16.10.2026
 
 История изменений
+16.10.2026
+- Формирование СЛАУ в mdl.Calc() переведено на векторные операции numpy:
+  параметры узлов, ветвей, взаимоиндукций и несимметрий собираются в вектора
+  (mdl.getarr()), а координатная версия разреженной матрицы формируется отдельно
+  для каждого класса элементов и для каждой группы несимметрий одного вида
+  (mdl.formslae(), formn()), граничные условия несимметрий заданы шаблонами mnq и mnp;
+  Формируемые LHS и RHS полностью совпадают с ранее формируемыми поэлементно;
+  Устранена ошибка определения номера ветви при формировании уравнений обрывов.
+- Схема замещения сети без несимметрий (ветви, взаимоиндукции, Y узлов) вместе
+  с заземлениями и обрывами нейтрали 'N0' факторизуется в mdl.Calc() однократно
+  и сохраняется (mdl.net, класс Net), прочие КЗ и обрывы учитываются окаймлением
+  сохраненной факторизации (дополнение Шура на переменных несимметрий), что
+  многократно ускоряет пакетные расчеты КЗ с mdl.ClearN() и n.edit();
+  Сохраненная факторизация сбрасывается автоматически при создании узлов, ветвей,
+  взаимоиндукций, при p.edit(), m.edit() и при изменении состава несимметрий 'N0';
+  Расчет полной СЛАУ без сохраненной факторизации - mdl.CalcFull().
+- Добавлен метод mdl.SweepN(listq, listsc) для расчета КЗ всех заданных видов
+  во всех заданных узлах без создания объектов несимметрий: по сохраненной
+  факторизации схемы для каждого узла определяется матрица 3x3 собственного
+  сопротивления в симметричных составляющих, а граничные условия всех видов КЗ
+  решаются одновременно, возвращаются токи КЗ и напряжения в узлах КЗ;
+  КЗ через переходное сопротивление задаются кортежем, например ('A0r', 2.0).
+- Добавлен метод mdl.CalcScenarios(E=E,J=J) для расчета нескольких вариантов
+  Э.Д.С. ветвей и токов источников тока J узлов с использованием одной
+  факторизации матрицы СЛАУ, результат - матрица mdl.X (3*(np+nq+nn),nv);
+  Методы вывода результатов res(), res1(), res2() и q.ParName, p.ParName, n.ParName
+  возвращают результаты по всем вариантам (последний индекс - номер варианта),
+  псевдотабличный вывод выполняется по каждому варианту;
+  Устранено изменение mdl.X при выводе результатов по ветви с B со стороны узла 1.
+- Добавлен метод настройки расчета mdl.Setup(engine=...), при engine='seq'
+  схемы прямой, обратной и нулевой последовательностей без несимметрий (кроме 'N0')
+  факторизуются раздельно (класс SeqLU), при совпадении схем прямой и обратной
+  последовательностей используется одна факторизация, связь схем осуществляется
+  только через несимметрии.
+- Добавлен способ факторизации mdl.Setup(engine='ybus') - токи ветвей исключаются
+  из СЛАУ обращением блочно-диагональной матрицы сопротивлений ветвей и групп
+  взаимоиндукций (BlockInv()), факторизуется матрица узловых проводимостей (класс YbusLU),
+  токи ветвей восстанавливаются после расчета напряжений узлов;
+  При наличии ветвей с нулевым сопротивлением используется факторизация полной СЛАУ.
+- Добавлен реестр решателей СЛАУ msolver ('splu' - SuperLU с сохранением факторизации,
+  'spsolve', 'umfpack' - при установленном scikits.umfpack), выбор решателя и перестановки
+  столбцов SuperLU - mdl.Setup(solver=..., permc_spec=...), по умолчанию решатель
+  выбирается по размерности и количеству ненулевых элементов матрицы (AutoSolver());
+  Сравнение быстродействия решателей на данной модели - mdl.BenchSolvers().
+- Структура (шаблон) разреженной матрицы схемы без несимметрий - CSC indptr, indices,
+  номера элементов data для каждого параметра элементов сети, а также найденная при
+  факторизации SuperLU перестановка строк и столбцов сохраняются в mdl.pattern (класс Pattern);
+  При изменении только параметров элементов (без изменения топологии) матрица формируется
+  записью значений в data, а факторизация выполняется без повторного упорядочивания (PermLU).
+- Редактирование ветвей и взаимоиндукций (p.edit, m.edit) не сбрасывает сохраненную
+  факторизацию, а регистрирует измененные элементы (mdl.dirty), изменения их параметров
+  учитываются в mdl.Calc() низкоранговой поправкой по формуле Шермана-Моррисона-Вудбери
+  (Net.update()), при количестве измененных после факторизации элементов больше
+  mdl.Setup(nupdate=...) (по умолчанию 10) выполняется повторная факторизация;
+  Параметры ветвей и взаимоиндукций собираются отдельно методами mdl.getarrp() и mdl.getarrm();
+  Последние решения по сохраненной факторизации повторно используются (Net.lsolve()).
+- Добавлен режим факторизации схемы замещения сети в одинарной точности
+  mdl.Setup(precision='single') - LU-разложение в complex64 с индексами int32
+  и итерационным уточнением решения по невязке в complex128 (класс RefineLU),
+  что примерно вдвое сокращает память под LU-разложение при сохранении точности;
+  Шаблон структуры матрицы mdl.pattern хранит номера строк и столбцов в int32.
+- Добавлено эквивалентирование сети относительно граничных узлов mdl.Equivalent(listq, listp) -
+  формирование новой модели из сохраняемой части сети (ветви listp) и эквивалента остальной
+  части сети - ветвей от земли к граничным узлам с Э.Д.С. холостого хода и взаимоиндукций
+  между ними по матрице собственных и взаимных сопротивлений относительно граничных узлов;
+  Взаимоиндукции M могут задаваться кортежами (M1, M2, M0) для прямой, обратной
+  и нулевой последовательностей (заданные числом - только нулевой последовательности).
+- Добавлена топологическая обработка схемы mdl.Setup(topo=True) (по умолчанию) - узлы,
+  связанные ветвями с нулевым сопротивлением (выключатели, ШСВ, СВ, в том числе
+  импортированные из АРМ СРЗА), объединяются (система непересекающихся множеств), такие
+  ветви исключаются из факторизуемой СЛАУ (класс TopoLU), их токи восстанавливаются
+  по 1-ому закону Кирхгофа, что уменьшает размерность СЛАУ и устраняет ее вырожденность
+  при параллельных ветвях с нулевым сопротивлением без ввода фиктивного сопротивления.
+- Поиск висящих узлов, ветвей, взаимоиндукций и несимметрий mdl.Test4Singularity()
+  выполняется без рекурсии (ранее - ошибка превышения глубины рекурсии на протяженных
+  радиальных сетях) - методом mdl.Islands(), определяющим связные части (острова) схемы
+  функцией connected_components (scipy) и возвращающим их в виде массивов numpy;
+  Электрически независимые острова схемы замещения сети факторизуются и решаются
+  в mdl.Calc() раздельно и параллельно (класс IslandLU), острова без источников
+  и несимметрий не рассчитываются (в том числе не связанные с землей).
+- Добавлена проверка структурного ранга СЛАУ по шаблону ненулевых элементов
+  (максимальное паросочетание строк и столбцов, maximum_bipartite_matching из scipy),
+  выполняемая перед решением в mdl.Calc(), mdl.CalcScenarios() и mdl.CalcFull()
+  (отключается mdl.Setup(check=False)), при структурной вырожденности (висящие узлы и ветви
+  с источниками, противоречащие друг другу или схеме несимметрии) выдается исключение
+  с перечнем узлов, ветвей и несимметрий, уравнения и переменные которых структурно
+  зависимы (StructRank()); Проверка всей модели без расчета - mdl.Test4Rank().
+- Добавлены методы формирования таблиц результатов расчета по всем (или заданным)
+  узлам, ветвям и несимметриям mdl.TableQ(), mdl.TableP(), mdl.TableN() - структурированные
+  массивы numpy (при df=True - pandas.DataFrame при установленном pandas) со значениями
+  величин в симметричных составляющих, фазных и междуфазных напряжений, токов,
+  сопротивлений и мощностей, вычисляемых векторными операциями над mdl.X за один проход
+  по каждой величине, названия величин совпадают с q.ParName, p.ParName, n.ParName.
+- Атрибуты результатов q.UA, p.q1IA, n.IA и т.п., а также res/res1/res2 с указанием
+  параметра берутся из массивов, вычисляемых один раз на расчет для всех элементов
+  (mdl.getcache); кэш сбрасывается при новом расчете, редактировании и изменении модели,
+  для неизвестных атрибутов выдается AttributeError
+- Добавлен метод mdl.Report(f, listq, listp, listn, side) вывода сводных таблиц
+  результатов расчета по заданным узлам, ветвям и несимметриям на экран, в файл или любой
+  объект с методом write; таблицы формируются векторно для групп элементов (StrUArr(),
+  StrIArr()) и записываются по мере формирования, текст совпадает с выводом q.res(),
+  p.res1(), p.res2(), n.res(), которые теперь выполняются через mdl.Report(); для обрывов
+  выводятся напряжения продольной несимметрии и ток ветви
+- Добавлены методы mdl.Export(fname, fmt, listq, listp, listn) и mdl.ExportSweep(fname,
+  listq, listsc, I120, U120) экспорта результатов расчета (mdl.X, результатов
+  mdl.SweepN()) вместе с параметрами элементов (id, name, q1, q2, вид несимметрии, r) в
+  виде таблиц по столбцам в форматы npz (сжатый архив numpy), csv, а при установленных
+  модулях h5py и pyarrow - hdf5 и parquet; таблицы формируются и записываются по частям из
+  chunk строк, для нескольких вариантов mdl.CalcScenarios() добавляется столбец case
+- Добавлен метод mdl.SweepNStore(path, listq, listsc, keepq, keepp, dtype) расчета КЗ всех
+  заданных видов во всех заданных узлах (аналогично mdl.SweepN()) с сохранением напряжений
+  узлов keepq и токов ветвей keepp каждого расчетного случая в хранилище на диске (класс
+  SweepStore) на основе np.memmap с файлом индекса index.npz (узел, вид КЗ, r для каждого
+  случая), величины могут храниться в complex64; результаты группы узлов записываются в
+  хранилище сразу после расчета отклика схемы, а при анализе считываются с диска по срезам
+- В методы mdl.SweepN() и mdl.SweepNStore() добавлен параметр nproc - расчет КЗ в nproc
+  процессах: матрица схемы, решение без КЗ и массивы результатов передаются процессам
+  через разделяемую память (multiprocessing.shared_memory), каждый процесс один раз
+  факторизует матрицу (NetLU()) и рассчитывает КЗ для получаемых групп узлов, записывая
+  результаты в разделяемые массивы или непосредственно в хранилище SweepStore; модель и ее
+  элементы сериализуются pickle без рекурсивного обхода схемы (ссылки между элементами
+  заменяются номерами), сохраненная факторизация не сериализуется
+- Добавлен метод mdl.CalcContingency(listp, depth, listr, listpar) для расчета текущего
+  состава несимметрий при отключении ветвей (схемы N-1 и N-2) без удаления ветвей из
+  модели: по умолчанию отключаются ветви, подключенные к местам КЗ и обрывов, и ветви,
+  имеющие с ними взаимоиндукцию; каждое отключение учитывается низкоранговой поправкой к
+  сохраненной факторизации (Net.contingency()), части схемы, потерявшие связь с
+  источниками, принимаются отключенными; Возвращаются список расчетных случаев и таблица
+  наибольших и наименьших значений величин по ветвям с защитами, результаты всех случаев -
+  в mdl.X как варианты
+- Добавлен метод mdl.CalcCascade(stages) для расчета каскадного развития аварии -
+  последовательности стадий, каждая из которых добавляет к схеме предыдущей стадии КЗ,
+  обрывы и отключения ветвей от одного или обоих узлов (ветвь, отключенная с одной
+  стороны, остается подключенной к другому узлу с B/2 на отключенном конце); все стадии
+  рассчитываются низкоранговыми поправками к сохраненной факторизации (Net.contingency())
+  без редактирования модели, возвращаются токи и напряжения несимметрий стадий, результаты
+  всех стадий - в mdl.X как варианты
+- Добавлен метод mdl.CalcLineFault(p, x, SC, r) расчета промежуточного КЗ на ветви без ее
+  разделения в модели: участки ветви до и после места КЗ имеют доли x и 1-x сопротивления,
+  поперечной проводимости и взаимоиндукций ветви; напряжение места КЗ, ток второго участка
+  и ток КЗ учитываются окаймлением сохраненной факторизации с поправкой строк, линейно
+  зависящих от x (Net.linefault()), поэтому расчет множества мест КЗ (массив x)
+  выполняется векторно по одной факторизации, при full=False - без формирования mdl.X
+- N.r может задаваться массивом значений переходного сопротивления: Calc, CalcFull и
+  CalcScenarios возвращают результаты для всех значений r (столбцы X) по одной
+  факторизации схемы за счет пакетного решения малых систем несимметрий
+- Добавлены методы mdl.Save(fname) и mdl.Load(fname) сохранения и загрузки расчетной
+  модели в компактном двоичном формате (архив numpy npz): параметры узлов, ветвей,
+  взаимоиндукций и несимметрий хранятся массивами по столбцам, названия и примечания -
+  таблицами строк; при загрузке элементы создаются без вызова конструкторов, что позволяет
+  загружать модели из сотен тысяч элементов за доли секунды вместо выполнения скрипта
+  модели
+
 27.01.2021
 - Рефакторинг кода, исключено применение промежуточного массива для суммирования
   B/2 подключенных к узлу ветвей и собственной Y узла;
@@ -100,9 +253,37 @@
             проводимости нулевой последовательности
 '''
 
+import os
+import sys
+import csv
+import gc
+import time
+import itertools
+import warnings
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
 import numpy as np
-from scipy.sparse import csc_matrix
-from scipy.sparse.linalg import spsolve
+from scipy.sparse import csc_matrix, csr_matrix, bmat
+from scipy.sparse.csgraph import connected_components, maximum_bipartite_matching, breadth_first_order
+from scipy.sparse.linalg import spsolve, splu
+try:
+    from scikits.umfpack import splu as umfpack_splu
+except ImportError:
+    umfpack_splu = None
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+try:
+    import h5py
+except ImportError:
+    h5py = None
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
 Kf = -1j*np.pi/6
 r2d = 180/np.pi
@@ -126,6 +307,60 @@ arr111 = arr000+1
 arr222 = arr000+2
 arr_111 = -arr111
 
+def NTemplate(rows, kinds, cols, vals, rvals=None):
+    '''Служебная функция, формирует шаблон уравнений граничных условий несимметрии
+    rows - смещения номеров строк относительно первой строки несимметрии
+    kinds - 0 - столбец переменной узла (напряжения) для КЗ или ветви (тока) для обрыва,
+            1 - столбец переменной несимметрии (ток КЗ или напряжение обрыва)
+    cols - смещения номеров столбцов относительно первого столбца узла, ветви или несимметрии
+    vals - значения коэффициентов уравнений
+    rvals - коэффициенты при переходном сопротивлении r'''
+    vals = np.array(vals, dtype=np.cdouble)
+    if rvals is None:
+        rvals = np.zeros(vals.size, dtype=np.cdouble)
+    return (np.array(rows), np.array(kinds, dtype=bool), np.array(cols),
+            vals, np.array(rvals, dtype=np.cdouble))
+
+arr0_9 = np.concatenate((arr000,arr111,arr222))
+arr0_3 = np.concatenate((arr012,arr012,arr012))
+arr0_0 = np.zeros(9)
+#Шаблоны уравнений граничных условий КЗ (переменные узла - напряжения Uk, несимметрии - токи Ik)
+mnq = {'N0' : NTemplate(arr012, [1,1,0], arr012, vA),#Ik1=0;Ik2=0;Uk0=0
+       'A0' : NTemplate(arr0_9, [0,0,0,1,1,1,1,1,1], arr0_3, vABC),#Uka=0;Ikb=0;Ikc=0
+       'B0' : NTemplate(arr0_9, [0,0,0,1,1,1,1,1,1], arr0_3, vBCA),#Ukb=0;Ikc=0;Ika=0
+       'C0' : NTemplate(arr0_9, [0,0,0,1,1,1,1,1,1], arr0_3, vCAB),#Ukc=0;Ika=0;Ikb=0
+       'A0r' : NTemplate(np.concatenate((arr0_9,arr000)), [0,0,0]+[1]*9, np.concatenate((arr0_3,arr012)),
+                         np.concatenate((vABC,arr000)), np.concatenate((arr0_0,-vA))),#Uka-r*Ika=0;Ikb=0;Ikc=0
+       'B0r' : NTemplate(np.concatenate((arr0_9,arr000)), [0,0,0]+[1]*9, np.concatenate((arr0_3,arr012)),
+                         np.concatenate((vBCA,arr000)), np.concatenate((arr0_0,-vB))),#Ukb-r*Ikb=0;Ikc=0;Ika=0
+       'C0r' : NTemplate(np.concatenate((arr0_9,arr000)), [0,0,0]+[1]*9, np.concatenate((arr0_3,arr012)),
+                         np.concatenate((vCAB,arr000)), np.concatenate((arr0_0,-vC))),#Ukc-r*Ikc=0;Ika=0;Ikb=0
+       'AB' : NTemplate([0,0,1,1,2], [0,0,1,1,1], [0,1,0,1,2], [1.0-a2,1.0-a,1.0+a2,1.0+a,1.0]),#Uka-Ukb=0;Ika+Ikb=0;Ikc=0
+       'BC' : NTemplate([0,0,1,1,2], [0,0,1,1,1], [0,1,0,1,2], [a2-a,a-a2,a2+a,a+a2,1.0]),#Ukb-Ukc=0;Ikb+Ikc=0;Ika=0
+       'CA' : NTemplate([0,0,1,1,2], [0,0,1,1,1], [0,1,0,1,2], [a-1.0,a2-1.0,a+1.0,a2+1.0,1.0]),#Ukc-Uka=0;Ikc+Ika=0;Ikb=0
+       'ABr' : NTemplate([0,0,1,1,2,0,0], [0,0,1,1,1,1,1], [0,1,0,1,2,0,1],
+                         [1.0-a2,1.0-a,1.0+a2,1.0+a,1.0,0,0], [0,0,0,0,0,-1.0,-1.0]),#Uka-Ukb-r*Ika=0;Ika+Ikb=0;Ikc=0
+       'BCr' : NTemplate([0,0,1,1,2,0,0], [0,0,1,1,1,1,1], [0,1,0,1,2,0,1],
+                         [a2-a,a-a2,a2+a,a+a2,1.0,0,0], [0,0,0,0,0,-a2,-a]),#Ukb-Ukc-r*Ikb=0;Ikb+Ikc=0;Ika=0
+       'CAr' : NTemplate([0,0,1,1,2,0,0], [0,0,1,1,1,1,1], [0,1,0,1,2,0,1],
+                         [a-1.0,a2-1.0,a+1.0,a2+1.0,1.0,0,0], [0,0,0,0,0,-a,-a2]),#Ukc-Uka-r*Ikc=0;Ikc+Ika=0;Ikb=0
+       'AB0' : NTemplate(arr0_9, [0,0,0,0,0,0,1,1,1], arr0_3, vABC),#Uka=0;Ukb=0;Ikc=0
+       'BC0' : NTemplate(arr0_9, [0,0,0,0,0,0,1,1,1], arr0_3, vBCA),#Ukb=0;Ukc=0;Ika=0
+       'CA0' : NTemplate(arr0_9, [0,0,0,0,0,0,1,1,1], arr0_3, vCAB),#Ukc=0;Uka=0;Ikb=0
+       'ABC' : NTemplate(arr012, [0,0,1], arr012, vA),#Uk1=0;Uk2=0;Ik0=0
+       'ABC0' : NTemplate(arr012, [0,0,0], arr012, vA)#Uk1=0;Uk2=0;Uk0=0
+       }
+#Шаблоны уравнений граничных условий обрывов (переменные ветви - токи I, несимметрии - напряжения dU)
+mnp = {'N0' : NTemplate(arr012, [1,1,0], arr012, vA),#dU1=0;dU2=0;I0=0
+       'A0' : NTemplate(arr0_9, [0,0,0,1,1,1,1,1,1], arr0_3, vABC),#Ia=0;dUb=0;dUc=0
+       'B0' : NTemplate(arr0_9, [0,0,0,1,1,1,1,1,1], arr0_3, vBCA),#Ib=0;dUc=0;dUa=0
+       'C0' : NTemplate(arr0_9, [0,0,0,1,1,1,1,1,1], arr0_3, vCAB),#Ic=0;dUa=0;dUb=0
+       'AB' : NTemplate(arr0_9, [0,0,0,0,0,0,1,1,1], arr0_3, vABC),#Ia=0;Ib=0;dUc=0
+       'BC' : NTemplate(arr0_9, [0,0,0,0,0,0,1,1,1], arr0_3, vBCA),#Ib=0;Ic=0;dUa=0
+       'CA' : NTemplate(arr0_9, [0,0,0,0,0,0,1,1,1], arr0_3, vCAB),#Ic=0;Ia=0;dUb=0
+       'ABC' : NTemplate(arr012, [0,0,0], arr012, vA)#I1=0;I2=0;I0=0
+       }
+
 
 class Q:
     '''Класс трехфазного электрического узла, необходим для формирования расчетной
@@ -190,29 +425,30 @@ class Q:
                             'Аргумент model должен иметь тип Model!')
         model.nq += 1
         model.bq.append(self)
-        self.id = model.nq
-        self.model = model
-        self.name = name
-        self.Y = Y
-        self.J = J
-        self.desc = desc
-        self.plist = []
-        self.kn = None
+        model.reset()
+        #Атрибуты задаются без регистрации изменения параметров (см. __setattr__)
+        d = self.__dict__
+        d['id'] = model.nq
+        d['model'] = model
+        d['name'] = name
+        d['Y'] = Y
+        d['J'] = J
+        d['desc'] = desc
+        d['plist'] = []
+        d['kn'] = None
 
     def Test4Singularity(self):
-        if self.singulare:
-            self.singulare = False
-            for pk in self.plist:
-                if pk.q1 is pk.q2:
-                    pass
-                elif pk.q1 is self:
-                    if isinstance(pk.q2, Q):
-                        pk.q2.Test4Singularity()
-                elif pk.q2 is self:
-                    if isinstance(pk.q1, Q):
-                        pk.q1.Test4Singularity()
-
-
+        '''Служебный метод, снимает признак singulare с данного узла и всех узлов,
+        связанных с ним ветвями (обход без рекурсии)'''
+        stack = [self]
+        while stack:
+            kq = stack.pop()
+            if kq.singulare:
+                kq.singulare = False
+                for pk in kq.plist:
+                    for kq2 in (pk.q1, pk.q2):
+                        if isinstance(kq2, Q) and kq2.singulare:
+                            stack.append(kq2)
 
     def addp(self,kp):
         '''Служебный метод, предназачен для информирования узла о подключенных к нему ветвей'''
@@ -230,6 +466,21 @@ class Q:
         '''Служебный метод, предназачен для информирования узла о наличии КЗ в данном узле'''
         self.kn = kn
 
+    def __setattr__(self, name, val):
+        '''Изменение параметров узла присваиванием (q.Y = ..., q.J = ...) регистрируется
+        в модели для его учета в mdl.Calc(), см. mdl.mark()'''
+        object.__setattr__(self, name, val)
+        if name in ('Y', 'J') and self.__dict__.get('model') is not None:
+            self.model.mark(self)
+
+    def __getstate__(self):
+        '''Состояние узла для сериализации (pickle), см. GetState()'''
+        return GetState(self)
+
+    def __setstate__(self, state):
+        '''Восстановление узла при десериализации (pickle), см. SetState()'''
+        SetState(self, state)
+
     def par(self):
         '''Вывод на экран параметров узла - его номера и названия'''
         print('Узел №', self.id, ' - ', self.name)
@@ -265,16 +516,11 @@ class Q:
         '<f' - Фаза вектора в градусах
         'R+jX' - Текстовый вид комплексного числа
         'M<f' - Текстовый вид комплексного числа'''
-        u120 = self.getres()
-        i120 = np.array(self.Y) * u120
+        self.getres()
         if parname=='':
-            print('Узел № {} - {}'.format(self.id, self.name))
-            print(StrU(u120))
-            if (i120 != np.zeros(3)).any():
-                print("Значения токов проводимости узла")
-                print(StrI(i120))
+            self.model.Report(listq=[self], listp=[], listn=[])
         else:
-            res = mselectz[parname](u120,i120)
+            res = Item(self.model.getcache('q', '', parname), self.id-1)
             if isinstance(res, np.ndarray):
                 res = mform3[subpar](res,parname)
             else:
@@ -286,21 +532,23 @@ class Q:
         компексного числа для его последующего использования в расчетах
         q.ParName
         где ParName может принимать значения:
-        U1,U2,U0,UA,UB,UC,UABC,UAB,UBC,UCA,UAB_BC_CA'''
-        u120 = self.getres()
-        i120 = np.array(self.Y) * u120
-        return mselectz[attrname](u120,i120)
+        U1,U2,U0,UA,UB,UC,UABC,UAB,UBC,UCA,UAB_BC_CA
+        Значения выбираются из рассчитанных для всех узлов модели величин (см. mdl.getcache())'''
+        if not attrname in mselectz:
+            raise AttributeError(attrname)
+        self.getres()
+        return Item(self.model.getcache('q', '', attrname), self.id-1)
 
     def __repr__(self):
         '''Еще один способ вывода сводной таблицы результатов расчетов для узла q
         В командной строке интерпретара набрать название переменной объекта узла и нажать Enter
         q Enter'''
         u120 = self.getres()
-        i120 = np.array(self.Y) * u120
+        i120 = Col(self.Y, u120) * u120
         strres = []
         strres.append("Узел № {} - {}\n".format(self.id, self.name))
         strres.append(StrU(u120))
-        if (i120 != np.zeros(3)).any():
+        if (i120 != 0).any():
             strres.append("Значения токов проводимости узла")
             strres.append(StrI(i120))
         return ''.join(strres)
@@ -450,22 +698,25 @@ class P:
                             'Ветвь подключается обоими концами к одному и тому же узлу!')
         model.np += 1
         model.bp.append(self)
-        self.id = model.np
-        self.model = model
-        self.name = name
-        self.desc = desc
-        self.q1 = q1
+        model.reset()
+        #Атрибуты задаются без регистрации изменения параметров (см. __setattr__)
+        d = self.__dict__
+        d['id'] = model.np
+        d['model'] = model
+        d['name'] = name
+        d['desc'] = desc
+        d['q1'] = q1
+        d['q2'] = q2
+        d['Z'] = Z
+        d['E'] = E
+        d['T'] = T
+        d['B'] = B
+        d['mlist'] = []
+        d['kn'] = None
         if isinstance(q1, Q):
             q1.addp(self)
-        self.q2 = q2
         if isinstance(q2, Q):
             q2.addp(self)
-        self.Z = Z
-        self.E = E
-        self.T = T
-        self.B = B
-        self.mlist = []
-        self.kn = None
 
     def edit(self,name,q1,q2,Z,E=(0, 0, 0),T=(1, 0),B=(0, 0, 0),desc=''):
         '''Изменить параметры ветви можно с помощью метода
@@ -513,6 +764,7 @@ class P:
         self.E = E
         self.T = T
         self.B = B
+        self.model.mark(self)
 
     def addm(self,mid):
         '''Служебный метод, предназачен для информирования ветви
@@ -524,6 +776,21 @@ class P:
         о наличии на ней обрыва'''
         self.kn=kn
 
+    def __setattr__(self, name, val):
+        '''Изменение параметров ветви присваиванием (p.Z = ..., p.E = ... и т.п.)
+        регистрируется в модели для его учета в mdl.Calc(), см. mdl.mark()'''
+        object.__setattr__(self, name, val)
+        if name in ('q1', 'q2', 'Z', 'E', 'T', 'B') and self.__dict__.get('model') is not None:
+            self.model.mark(self)
+
+    def __getstate__(self):
+        '''Состояние ветви для сериализации (pickle), см. GetState()'''
+        return GetState(self)
+
+    def __setstate__(self, state):
+        '''Восстановление ветви при десериализации (pickle), см. SetState()'''
+        SetState(self, state)
+
     def par(self):
         '''Вывод на экран параметров ветви - ее номера, названия, номеров и наименований узлов к которым она подключена,
         электрических параметров Z,E,B и T
@@ -561,9 +828,9 @@ class P:
         токов прямой, обратной и нулевой последовательностей, тоже что и p.res1('U120')'''
         if isinstance(self.q1, Q):
             u120 = self.q1.getres()
-            i120 += u120 * self.B/2
+            i120 = i120 + u120 * Col(self.B, u120)/2
         else:
-            u120 = np.zeros(3,dtype=np.complex)
+            u120 = np.zeros_like(i120)
         return [u120, i120]
 
     def getresq2(self,i120):
@@ -573,11 +840,11 @@ class P:
         if isinstance(self.q2, Q):
             u120 = self.q2.getres()
         else:
-            u120 = np.zeros(3,dtype=np.complex)
+            u120 = np.zeros_like(i120)
         Kt = self.T[0]*np.exp(Kf*self.T[1]*np.ones(3))
         if self.T[1] % 2 != 0:
             Kt[1] = np.conj(Kt[1])
-        i120 = -Kt * i120 + u120 * self.B/2
+        i120 = -Col(Kt, i120) * i120 + u120 * Col(self.B, u120)/2
         return [u120, i120]
 
     def res1(self,parname='',subpar=''):
@@ -604,22 +871,11 @@ class P:
         '<f' - Фаза вектора в градусах
         'R+jX' - Текстовый вид комплексного числа
         'M<f' - Текстовый вид комплексного числа '''
-        i120 = self.getres()
-        if isinstance(self.q1, Q):
-            q1id = self.q1.id
-            q1name = self.q1.name
-        else:
-            q1id = 0
-            q1name = 'Земля'
-        u120,i120 = self.getresq1(i120)
+        self.getres()
         if parname=='':
-            print("Ветвь № {} - {}".format(self.id, self.name))
-            print("Значения токов по ветви со стороны узла №{} - {}".format(q1id, q1name))
-            print(StrI(i120))
-            print("Значения напряжения в узле №{} - {}".format(q1id, q1name))
-            print(StrU(u120))
+            self.model.Report(listq=[], listp=[self], listn=[], side=1)
         else:
-            res = mselectz[parname](u120,i120)
+            res = Item(self.model.getcache('p', 'q1', parname), self.id-1)
             if isinstance(res, np.ndarray):
                 res = mform3[subpar](res,parname)
             else:
@@ -650,22 +906,11 @@ class P:
         '<f' - Фаза вектора в градусах
         'R+jX' - Текстовый вид комплексного числа
         'M<f' - Текстовый вид комплексного числа '''
-        i120 = self.getres()
-        if isinstance(self.q2, Q):
-            q2id = self.q2.id
-            q2name = self.q2.name
-        else:
-            q2id = 0
-            q2name = 'Земля'
-        u120,i120 = self.getresq2(i120)
+        self.getres()
         if parname=='':
-            print("Ветвь № {} - {}".format(self.id, self.name))
-            print("Значения токов по ветви со стороны узла №{} - {}".format(q2id, q2name))
-            print(StrI(i120))
-            print("Значения напряжения в узле №{} - {}".format(q2id, q2name))
-            print(StrU(u120))
+            self.model.Report(listq=[], listp=[self], listn=[], side=2)
         else:
-            res = mselectz[parname](u120,i120)
+            res = Item(self.model.getcache('p', 'q2', parname), self.id-1)
             if isinstance(res, np.ndarray):
                 res = mform3[subpar](res,parname)
             else:
@@ -719,21 +964,17 @@ class P:
         q2U1,q2U2,q2U0,q1U120,q2UA,q2UB,q2UC,q2UABC,q2UAB,q2UBC,q2UCA,q2UAB_BC_CA,
         q2I1,q2I2,q2I0,q1I120,q2IA,q2IB,q2IC,q2IABC,q2IAB,q2IBC,q2ICA,q2IAB_BC_CA,
         q2Z1,q2Z2,q2Z0,q1Z120,q2ZA,q2ZB,q2ZC,q2ZABC,q2ZAB,q2ZBC,q2ZCA,q2ZAB_BC_CA,
-        q2S1,q2S2,q2S0,q1S120,q2SA,q2SB,q2SC,q2SABC,q2SAB,q2SBC,q2SCA,q2SAB_BC_CA,q2S'''
-        i120p = self.getres()
-        if not attrname[:2] in ('q1', 'q2'):
-            res = mselectz[attrname](np.zeros(3),i120p)
-        elif attrname[:2] == 'q1':
-            u120,i120 = self.getresq1(i120p)
-            res = mselectz[attrname[2:]](u120,i120)
-        elif attrname[:2] == 'q2':
-            u120,i120 = self.getresq2(i120p)
-            res = mselectz[attrname[2:]](u120,i120)
-        return res
+        q2S1,q2S2,q2S0,q1S120,q2SA,q2SB,q2SC,q2SABC,q2SAB,q2SBC,q2SCA,q2SAB_BC_CA,q2S
+        Значения выбираются из рассчитанных для всех ветвей модели величин (см. mdl.getcache())'''
+        key = attrname[:2] if attrname[:2] in ('q1', 'q2') else ''
+        if not attrname[len(key):] in mselectz:
+            raise AttributeError(attrname)
+        self.getres()
+        return Item(self.model.getcache('p', key, attrname[len(key):]), self.id-1)
 
 class M:
-    '''Класс взаимоиндукции нулевой последовательности,
-    необходим для формирования расчетной модели
+    '''Класс взаимоиндукции нулевой последовательности (или прямой, обратной и нулевой
+    последовательностей), необходим для формирования расчетной модели
 
     Создание ветви с помощью конструктора
     M(model,name,p1,p2,M12,M21) - взаимоиндукция
@@ -745,6 +986,9 @@ class M:
        desc - Примечание или любая другая текстовая информация, можно не задавать.
        M12 - взаимоиндукция влияния ветви p2 на ветвь p1
        M21 - взаимоиндукция влияния ветви p1 на ветвь p2
+       M12, M21 задаются числом - взаимоиндукция нулевой последовательности или кортежем
+       (M1, M2, M0) - взаимоиндукции прямой, обратной и нулевой последовательностей,
+       например для эквивалентов сети, см. mdl.Equivalent()
 
     Результатом конструктора ветви является объект взаимоиндукции, который используется для
     формирования расчетной модели
@@ -768,6 +1012,7 @@ class M:
            desc - Примечание или любая другая текстовая информация, можно не задавать.
            M12 - взаимоиндукция влияния ветви p2 на ветвь p1
            M21 - взаимоиндукция влияния ветви p1 на ветвь p2
+           M12, M21 - число (нулевая последовательность) или кортеж (M1, M2, M0)
         '''
         if not isinstance(model, Model):
             raise TypeError('Ошибка при добавлении взаимоиндукции -', name, '\n',
@@ -789,16 +1034,19 @@ class M:
                             'Взаимоиндукция подключается к одной и той же ветви!')
         model.nm += 1
         model.bm.append(self)
-        self.id = model.nm
-        self.model = model
-        self.name = name
-        self.desc = desc
-        self.p1 = p1
+        model.reset()
+        #Атрибуты задаются без регистрации изменения параметров (см. __setattr__)
+        d = self.__dict__
+        d['id'] = model.nm
+        d['model'] = model
+        d['name'] = name
+        d['desc'] = desc
+        d['p1'] = p1
+        d['p2'] = p2
+        d['M12'] = M12
+        d['M21'] = M21
         p1.addm(self)
-        self.p2 = p2
         p2.addm(self)
-        self.M12 = M12
-        self.M21 = M21
 
     def edit(self,name,M12,M21):
         ''' Редактирование взаимоиндукции
@@ -806,6 +1054,22 @@ class M:
         self.name = name
         self.M12 = M12
         self.M21 = M21
+        self.model.mark(self)
+
+    def __setattr__(self, name, val):
+        '''Изменение параметров взаимоиндукции присваиванием (m.M12 = ... и т.п.)
+        регистрируется в модели для его учета в mdl.Calc(), см. mdl.mark()'''
+        object.__setattr__(self, name, val)
+        if name in ('p1', 'p2', 'M12', 'M21') and self.__dict__.get('model') is not None:
+            self.model.mark(self)
+
+    def __getstate__(self):
+        '''Состояние взаимоиндукции для сериализации (pickle), см. GetState()'''
+        return GetState(self)
+
+    def __setstate__(self, state):
+        '''Восстановление взаимоиндукции при десериализации (pickle), см. SetState()'''
+        SetState(self, state)
 
     def par(self):
         '''Вывод на экран параметров ветви - ее номера, названия, номеров и наименований ветвей
@@ -822,6 +1086,7 @@ class N:
     N(model,name,qp,SC) - несимметрия
     N(model,name,qp,SC,desc='Примечание') - несимметрия с текстовым примечанием
     N(model,name,qp,SC,r=Rd) - несимметрия в виде КЗ с переходным сопротивлением
+    N(model,name,qp,SC,r=np.linspace(0,100,101)) - КЗ с массивом переходных сопротивлений
     где:
        model - объект расчетной модели в которой создается несимметрия
        name - краткое название несимметрии, обращение к несимметрии по ее имени не предусмотрено
@@ -837,6 +1102,10 @@ class N:
            'ABC0' - трехфазное КЗ на землю
            'N0' - Заземление в узле в схеме нулевой последовательности
                   или обрыв по нулевой последовательности на ветви
+       r - переходное сопротивление (для видов КЗ 'A0r','B0r','C0r','ABr','BCr','CAr'),
+           при задании r массивом mdl.Calc() рассчитывает варианты для всех значений r
+           по одной факторизации (аналогично mdl.CalcScenarios()), массивы r всех
+           несимметрий модели должны иметь одинаковую длину
 
     Результатом конструктора несимметрии является объект несимметрии, который используется для
     формирования расчетной модели и вывода результатов расчетов
@@ -915,6 +1184,14 @@ class N:
         self.SC = SC
         self.r = r
 
+    def __getstate__(self):
+        '''Состояние несимметрии для сериализации (pickle), см. GetState()'''
+        return GetState(self)
+
+    def __setstate__(self, state):
+        '''Восстановление несимметрии при десериализации (pickle), см. SetState()'''
+        SetState(self, state)
+
     def par(self):
         '''Вывод на экран параметров несимметрии - ее номера, названия,
         номера и наименования узла или ветви к которым она подключена,
@@ -961,27 +1238,11 @@ class N:
         'R+jX' - Текстовый вид комплексного числа
         'M<f' - Текстовый вид комплексного числа'''
         if isinstance(self.qp, Q):
-            u120 = self.qp.getres()
-            i120 = self.getres()
+            self.getres()
             if parname=='':
-                print('КЗ № {} - {} - {}'.format(self.id, self.name, self.SC))
-                print('В Узле № {} - {}'.format(self.qp.id, self.qp.name))
-                print(StrU(u120))
-                print('Суммарный ток КЗ в Узле № {} - {}'.format(self.qp.id, self.qp.name))
-                print(StrI(i120))
-                print('Подтекание токов по ветвям')
-                self.qp.update()
-                for kp in self.qp.plist:
-                    i120 = kp.getres()
-                    if self.qp is kp.q1:
-                        u120,i120 = kp.getresq1(i120)
-                    elif self.qp is kp.q2:
-                        u120,i120 = kp.getresq2(i120)
-                    i120 = -i120
-                    print('Ветвь № {} - {}'.format(kp.id, kp.name))
-                    print(StrI(i120, 0))
+                self.model.Report(listq=[], listp=[], listn=[self])
             else:
-                res = mselectz[parname](u120,i120)
+                res = Item(self.model.getcache('n', '', parname), self.id-1)
                 if isinstance(res, np.ndarray):
                     res = mform3[subpar](res,parname)
                 else:
@@ -1025,15 +1286,12 @@ class N:
         U1,U2,U0,UA,UB,UC,UABC,UAB,UBC,UCA,UAB_BC_CA
         I1,I2,I0,IA,IB,IC,IABC,IAB,IBC,ICA,IAB_BC_CA
         Z1,Z2,Z0,Z120,ZA,ZB,ZC,ZABC,ZAB,ZBC,ZCA,ZAB_BC_CA,
-        S1,S2,S0,S120,SA,SB,SC,SABC,SAB,SBC,SCA,SAB_BC_CA,S'''
-        if isinstance(self.qp, Q):
-            u120 = self.qp.getres()
-            i120 = self.getres()
-        elif isinstance(self.qp, P):
-            u120 = self.getres()
-            i120 = self.qp.getres()
-        res = mselectz[attrname](u120,i120)
-        return res
+        S1,S2,S0,S120,SA,SB,SC,SABC,SAB,SBC,SCA,SAB_BC_CA,S
+        Значения выбираются из рассчитанных для всех несимметрий модели величин (см. mdl.getcache())'''
+        if not attrname in mselectz:
+            raise AttributeError(attrname)
+        self.getres()
+        return Item(self.model.getcache('n', '', attrname), self.id-1)
 
 class Model:
     '''Класс представляющий расчетную модель электрической сети,
@@ -1060,6 +1318,126 @@ class Model:
         self.bm = []
         self.bn = []
         self.X = None
+        self.net = None
+        self.pattern = None
+        self.dirty = []
+        self.engine = 'full'
+        self.solver = 'auto'
+        self.permc_spec = None
+        self.nupdate = 10
+        self.precision = 'double'
+        self.topo = True
+        self.check = True
+        self.cache = None
+
+    def __getstate__(self):
+        '''Состояние модели для сериализации (pickle, передача модели в другой процесс),
+        сохраненная факторизация mdl.net и кэш результатов mdl.cache не сериализуются
+        и формируются заново при следующем расчете, элементы модели сериализуются
+        со ссылками друг на друга по номерам (см. GetState())'''
+        state = self.__dict__.copy()
+        state['net'] = None
+        state['cache'] = None
+        return state
+
+    def __setstate__(self, state):
+        '''Восстановление модели при десериализации, ссылки между элементами модели,
+        восстановленными до модели, формируются по их номерам (см. GetState())'''
+        self.__dict__.update(state)
+        for lst in (self.bq, self.bp, self.bm, self.bn):
+            for el in lst:
+                if el.__dict__:
+                    SetRefs(el)
+
+    def Setup(self, engine=None, solver=None, permc_spec=None, nupdate=None, precision=None, topo=None,
+              check=None):
+        '''Настройка метода решения СЛАУ, используемого в mdl.Calc()
+        mdl.Setup(engine='seq')
+        mdl.Setup(solver='splu', permc_spec='MMD_AT_PLUS_A')
+        mdl.Setup(nupdate=20)
+        mdl.Setup(precision='single')
+        mdl.Setup(topo=False)
+        mdl.Setup(check=False)
+        где engine - способ факторизации схемы замещения сети без несимметрий:
+           'full' - факторизация единой матрицы схем прямой, обратной и нулевой
+                    последовательностей (по умолчанию);
+           'seq' - раздельная факторизация схем прямой, обратной и нулевой
+                   последовательностей, которые без несимметрий независимы друг
+                   от друга (в том числе с учетом фазового сдвига трансформаторов),
+                   при совпадении схем прямой и обратной последовательностей
+                   (Z1=Z2, B1=B2, Y1=Y2 и четные группы трансформаторов)
+                   используется одна факторизация, связь схем осуществляется
+                   только через несимметрии;
+           'ybus' - факторизация матрицы узловых проводимостей схем прямой, обратной
+                   и нулевой последовательностей (с учетом коэф-ов трансформации, групп
+                   соединения обмоток трансформаторов, B/2, групп взаимоиндукций и Y узлов),
+                   полученной исключением токов ветвей из СЛАУ, токи ветвей определяются
+                   после нахождения напряжений узлов, размерность факторизуемой матрицы
+                   составляет 3*(nq+n0), при наличии ветвей с нулевым сопротивлением,
+                   не исключенных топологической обработкой схемы, используется способ 'full'
+        solver - решатель разреженной СЛАУ из реестра msolver:
+           'auto' - выбор решателя по размерности и количеству ненулевых элементов
+                    матрицы (по умолчанию), см. AutoSolver();
+           'splu' - LU-разложение SuperLU (scipy) с сохранением факторизации;
+           'spsolve' - решение spsolve (scipy) без сохранения факторизации;
+           'umfpack' - LU-разложение UMFPACK (при установленном scikits.umfpack);
+           реестр может быть дополнен решателями пользователя, например
+           msolver['my'] = lambda A, permc_spec: MyLU(A), где MyLU(A).solve(b)
+        permc_spec - перестановка столбцов для SuperLU ('splu' и 'spsolve'):
+           'COLAMD' (по умолчанию), 'MMD_ATA', 'MMD_AT_PLUS_A', 'NATURAL'
+        Наиболее быстрый для модели решатель можно определить с помощью mdl.BenchSolvers()
+        nupdate - максимальное количество отредактированных (p.edit, m.edit) после последней
+           факторизации ветвей и взаимоиндукций, изменение параметров которых учитывается
+           в mdl.Calc() без повторной факторизации - низкоранговой поправкой по формуле
+           Шермана-Моррисона-Вудбери (по умолчанию 10), при большем количестве выполняется
+           повторная факторизация, при nupdate=0 - повторная факторизация при любом изменении
+        precision - точность факторизации схемы замещения сети:
+           'double' - complex128 (по умолчанию);
+           'single' - complex64 с индексами int32, что примерно вдвое сокращает память
+                      под LU-разложение, точность complex128 достигается итерационным
+                      уточнением решения по невязке в complex128 (класс RefineLU),
+                      при отсутствии сходимости выполняется факторизация в complex128
+                      с предупреждением RuntimeWarning
+        topo - топологическая обработка схемы (по умолчанию True): узлы, связанные ветвями
+           с нулевым сопротивлением (выключатели, ШСВ, СВ - Z=0 и E=0 во всех последовательностях,
+           без трансформации, взаимоиндукций и обрывов, оба узла - не земля), объединяются,
+           а сами ветви исключаются из факторизуемой СЛАУ, их токи определяются после расчета
+           по 1-ому закону Кирхгофа (класс TopoLU), токи параллельных ветвей с нулевым
+           сопротивлением, образующих контур, распределяются по одной из них (остальные - 0),
+           что устраняет вырожденность СЛАУ при параллельных СВ и ШСВ без ввода
+           фиктивного сопротивления (например 0.001 Ом) и уменьшает размерность СЛАУ
+        check - проверка структурного ранга СЛАУ перед ее решением в mdl.Calc(), mdl.CalcScenarios()
+           и mdl.CalcFull() (по умолчанию True), при структурной вырожденности - исключение
+           ValueError с перечнем элементов, уравнения и переменные которых структурно
+           зависимы, см. mdl.Test4Rank()
+        Выбор способа факторизации и решателя не влияет на формат результатов расчета mdl.X'''
+        if engine is not None:
+            if not engine in ('full', 'seq', 'ybus'):
+                raise ValueError('Ошибка при настройке модели', '\n',
+                                 'Неизвестный способ факторизации engine = {}!'.format(engine))
+            self.engine = engine
+        if solver is not None:
+            if solver != 'auto' and not solver in msolver:
+                raise ValueError('Ошибка при настройке модели', '\n',
+                                 'Неизвестный или не установленный решатель solver = {}!'.format(solver))
+            self.solver = solver
+        if permc_spec is not None:
+            if not permc_spec in ('COLAMD', 'MMD_ATA', 'MMD_AT_PLUS_A', 'NATURAL'):
+                raise ValueError('Ошибка при настройке модели', '\n',
+                                 'Неизвестная перестановка столбцов permc_spec = {}!'.format(permc_spec))
+            self.permc_spec = permc_spec
+        if nupdate is not None:
+            self.nupdate = nupdate
+        if precision is not None:
+            if not precision in ('double', 'single'):
+                raise ValueError('Ошибка при настройке модели', '\n',
+                                 'Неизвестная точность факторизации precision = {}!'.format(precision))
+            self.precision = precision
+        if topo is not None:
+            self.topo = bool(topo)
+        if check is not None:
+            self.check = bool(check)
+        self.reset()
 
     def AddNQ(self,NQ,Nname):
         '''Множественное создание узлов
@@ -1153,6 +1531,10 @@ class Model:
         взаимоиндукций, несимметрий...
         mdl.Clear()'''
         self.X = None
+        self.net = None
+        self.pattern = None
+        self.dirty = []
+        self.cache = None
         self.nq = 0
         self.np = 0
         self.nm = 0
@@ -1196,6 +1578,21 @@ class Model:
                 kn.model = None
                 kn.qp.kn = None
 
+    def reset(self):
+        '''Служебный метод, сбрасывает сохраненную (факторизованную) схему замещения сети,
+        вызывается при создании узлов, ветвей и взаимоиндукций'''
+        self.net = None
+        self.dirty = []
+        self.cache = None
+
+    def mark(self, elem):
+        '''Служебный метод, регистрирует изменение параметров узла, ветви или взаимоиндукции elem
+        (p.edit, m.edit, присваивание q.Y, p.Z, m.M12 и т.п.) для их учета в mdl.Calc()
+        без повторной факторизации, см. mdl.Setup()'''
+        self.cache = None
+        if self.net is not None and not elem in self.dirty:
+            self.dirty.append(elem)
+
     def List(self):
         '''Вывод на экран составляющих расчетную модель узлов, ветвей,
         взаимоиндукций, несимметрий и их параметров...
@@ -1215,43 +1612,120 @@ class Model:
     def Test4Singularity(self):
         '''Тестирование модели на условия приводящие к вырожденности
         (сингулярности) матрицы уравнений узловых напряжений и токов ветвей
-        mdl.Test4Singularity()'''
+        mdl.Test4Singularity()
+        Висящие (не связанные ветвями с землей) узлы, ветви, взаимоиндукции и несимметрии
+        определяются методом mdl.Islands()'''
+        isl = self.Islands()
+        hq = set(isl['hq'].tolist())
         for kq in self.bq:
-            kq.singulare = True
-        for kp in self.bp:
-            if isinstance(kp.q1, int) and isinstance(kp.q2, Q):
-                kp.q2.Test4Singularity()
-            elif isinstance(kp.q1, Q) and isinstance(kp.q2, int):
-                kp.q1.Test4Singularity()
-        listq = []
-        listp = []
-        for kq in self.bq:
-            if kq.singulare:
-                listq.append(kq)
-        for kp in self.bp:
-            if (kp.q1 in listq) or (kp.q2 in listq):
-                listp.append(kp)
-        if listq or listp:
+            kq.singulare = kq.id-1 in hq
+        if isl['hq'].size or isl['hp'].size:
             print('\nСписок висящих узлов\n')
-            for kq in listq:
-                kq.par()
+            for k in isl['hq']:
+                self.bq[k].par()
             print('\nСписок висящих ветвей\n')
-            for kp in listp:
-                kp.par()
+            for k in isl['hp']:
+                self.bp[k].par()
             print('\nСписок взаимоиндукций между ветвями, хотя-бы одна из которых является висящей\n')
-            for km in self.bm:
-                if (km.p1 in listp) or (km.p2 in listp):
-                    km.par()
+            for k in isl['hm']:
+                self.bm[k].par()
             print('\nСписок КЗ на висящем узле или обрывов на висящих ветвях\n')
-            for kn in self.bn:
-                if isinstance(kn.qp, Q): # Короткие замыкания
-                    if kn.qp in listq:
-                        kn.par()
-                if isinstance(kn.qp, P): # Обрывы
-                    if kn.qp in listp:
-                        kn.par()
+            for k in isl['hn']:
+                self.bn[k].par()
             raise ValueError('Выявлены висящие узлы, ветви!!! \nВыполнение расчетов электрических параметров невозможно! \nУдалите или закоментируйте висящие узлы, ветви,\n, взаимоиндукции, КЗ и обрывы!')
 
+    def Islands(self):
+        '''Определение связных частей (островов) схемы по ветвям, без рекурсии -
+        функцией connected_components библиотеки scipy на графе узлов и земли
+        isl = mdl.Islands()
+        Возвращает словарь numpy массивов (индексы элементов начинаются с 0):
+            iq - номера островов узлов (nq,), 0 - остров, связанный ветвями с землей;
+            hq - индексы висящих (не связанных ветвями с землей) узлов;
+            hp - индексы висящих ветвей (подключенных к висящим узлам);
+            hm - индексы взаимоиндукций, хотя-бы одна ветвь которых является висящей;
+            hn - индексы КЗ на висящих узлах и обрывов на висящих ветвях.'''
+        arr = self.getarrp(self.bp)
+        nq = self.nq
+        q1 = np.where(arr['q1'] >= 0, arr['q1'], nq)
+        q2 = np.where(arr['q2'] >= 0, arr['q2'], nq)
+        G = csr_matrix((np.ones(q1.size), (q1, q2)), shape=(nq+1, nq+1))
+        _,lab = connected_components(G, directed=False)
+        #Нумерация островов в порядке появления узлов, остров земли - 0
+        _,first,inv = np.unique(np.roll(lab, 1), return_index=True, return_inverse=True)
+        rank = np.empty_like(first)
+        rank[np.argsort(first)] = np.arange(first.size)
+        iq = rank[inv][1:]
+        hq = np.flatnonzero(iq != 0)
+        hmask = np.append(iq != 0, False)
+        hpmask = hmask[q1] | hmask[q2]
+        hp = np.flatnonzero(hpmask)
+        arrm = self.getarrm(self.bm)
+        hm = np.flatnonzero(hpmask[arrm['m1']] | hpmask[arrm['m2']])
+        arrn = self.getarrn(self.bn)
+        isq,ne = arrn['isq'],arrn['ne']
+        hn = np.zeros(ne.size, dtype=bool)
+        hn[isq] = hmask[ne[isq]]
+        hn[~isq] = hpmask[ne[~isq]]
+        hn = np.flatnonzero(hn)
+        return dict(iq=iq, hq=hq, hp=hp, hm=hm, hn=hn)
+
+    def Test4Rank(self):
+        '''Тестирование полной СЛАУ модели (включая все несимметрии) на структурную
+        вырожденность - по шаблону ненулевых элементов матрицы, без ее факторизации
+        rk = mdl.Test4Rank()
+        Структурный ранг определяется максимальным паросочетанием строк и столбцов
+        (см. StructRank()), выявляются в том числе висящие узлы и ветви, узлы без ветвей
+        и проводимости Y, несимметрии, граничные условия которых противоречат друг другу
+        или схеме (например, два КЗ 'ABC0' в одном узле, обрыв радиальной ветви);
+        Численно вырожденная, но структурно невырожденная матрица (вырожденность за счет
+        значений коэффициентов при полном паросочетании шаблона) данным методом не выявляется;
+        Так, контуры из ветвей с нулевым сопротивлением при mdl.Setup(topo=False), в том числе
+        параллельные ветви, выявляются, только если одинаковый шаблон их уравнений по 2-ому закону
+        Кирхгофа (только напряжения узлов) делает шаблон матрицы неполного ранга, в остальных
+        случаях такие контуры (например, контур из трех ветвей с нулевым сопротивлением
+        или параллельные ветви к узлу без других ветвей) структурно невырождены и не выявляются
+        Возвращает словарь:
+            rank, n - структурный ранг и размерность СЛАУ;
+            eq - список элементов (узлов, ветвей, несимметрий) избыточных уравнений;
+            var - список элементов неопределенных переменных.'''
+        arr = self.getarr()
+        ri,ci,cdata,_ = self.formslae(arr)
+        n = 3*(self.nq+self.np+self.nn)
+        return self.checkrank(csc_matrix((cdata, (ri, ci)), shape=(n, n)), np.arange(n), self.bn, False)
+
+    def checkrank(self, A, idx, listn, error=True):
+        '''Служебный метод, проверка структурного ранга матрицы A, строки (столбцы) которой
+        соответствуют строкам (столбцам) idx СЛАУ с переменными несимметрий listn
+        (в порядке их записи в СЛАУ), см. mdl.Test4Rank()
+        При error=True и структурной вырожденности - исключение ValueError'''
+        rank,rows,cols = StructRank(A)
+        res = dict(rank=rank, n=A.shape[0], eq=self.getel(idx[rows], listn), var=self.getel(idx[cols], listn))
+        if error and rank < A.shape[0]:
+            def name(el):
+                if isinstance(el, Q):
+                    return 'Узел № {} - {}'.format(el.id, el.name)
+                if isinstance(el, P):
+                    return 'Ветвь № {} - {}'.format(el.id, el.name)
+                return '{} № {} - {} - {}'.format('КЗ' if isinstance(el.qp, Q) else 'Обрыв', el.id, el.name, el.SC)
+            names = lambda lel: ', '.join(name(el) for el in lel[:20]) + (', ...' if len(lel) > 20 else '')
+            raise ValueError('Ошибка при расчете модели', '\n',
+                             'Структурно вырожденная СЛАУ: ранг {} при размерности {}!'.format(rank, A.shape[0]), '\n',
+                             'Избыточные уравнения: ' + names(res['eq']), '\n',
+                             'Неопределенные переменные: ' + names(res['var']))
+        return res
+
+    def getel(self, idx, listn):
+        '''Служебный метод, список элементов (ветвей, узлов, несимметрий из listn),
+        к которым относятся строки (столбцы) idx СЛАУ'''
+        lel = []
+        for k in np.unique(np.asarray(idx, dtype=np.int64) // 3).tolist():
+            if k < self.np:
+                lel.append(self.bp[k])
+            elif k < self.np+self.nq:
+                lel.append(self.bq[k-self.np])
+            else:
+                lel.append(listn[k-self.np-self.nq])
+        return lel
 
     def Calc(self):
         '''Главный метод модуля МРТКЗ mdl.Calc()
@@ -1333,223 +1807,2317 @@ class Model:
                 Z*Ip + At*Uq + dU = E, где dU - напряжение продольной несимметрии
 
         Разреженная матрица LHS формируется в два этапа
-        Этап 1. формируется координатная версия резреженной матрицы в cdata, ri и ci,
+        Этап 1. формируется координатная версия резреженной матрицы в cdata, ri и ci
+        векторными операциями по классам элементов и группам несимметрий (mdl.formslae),
         в которых хранятся значения ненулевых элеметнов матрицы, их номера строк и столбцов
         Этап 2. формируется CSC (Разреженный столбцовый формат) матрица LHS  с помощью метода scipy
-        Решение разреженной СЛАУ осуществляется с помощью метода spsolve(LHS,RHS) библиотеки scipy'''
+        Решение разреженной СЛАУ осуществляется с помощью метода spsolve(LHS,RHS) библиотеки scipy
+
+        Для ускорения многократных расчетов различных несимметрий в неизменной сети
+        матрица схемы замещения сети без несимметрий (ветви, взаимоиндукции, Y узлов)
+        и заземлений и обрывов нейтрали 'N0' факторизуется однократно (splu) и сохраняется
+        в mdl.net, остальные несимметрии учитываются окаймлением факторизованной матрицы,
+        т.е. решением малой системы уравнений относительно токов КЗ и напряжений обрывов
+        (дополнение Шура), см. класс Net. Сохраненная факторизация сбрасывается при создании
+        узлов, ветвей и взаимоиндукций, а также при изменении состава несимметрий 'N0';
+        Изменения параметров узлов, ветвей и взаимоиндукций (p.edit, m.edit, присваивание
+        q.Y, p.Z, m.M12 и т.п.) учитываются низкоранговой поправкой к сохраненной факторизации
+        (Net.update()), а при количестве измененных элементов больше mdl.Setup(nupdate=...) -
+        повторной факторизацией. Если факторизация схемы без несимметрий невозможна
+        (вырожденная матрица), то выполняется расчет полной СЛАУ mdl.CalcFull()
+        Структура (шаблон) матрицы схемы без несимметрий и найденная при ее факторизации
+        перестановка строк и столбцов сохраняются в mdl.pattern (класс Pattern) и не
+        сбрасываются при изменении параметров элементов, поэтому при неизменной топологии
+        сети повторный расчет сводится к записи новых значений и численной факторизации'''
         # self.Test4Singularity()
-        n = 3*(self.nq+self.np+self.nn)# Размерность СЛАУ
-        maxnnz = 3*self.nq + 15*self.np + 2*self.nm + 15*self.nn# Максимальное кол-во ненулевых элементов разреженной матрицы
-        RHS = np.zeros(n, dtype=np.complex)# Вектор правой части СЛАУ, в него записывается э.д.с. ветвей и J узлов
-
-        ij = 3*self.nq # Текущий адрес записи, в результате количество использованной памяти
-        cdata = np.zeros(maxnnz, dtype=np.cdouble)# Вектор для хранения ненулевых элементов СЛАУ
-        ri = np.zeros(maxnnz, dtype=np.int)# Вектор для хранения номеров строк ненулевых элементов СЛАУ
-        ci = np.zeros(maxnnz, dtype=np.int)# Вектор для хранения номеров столбцов ненулевых элементов СЛАУ
-        ri[0:ij] = 3*self.np + np.arange(ij)
-        ci[0:ij] = ri[0:ij]
-
-        for kp in self.bp: # Перебор всех ветвей
-            pId = 3*(kp.id-1)#Здесь и далее номер строки, столбца относящегося к прямой последовательности ветви
-            lpId = pId+arr012#[pId,pId+1,pId+2]
-            #Запись сопротивлений ветви в разреженную матрицу
-            Dij = 3
-            ri[ij:ij+Dij] = lpId
-            ci[ij:ij+Dij] = lpId
-            cdata[ij:ij+Dij] = np.array(kp.Z)
-            ij += Dij
-            #Запись Э.Д.С. ветви в RHS
-            RHS[pId:pId+3] = np.array(kp.E)
-            #Расчет комплексных коэф-ов трансформации прямой, обратной и нулевой последовательностей
-            Kt1 = kp.T[0] * np.exp(Kf*kp.T[1])
-            if kp.T[1] % 2 == 0:
-                Kt2 = Kt1
+        net = self.getnet()
+        if net.LU is None:
+            return self.CalcFull()
+        try:
+            self.X = net.calc()
+        except np.linalg.LinAlgError:
+            return self.CalcFull()
+        return self.X
+
+    def CalcScenarios(self, E=None, J=None):
+        '''Расчет нескольких вариантов (сценариев) Э.Д.С. ветвей и/или токов источников
+        тока J узлов с использованием одной факторизации матрицы СЛАУ
+        mdl.CalcScenarios(E=E)
+        mdl.CalcScenarios(J=J)
+        mdl.CalcScenarios(E=E,J=J)
+        где:
+           E - матрица numpy Э.Д.С. ветвей (В), размерностью (np,3,nv) или (3*np,nv),
+               каждый столбец - вариант (E1,E2,E0) всех ветвей в порядке их создания
+           J - матрица numpy токов источников тока узлов (А), размерностью (nq,3,nv)
+               или (3*nq,nv), каждый столбец - вариант (J1,J2,J0) всех узлов
+           nv - количество вариантов, незаданные E или J во всех вариантах
+               принимаются по параметрам ветвей и узлов модели
+        Возвращает матрицу X размерностью (3*(np+nq+nn),nv), которая сохраняется в mdl.X,
+        при этом все методы получения результатов расчетов res(), res1(), res2() и
+        q.ParName, p.ParName, n.ParName возвращают результаты по всем вариантам,
+        последний индекс которых соответствует номеру варианта, например
+        q.res('UA','M')[k] или p.q1IA[k] - результат k-ого варианта'''
+        if E is None and J is None:
+            raise ValueError('Ошибка при расчете вариантов', '\n',
+                             'Необходимо задать матрицы вариантов E и/или J!')
+        if E is not None:
+            E = np.asarray(E, dtype=np.cdouble)
+            if E.ndim == 3:
+                E = E.reshape(3*self.np, E.shape[2])
+            if E.ndim != 2 or E.shape[0] != 3*self.np:
+                raise ValueError('Ошибка при расчете вариантов', '\n',
+                                 'Матрица E должна иметь размерность (np,3,nv) или (3*np,nv)!')
+        if J is not None:
+            J = np.asarray(J, dtype=np.cdouble)
+            if J.ndim == 3:
+                J = J.reshape(3*self.nq, J.shape[2])
+            if J.ndim != 2 or J.shape[0] != 3*self.nq:
+                raise ValueError('Ошибка при расчете вариантов', '\n',
+                                 'Матрица J должна иметь размерность (nq,3,nv) или (3*nq,nv)!')
+        if E is not None and J is not None and E.shape[1] != J.shape[1]:
+            raise ValueError('Ошибка при расчете вариантов', '\n',
+                             'Количество вариантов E и J должно совпадать!')
+        net = self.getnet()
+        b = net.rhs(E, J)
+        if net.LU is not None:
+            try:
+                self.X = net.calc(b)
+                return self.X
+            except np.linalg.LinAlgError:
+                pass
+        if self.getr(self.bn).shape[1] > 1:
+            raise ValueError('Ошибка при расчете вариантов', '\n',
+                             'Расчет вариантов без факторизации схемы с массивами r несимметрий не предусмотрен!')
+        n = 3*(self.nq+self.np+self.nn)
+        ri,ci,cdata,_ = self.formslae(self.getarr())
+        RHS = np.zeros((n, b.shape[1]), dtype=np.cdouble)
+        RHS[0:net.nqp] = b[0:net.nqp]
+        LHS = csc_matrix((cdata, (ri, ci)), shape=(n, n))
+        self.X = Factorize(LHS, self.solver, self.permc_spec).solve(RHS)
+        return self.X
+
+    def CalcContingency(self, listp=None, depth=1, listr=None, listpar=('IA', 'IB', 'IC', '3I0'), df=False):
+        '''Расчет текущего состава несимметрий (КЗ, обрывов) модели при отключении ветвей
+        (схемы N-1 и N-2) без удаления ветвей из модели и без повторной факторизации СЛАУ
+        cases,tab = mdl.CalcContingency()
+        cases,tab = mdl.CalcContingency(listp=[p1,p2,p3], depth=2, listr=[p4,p5], listpar=['q1IA','q13I0'])
+        где listp - список отключаемых ветвей, по умолчанию - ветви, подключенные к узлам КЗ
+               и к узлам ветвей с обрывами, а также ветви, имеющие с ними взаимоиндукцию
+               (ветви с обрывами, кроме обрывов 'N0', не отключаются);
+            depth - 1 - одиночные отключения ветвей listp (N-1), 2 - также все пары (N-2);
+            listr - список ветвей с защитами, для которых определяются наибольшие и наименьшие
+               значения величин (по умолчанию - listp);
+            listpar - список величин с теми же названиями, что и в mdl.TableP();
+            df - при True таблица возвращается в виде pandas.DataFrame (см. mdl.TableQ())
+        Отключенная ветвь имеет нулевой ток, ее Э.Д.С., поперечная проводимость B
+        и взаимоиндукции с другими ветвями не учитываются; части схемы, потерявшие
+        связь с землей и источниками, принимаются отключенными (нулевые напряжения и токи);
+        Каждое отключение учитывается низкоранговой поправкой к сохраненной факторизации
+        схемы (см. Net.contingency())
+        Возвращает:
+            cases - список кортежей отключенных ветвей расчетных случаев, cases[0] = () - исходная схема;
+            tab - структурированный массив numpy с полями id, name ветвей listr и для каждой
+               величины par полями par+'_min', par+'_max' - наименьший и наибольший модуль величины
+               и par+'_cmin', par+'_cmax' - номера соответствующих случаев в cases, без учета
+               случаев отключения самой ветви и случаев с вырожденной СЛАУ (при отсутствии
+               таких случаев - nan и -1)
+        Результаты всех случаев сохраняются в mdl.X размерностью (3*(np+nq+nn),len(cases))
+        как результаты расчета вариантов (см. mdl.CalcScenarios()), случаи с вырожденной
+        СЛАУ (например, при отделении части схемы с источниками от земли) - nan'''
+        if not depth in (1, 2):
+            raise ValueError('Ошибка при расчете отключений ветвей', '\n',
+                             'Глубина перебора отключений depth должна быть 1 или 2!')
+        listn = [kn for kn in self.bn if kn.SC != 'N0']
+        pn = set(kn.qp.id for kn in listn if isinstance(kn.qp, P))
+        if listp is None:
+            lq = []
+            for kn in listn:
+                lq.extend([kn.qp] if isinstance(kn.qp, Q) else [kn.qp.q1, kn.qp.q2])
+            lp = [kp for kq in lq if isinstance(kq, Q) for kp in kq.plist]
+            lp += [km.p1 if km.p2 is kp else km.p2 for kp in lp for km in kp.mlist]
+            listp = sorted(set(kp for kp in lp if not kp.id in pn), key=lambda kp: kp.id)
+        for kp in listp:
+            if not isinstance(kp, P) or not kp.model is self:
+                raise TypeError('Ошибка при расчете отключений ветвей', '\n',
+                                'Отключаемые ветви должны иметь тип P и принадлежать модели!')
+            if kp.id in pn:
+                raise ValueError('Ошибка при расчете отключений ветвей', '\n',
+                                 'Отключение ветви №', kp.id, ' - ', kp.name, ' с обрывом невозможно!')
+        if listr is None:
+            listr = listp
+        cases = [()] + [(kp,) for kp in listp]
+        if depth == 2:
+            cases += list(itertools.combinations(listp, 2))
+        net = self.getnet()
+        if net.LU is None:
+            raise ValueError('Ошибка при расчете отключений ветвей', '\n',
+                             'Факторизация схемы замещения сети без несимметрий невозможна!')
+        outs = [np.array([kp.id-1 for kp in case], dtype=np.int64) for case in cases]
+        self.X,_ = net.contingency(outs)
+        #Огибающие величин по ветвям с защитами без случаев отключения самих ветвей
+        ui = self.resui('p', listr)
+        off = np.array([[kp in case for case in cases] for kp in listr], dtype=bool).reshape(len(listr), -1)
+        fields = []
+        for par in listpar:
+            key = par[:2] if par[:2] in ('q1', 'q2') else ''
+            val = np.abs(self.respar(par[len(key):], *ui[key]))
+            val[np.broadcast_to(off[:,None,:] if val.ndim == 3 else off, val.shape)] = np.nan
+            fin = ~np.isnan(val).all(axis=-1)
+            for suf,fill,arg in (('min', np.inf, np.argmin), ('max', -np.inf, np.argmax)):
+                c = arg(np.where(np.isnan(val), fill, val), axis=-1)
+                fields.append((par+'_'+suf, (np.double, c.shape[1:]),
+                               np.where(fin, np.take_along_axis(val, c[...,None], axis=-1)[...,0], np.nan)))
+                fields.append((par+'_c'+suf, (np.int64, c.shape[1:]), np.where(fin, c, -1)))
+        return cases, self.table(listr, [], {}, '', df, fields)
+
+    def CalcCascade(self, stages):
+        '''Расчет каскадного (поочередного) развития аварии, например, КЗ с последующим
+        отключением поврежденной ветви выключателями с одной и другой стороны,
+        без редактирования модели и без повторной факторизации СЛАУ
+        I120,U120 = mdl.CalcCascade([(q3,'A0'), (p7,1), (p7,2)])
+        I120,U120 = mdl.CalcCascade([[(q3,'A0r',2.0),(p5,'N0')], (p7,1), [(p7,2),(q3,'AB0')]])
+        где stages - список стадий, каждая стадия - действие или список действий, которые
+            добавляются к состоянию схемы предыдущей стадии:
+            (q,SC) или (q,SC,r) - КЗ вида SC в узле q (см. N), r - переходное сопротивление;
+            (p,SC) - обрыв вида SC на ветви p;
+            (p,1), (p,2) - отключение ветви p от 1-ого или 2-ого узла, (p,0) - от обоих узлов
+        Несимметрии модели (объекты N) учитываются на всех стадиях;
+        Ветвь, отключенная от одного узла, остается подключенной к другому узлу, ее ток
+        замыкается через B/2 отключенного конца (при B = 0 ток ветви равен нулю), ветвь,
+        отключенная от обоих узлов, имеет нулевой ток, ее Э.Д.С. и взаимоиндукции с другими
+        ветвями не учитываются; части схемы, потерявшие связь с землей и источниками,
+        принимаются отключенными (см. mdl.CalcContingency())
+        Каждая стадия учитывается низкоранговой поправкой к сохраненной факторизации схемы,
+        столбцы K^-1 изменяемых строк вычисляются однократно для всех стадий (см. Net.contingency())
+        Возвращает I120, U120 - массивы (len(stages),nf,3) токов и напряжений в симметричных
+        составляющих для nf несимметрий, заданных в stages, в порядке их задания:
+        для КЗ - токи КЗ и напряжения в узле КЗ, для обрывов - токи ветви и напряжения обрыва,
+        на стадиях до задания несимметрии - нули;
+        Результаты всех стадий сохраняются в mdl.X размерностью (3*(np+nq+nn),len(stages))
+        как результаты расчета вариантов (см. mdl.CalcScenarios()), для стадий
+        с вырожденной СЛАУ - nan'''
+        listn = [kn for kn in self.bn if kn.SC != 'N0']
+        pn = set(kn.qp.id-1 for kn in listn if isinstance(kn.qp, P))
+        lf = []
+        nf = []
+        po = {}
+        outs = []
+        ends = []
+        for stage in stages:
+            if isinstance(stage, tuple) and stage and isinstance(stage[0], (Q,P)):
+                stage = [stage]
+            for act in stage:
+                el = act[0]
+                if not isinstance(el, (Q,P)) or not el.model is self:
+                    raise TypeError('Ошибка при расчете каскадного развития аварии', '\n',
+                                    'Действие стадии должно начинаться с узла или ветви модели!')
+                if isinstance(el, P) and not isinstance(act[1], str):
+                    if not act[1] in (0, 1, 2):
+                        raise ValueError('Ошибка при расчете каскадного развития аварии', '\n',
+                                         'Сторона отключения ветви должна быть 0, 1 или 2!')
+                    end = po.setdefault(el.id-1, [False, False])
+                    end[0] |= act[1] != 2
+                    end[1] |= act[1] != 1
+                    continue
+                if not act[1] in (mnq if isinstance(el, Q) else mnp):
+                    raise TypeError('Неизвестный вид несимметрии!')
+                if isinstance(el, P) and act[1] != 'N0':
+                    pn.add(el.id-1)
+                lf.append((el, act[1], act[2] if len(act) > 2 else 0))
+            if pn & set(po):
+                raise ValueError('Ошибка при расчете каскадного развития аварии', '\n',
+                                 'Отключение ветви с обрывом невозможно!')
+            outs.append(np.array(list(po), dtype=np.int64))
+            ends.append(np.array(list(po.values()), dtype=bool).reshape(-1,2))
+            nf.append(len(lf))
+        net = self.getnet()
+        if net.LU is None:
+            raise ValueError('Ошибка при расчете каскадного развития аварии', '\n',
+                             'Факторизация схемы замещения сети без несимметрий невозможна!')
+        arrn = dict(isq=np.array([isinstance(el, Q) for el,_,_ in lf], dtype=bool),
+                    ne=np.array([el.id-1 for el,_,_ in lf], dtype=np.int64),
+                    SC=np.array([sc for _,sc,_ in lf], dtype=object),
+                    r=np.array([r for _,_,r in lf], dtype=np.double))
+        act = [np.arange(len(listn)+len(lf)) < len(listn)+k for k in nf]
+        self.X,Y = net.contingency(outs, ends, arrn, act)
+        #Токи и напряжения несимметрий стадий: для КЗ - y - токи КЗ, для обрывов - напряжения обрывов
+        y = np.moveaxis(Y[3*len(listn):].reshape(len(lf), 3, -1), 2, 0)
+        x = np.moveaxis(self.resarr(np.where(arrn['isq'], arrn['ne'] + self.np, arrn['ne'])), 2, 0)
+        isq = arrn['isq'][:,None]
+        fa = (np.arange(len(lf)) < np.array(nf)[:,None])[:,:,None]
+        I120 = np.where(fa, np.where(isq, y, x), 0)
+        U120 = np.where(fa, np.where(isq, x, y), 0)
+        return I120, U120
+
+    def CalcLineFault(self, p, x, SC, r=0, full=True):
+        '''Расчет промежуточного КЗ на ветви (линии) без редактирования модели (разделения
+        ветви и создания узла места КЗ), в том числе для множества мест КЗ по одной факторизации
+        I120,U120,I1,I2 = mdl.CalcLineFault(p, 0.5, 'A0')
+        I120,U120,I1,I2 = mdl.CalcLineFault(p, np.linspace(0.01, 0.99, 99), 'ABr', r=5.0)
+        где p - ветвь без Э.Д.С. и трансформации (T=(1,0)), на которой нет несимметрий;
+            x - место КЗ - доля длины ветви от 1-ого узла (0 < x < 1), число или массив;
+            SC, r - вид КЗ и переходное сопротивление (см. N);
+            full - при False результаты расчета по всей сети (mdl.X) не формируются
+        Участки ветви от 1-ого узла до места КЗ и от места КЗ до 2-ого узла имеют сопротивления
+        x*Z и (1-x)*Z, поперечные проводимости x*B и (1-x)*B, взаимоиндукции с другими ветвями
+        x*M и (1-x)*M; Несимметрии модели учитываются вместе с промежуточным КЗ
+        Расчет выполняется окаймлением сохраненной факторизации схемы с поправкой строк,
+        линейно зависящих от x (см. Net.linefault())
+        Возвращает массивы (len(x),3) в симметричных составляющих:
+            I120 - токи КЗ, U120 - напряжения в месте КЗ,
+            I1, I2 - токи ветви со стороны 1-ого и 2-ого узлов (с учетом x*B/2 и (1-x)*B/2,
+            см. p.q1I120, p.q2I120), для числа x - массивы (3,)
+        Результаты для всех x сохраняются в mdl.X размерностью (3*(np+nq+nn),len(x)) как
+        результаты расчета вариантов (см. mdl.CalcScenarios()), переменная ветви p в mdl.X -
+        ток участка от 1-ого узла до места КЗ, при full=False mdl.X не изменяется'''
+        if not isinstance(p, P) or not p.model is self:
+            raise TypeError('Ошибка при расчете промежуточного КЗ', '\n',
+                            'Аргумент p должен быть ветвью модели!')
+        xs = np.asarray(x, dtype=np.double)
+        if np.any(xs <= 0) or np.any(xs >= 1):
+            raise ValueError('Ошибка при расчете промежуточного КЗ на ветви №', p.id, ' - ', p.name, '\n',
+                             'Место КЗ должно находиться в пределах 0 < x < 1!')
+        if not SC in mnq:
+            raise TypeError('Неизвестный вид КЗ!')
+        if tuple(p.T) != (1, 0) or np.any(np.asarray(p.E) != 0):
+            raise ValueError('Ошибка при расчете промежуточного КЗ на ветви №', p.id, ' - ', p.name, '\n',
+                             'Ветвь не должна иметь Э.Д.С. и трансформации!')
+        if any(kn.qp is p for kn in self.bn):
+            raise ValueError('Ошибка при расчете промежуточного КЗ на ветви №', p.id, ' - ', p.name, '\n',
+                             'Промежуточное КЗ на ветви с обрывом невозможно!')
+        net = self.getnet()
+        if net.LU is None:
+            raise ValueError('Ошибка при расчете промежуточного КЗ', '\n',
+                             'Факторизация схемы замещения сети без несимметрий невозможна!')
+        X,z,xj = net.linefault(p.id-1, xs, SC, r, full)
+        if full:
+            self.X = X
+        B2 = net.arr['B'][p.id-1]/2
+        xv = xs.reshape(-1,1)
+        I1 = xj[:,0:3] + xj[:,3:6] * xv * B2
+        I2 = -z[:,3:6] + xj[:,6:9] * (1 - xv) * B2
+        res = (z[:,6:9], z[:,0:3], I1, I2)
+        return tuple(v[0] for v in res) if xs.ndim == 0 else res
+
+    def getnet(self):
+        '''Служебный метод, возвращает сохраненную схему замещения сети (объект Net),
+        при ее отсутствии или несоответствии составу несимметрий 'N0' формирует ее заново,
+        изменения параметров отредактированных элементов mdl.dirty учитываются поправкой
+        к сохраненной факторизации (Net.update()), если их количество не превышает mdl.nupdate'''
+        if self.net is not None and self.dirty:
+            if not self.net.valid() or not self.net.update(self.dirty):
+                self.net = None
+        if self.net is None or not self.net.valid():
+            self.net = Net(self)
+        self.dirty = []
+        return self.net
+
+    def SweepN(self, listq, listsc, nproc=None):
+        '''Расчет КЗ всех заданных видов во всех заданных узлах без создания
+        объектов несимметрий и без повторной факторизации матрицы СЛАУ
+        I120,U120 = mdl.SweepN(listq, listsc)
+        I120,U120 = mdl.SweepN(listq, listsc, nproc=8)
+        где:
+           listq - список объектов узлов, в которых рассчитываются КЗ
+           listsc - список видов КЗ, для КЗ через переходное сопротивление
+                    задается кортеж (вид КЗ, r), например
+                    ['A0', 'BC', 'BC0', 'ABC', ('A0r', 2.0), ('BCr', 5.0)]
+           nproc - количество процессов, в которых параллельно рассчитываются КЗ
+                   (None или 1 - расчет в текущем процессе), матрица схемы передается
+                   процессам через разделяемую память и факторизуется в каждом из них,
+                   при запуске процессов методом spawn (Windows, macOS) вызов должен
+                   выполняться в блоке if __name__ == '__main__'
+        Возвращает матрицы numpy размерностью (len(listq), len(listsc), 3):
+           I120 - токи КЗ прямой, обратной и нулевой последовательностей
+           U120 - напряжения в узле КЗ прямой, обратной и нулевой последовательностей
+        Фазные величины можно получить матричным умножением, например I120 @ Ms2f.T
+
+        Для каждого узла по сохраненной факторизации схемы (см. mdl.Calc()) определяется
+        матрица 3x3 собственного сопротивления узла в симметричных составляющих и
+        напряжение узла в режиме без КЗ, после чего граничные условия всех видов КЗ
+        (шаблоны mnq) решаются одновременно для всех узлов.
+        Несимметрии модели, за исключением 'N0', при расчете не учитываются.'''
+        return self.sweepn(listq, listsc, nproc=nproc)
+
+    def SweepNStore(self, path, listq, listsc, keepq=None, keepp=None, dtype='complex128', nproc=None):
+        '''Расчет КЗ всех заданных видов во всех заданных узлах (аналогично mdl.SweepN())
+        с сохранением напряжений узлов и токов ветвей каждого расчетного случая в
+        хранилище на диске на основе np.memmap (см. SweepStore), объем которого может
+        превышать объем оперативной памяти
+        store = mdl.SweepNStore('sweep', listq, listsc)
+        store = mdl.SweepNStore('sweep', listq, listsc, keepq=[], keepp=[p1,p2], dtype='complex64')
+        где:
+           path - папка хранилища (создается при необходимости, файлы хранилища перезаписываются)
+           listq, listsc - см. mdl.SweepN(), расчетные случаи нумеруются в порядке
+                    узлов listq, а для каждого узла - в порядке видов КЗ listsc
+           keepq - список узлов, напряжения которых сохраняются (None - все узлы модели)
+           keepp - список ветвей, токи которых (от 1-ого ко 2-ому узлу без учета B)
+                   сохраняются (None - все ветви модели)
+           dtype - тип хранимых величин 'complex128' или 'complex64'
+           nproc - количество процессов (см. mdl.SweepN()), каждый из которых
+                   записывает результаты своих расчетных случаев непосредственно в хранилище
+        Возвращает объект SweepStore, открытый только для чтения, токи КЗ и напряжения
+        в узлах КЗ сохраняются всегда; величины хранятся в симметричных составляющих'''
+        if not np.dtype(dtype) in (np.complex64, np.complex128):
+            raise ValueError('Ошибка при расчете КЗ в узлах модели', '\n',
+                             'Недопустимый тип хранимых величин dtype = {}!'.format(dtype))
+        keepq = self.bq if keepq is None else list(keepq)
+        keepp = self.bp if keepp is None else list(keepp)
+        nsc = len(listsc)
+        SC = [sc[0] if isinstance(sc, tuple) else sc for sc in listsc]
+        r = [sc[1] if isinstance(sc, tuple) else 0.0 for sc in listsc]
+        os.makedirs(path, exist_ok=True)
+        np.savez(os.path.join(path, 'index.npz'),
+                 q=np.repeat(np.array([kq.id for kq in listq], dtype=np.int64), nsc),
+                 name=np.repeat(np.array([kq.name for kq in listq], dtype=str), nsc),
+                 SC=np.tile(np.array(SC, dtype=str), len(listq)),
+                 r=np.tile(np.array(r, dtype=np.double), len(listq)),
+                 listsc=np.array(SC, dtype=str), listr=np.array(r, dtype=np.double),
+                 keepq=np.array([kq.id for kq in keepq], dtype=np.int64),
+                 keepp=np.array([kp.id for kp in keepp], dtype=np.int64),
+                 dtype=np.dtype(dtype).name)
+        store = SweepStore(path, 'w+')
+        self.sweepn(listq, listsc, store, nproc)
+        store.flush()
+        return SweepStore(path)
+
+    def sweepn(self, listq, listsc, store=None, nproc=None):
+        '''Служебный метод, расчет КЗ для mdl.SweepN(), mdl.SweepNStore(): по группам узлов
+        определяется отклик схемы на единичные токи в узлах, по нему - матрицы 3x3
+        собственных сопротивлений узлов и токи КЗ, а при заданном store (SweepStore) -
+        напряжения узлов и токи ветвей всех расчетных случаев группы, которые
+        записываются в хранилище; при nproc > 1 группы узлов рассчитываются
+        в nproc процессах (см. mdl.sweepnp())'''
+        net = self.getnet()
+        if net.LU is None:
+            raise ValueError('Ошибка при расчете КЗ в узлах модели', '\n',
+                             'Матрица схемы замещения сети вырождена!')
+        nsc = len(listsc)
+        Cu = np.zeros((nsc,3,3), dtype=np.cdouble)
+        Cy = np.zeros((nsc,3,3), dtype=np.cdouble)
+        for k,sc in enumerate(listsc):
+            if isinstance(sc, tuple):
+                sc,r = sc
             else:
-                Kt2 = np.conj(Kt1)
-            Kt0 = Kt1
-
-            if isinstance(kp.q1, Q):
-                qId = 3*(self.np + kp.q1.id - 1)#Здесь и далее номер строки, столбца относящегося к прямой последовательности узла
-                lqId = qId+arr012#[qId,qId+1,qId+2]
-                qbId = 3*(kp.q1.id-1)
-                #Cуммирование B/2 подключенных ветвей к узлу
-                cdata[qbId:qbId+3] -= np.array(kp.B)/2
-                #Запись матриц соединений A и At в разреженную матрицу (для q1 -> -1)
-                Dij = 6
-                ri[ij:ij+Dij] = np.concatenate((lpId,lqId))#[pId,pId+1,pId+2,qId,qId+1,qId+2]
-                ci[ij:ij+Dij] = np.concatenate((lqId,lpId))#[qId,qId+1,qId+2,pId,pId+1,pId+2]
-                cdata[ij:ij+Dij] = np.concatenate((arr_111,arr_111))#[-1.0,-1.0,-1.0,-1.0,-1.0,-1.0]
-                ij += Dij
-
-            if isinstance(kp.q2, Q):
-                qId = 3*(self.np + kp.q2.id - 1)
-                lqId = qId+arr012#[qId,qId+1,qId+2]
-                qbId = 3*(kp.q2.id-1)
-                #Cуммирование B/2 подключенных ветвей к узлу
-                cdata[qbId:qbId+3] -= np.array(kp.B)/2
-                #Запись матриц соединений A и At в разреженную матрицу (для q2 -> 1 или Кт для трансформаторов)
-                Dij = 6
-                ri[ij:ij+Dij] = np.concatenate((lpId,lqId))#[pId,pId+1,pId+2,qId,qId+1,qId+2]
-                ci[ij:ij+Dij] = np.concatenate((lqId,lpId))#[qId,qId+1,qId+2,pId,pId+1,pId+2]
-                cdata[ij:ij+Dij] = np.array([Kt2,Kt1,Kt0,Kt1,Kt2,Kt0])
-                ij += Dij
-
-        for km in self.bm: # Перебор всех взаимоиндукций
-            pId1 = 3*(km.p1.id-1)+2
-            pId2 = 3*(km.p2.id-1)+2
-            #Запись сопротивлений взаимоиндукции в разреженную матрицу
-            Dij = 2
-            ri[ij:ij+Dij] = np.array([pId1,pId2])
-            ci[ij:ij+Dij] = np.array([pId2,pId1])
-            cdata[ij:ij+Dij] = np.array([km.M12,km.M21])
-            ij += Dij
-
-        for kq in self.bq:# Перебор всех узлов
-            qId = 3*(self.np + kq.id-1)
-            qbId = 3*(kq.id-1)
-            cdata[qbId:qbId+3] -= np.array(kq.Y)
-            RHS[qId:qId+3] = -np.array(kq.J)
-
-        for kn in self.bn: # Перебор всех несимметрий
-            nId = 3*(self.nq+self.np+kn.id-1)#Здесь и далее номер строки, столбца относящегося к несимметрии
-            lnId = nId + arr012
-            if isinstance(kn.qp, Q): # Короткие замыкания
-                qId = 3*(self.np+kn.qp.id-1)
-                lqId = qId + arr012
-                #Запись в разреженную матрицу в уравнения по 1-ому закону Кирхгофа наличие КЗ в узле
-                Dij = 3
-                ri[ij:ij+Dij] = lqId#[qId,qId+1,qId+2]
-                ci[ij:ij+Dij] = lnId#[nId,nId+1,nId+2]
-                cdata[ij:ij+Dij] = arr_111#[-1.0,-1.0,-1.0]
-                ij += Dij
-                if kn.SC=='N0' : #Заземление нейтрали Ik1=0;Ik2=0;Uk0=0
-                    Dij = 3
-                    ri[ij:ij+Dij] = lnId#[nId,nId+1,nId+2]
-                    ci[ij:ij+Dij] = np.array([nId,nId+1,qId+2])
-                    cdata[ij:ij+Dij] = vA#[1.0,1.0,1.0]
-                    ij += Dij
-                elif kn.SC in ('A0','B0','C0'):
-                    #Запись в разреженную матрицу граничных условий для КЗ
-                    Dij = 9
-                    ri[ij:ij+Dij] = nId + np.concatenate((arr000,arr111,arr222))#[nId,nId,nId,nId+1,nId+1,nId+1,nId+2,nId+2,nId+2]
-                    ci[ij:ij+Dij] = np.concatenate((lqId,lnId,lnId))#[qId,qId+1,qId+2,nId,nId+1,nId+2,nId,nId+1,nId+2]
-                    if kn.SC == 'A0':# Uka=0;Ikb=0;Ikc=0
-                        cdata[ij:ij+Dij] = vABC#[1.0,1.0,1.0,a2,a,1.0,a,a2,1.0]
-                    elif kn.SC == 'B0':# Ukb=0;Ikc=0;Ika=0
-                        cdata[ij:ij+Dij] = vBCA#[a2,a,1.0,1.0,1.0,1.0,a,a2,1.0]
-                    else : # 'C0' # Ukc=0;Ika=0;Ikb=0
-                        cdata[ij:ij+Dij] = vCAB#[a,a2,1.0,1.0,1.0,1.0,a2,a,1.0]
-                    ij += Dij
-                elif kn.SC in ('A0r','B0r','C0r'):
-                    Dij = 12
-                    ri[ij:ij+Dij] = nId + np.concatenate((arr000,arr111,arr222,arr000))#[nId,nId,nId,nId+1,nId+1,nId+1,nId+2,nId+2,nId+2,nId,nId,nId]
-                    ci[ij:ij+Dij] = np.concatenate((lqId,lnId,lnId,lnId))#[qId,qId+1,qId+2,nId,nId+1,nId+2,nId,nId+1,nId+2,nId,nId+1,nId+2]
-                    if kn.SC == 'A0r':# Uka-r*Ika=0;Ikb=0;Ikc=0
-                        cdata[ij:ij+Dij] = np.concatenate((vABC, -kn.r*vA))#np.array(vA+vB+vC+[-kn.r,-kn.r,-kn.r])
-                    elif kn.SC == 'B0r':# Ukb-r*Ikb=0;Ikc=0;Ika=0
-                        cdata[ij:ij+Dij] = np.concatenate((vBCA, -kn.r*vB))#np.array(vB+vC+vA+[-kn.r*a2,-kn.r*a,-kn.r])#
-                    else : # 'C0r'# Ukc-r*Ikc=0;Ika=0;Ikb=0
-                        cdata[ij:ij+Dij] = np.concatenate((vCAB, -kn.r*vC))#np.array(vC+vA+vB+[-kn.r*a,-kn.r*a2,-kn.r])
-                    ij += Dij
-                elif kn.SC in ('AB','BC','CA'):
-                    Dij = 5
-                    ri[ij:ij+Dij] = nId + np.array([0,0,1,1,2])
-                    ci[ij:ij+Dij] = np.array([qId,qId+1,nId,nId+1,nId+2])
-                    if kn.SC == 'AB':# Uka-Ukb=0;Ika+Ikb=0;Ikc=0
-                        cdata[ij:ij+Dij] = np.array([1.0-a2,1.0-a,1.0+a2,1.0+a,1.0])
-                    elif kn.SC == 'BC':# Ukb-Ukc=0;Ikb+Ikc=0;Ika=0
-                        cdata[ij:ij+Dij] = np.array([a2-a,a-a2,a2+a,a+a2,1.0])
-                    else : # 'CA'# Ukc-Uka=0;Ikc+Ika=0;Ikb=0
-                        cdata[ij:ij+Dij] = np.array([a-1.0,a2-1.0,a+1.0,a2+1.0,1.0])
-                    ij += Dij
-                elif kn.SC in ('ABr','BCr','CAr'):
-                    Dij = 7
-                    ri[ij:ij+Dij] = nId + np.array([0,0,1,1,2,0,0])
-                    ci[ij:ij+Dij] = np.array([qId,qId+1,nId,nId+1,nId+2,nId,nId+1])
-                    if kn.SC == 'ABr':# Uka-Ukb-r*Ika=0;Ika+Ikb=0;Ikc=0
-                        cdata[ij:ij+Dij] = np.array([1.0-a2,1.0-a,1.0+a2,1.0+a,1.0,-kn.r,-kn.r])
-                    elif kn.SC == 'BCr':# Ukb-Ukc-r*Ikb=0;Ikb+Ikc=0;Ika=0
-                        cdata[ij:ij+Dij] = np.array([a2-a,a-a2,a2+a,a+a2,1.0,-kn.r*a2,-kn.r*a])
-                    else : # 'CAr'# Ukc-Uka-r*Ikc=0;Ikc+Ika=0;Ikb=0
-                        cdata[ij:ij+Dij] = np.array([a-1.0,a2-1.0,a+1.0,a2+1.0,1.0,-kn.r*a,-kn.r*a2])
-                    ij += Dij
-                elif kn.SC in ('AB0','BC0','CA0'):
-                    Dij = 9
-                    ri[ij:ij+Dij] = nId + np.concatenate((arr000,arr111,arr222))#np.array([nId,nId,nId,nId+1,nId+1,nId+1,nId+2,nId+2,nId+2])
-                    ci[ij:ij+Dij] = np.concatenate((lqId,lqId,lnId))#np.array([qId,qId+1,qId+2,qId,qId+1,qId+2,nId,nId+1,nId+2])
-                    if kn.SC == 'AB0':# Uka=0;Ukb=0;Ikc=0
-                        cdata[ij:ij+Dij] = vABC#[1.0,1.0,1.0,a2,a,1.0,a,a2,1.0]
-                    elif kn.SC == 'BC0':# Ukb=0;Ukc=0;Ika=0
-                        cdata[ij:ij+Dij] = vBCA#[a2,a,1.0,a,a2,1.0,1.0,1.0,1.0]
-                    else : # 'CA0'# Ukc=0;Uka=0;Ikb=0
-                        cdata[ij:ij+Dij] = vCAB#[a,a2,1.0,1.0,1.0,1.0,a2,a,1.0]
-                    ij += Dij
-                elif kn.SC == 'ABC':# Uk1=0;Uk2=0;Ik0=0
-                    Dij = 3
-                    ri[ij:ij+Dij] = lnId#[nId,nId+1,nId+2]
-                    ci[ij:ij+Dij] = np.array([qId,qId+1,nId+2])
-                    cdata[ij:ij+Dij] = vA#[1.0,1.0,1.0]
-                    ij += Dij
-                elif kn.SC == 'ABC0' : # Uk1=0;Uk2=0;Uk0=0
-                    Dij = 3
-                    ri[ij:ij+Dij] = lnId#[nId,nId+1,nId+2]
-                    ci[ij:ij+Dij] = lqId#[qId,qId+1,qId+2]
-                    cdata[ij:ij+Dij] = vA#[1.0,1.0,1.0]
-                    ij += Dij
-                else :
-                    raise TypeError('Неизвестный вид КЗ!')
-
-            elif  isinstance(kn.qp, P): #Обрывы
-                pId = 3*(kn.qp-1)
-                lpId = pId+arr012
-                #Запись в разреженную матрицу в уравнения по 2-ому закону Кирхгофа о наличии обрыва на ветви
-                Dij = 3
-                ri[ij:ij+Dij] = lpId#[pId,pId+1,pId+2]
-                ci[ij:ij+Dij] = lnId#[nId,nId+1,nId+2]
-                cdata[ij:ij+Dij] = vA#[1.0,1.0,1.0]
-                ij += Dij
-                if kn.SC == 'N0': #Обрыв ветви по нулевой последовательности dU1=0;dU2=0;I0=0
-                    Dij = 3
-                    ri[ij:ij+Dij] = lnId#[nId, nId+1, nId+2]
-                    ci[ij:ij+Dij] = np.array([nId, nId+1, pId+2])
-                    cdata[ij:ij+Dij] = vA#[1.0,1.0,1.0]
-                    ij += Dij
-                elif kn.SC in ('A0','B0','C0'):
-                    Dij = 9
-                    ri[ij:ij+Dij] = nId + np.concatenate((arr000,arr111,arr222))#[nId,nId,nId,nId+1,nId+1,nId+1,nId+2,nId+2,nId+2]
-                    ci[ij:ij+Dij] = np.concatenate((lpId,lnId,lnId))#[pId,pId+1,pId+2,nId,nId+1,nId+2,nId,nId+1,nId+2]
-                    if kn.SC == 'A0':# Ia=0;dUb=0;dUc=0
-                        cdata[ij:ij+Dij] = vABC#[1.0,1.0,1.0,a2,a,1.0,a,a2,1.0]
-                    elif kn.SC=='B0':# Ib=0;dUc=0;dUa=0
-                        cdata[ij:ij+Dij] = vBCA#[a2,a,1.0,a,a2,1.0,1.0,1.0,1.0]
-                    else : # 'C0'# Ic=0;dUa=0;dUb=0
-                        cdata[ij:ij+Dij] = vCAB#[a,a2,1.0,1.0,1.0,1.0,a2,a,1.0]
-                    ij += Dij
-                elif kn.SC in ('AB','BC','CA'):
-                    Dij = 9
-                    ri[ij:ij+Dij] = nId + np.concatenate((arr000,arr111,arr222))#[nId,nId,nId,nId+1,nId+1,nId+1,nId+2,nId+2,nId+2]
-                    ci[ij:ij+Dij] = np.concatenate((lpId,lpId,lnId))#[pId,pId+1,pId+2,pId,pId+1,pId+2,nId,nId+1,nId+2]
-                    if kn.SC == 'AB':# Ia=0;Ib=0;dUc=0
-                        cdata[ij:ij+Dij] = vABC#[1.0,1.0,1.0,a2,a,1.0,a,a2,1.0]
-                    elif kn.SC == 'BC':# Ib=0;Ic=0;dUa=0
-                        cdata[ij:ij+Dij] = vBCA#[a2,a,1.0,a,a2,1.0,1.0,1.0,1.0]
-                    else : # 'CA'# Ic=0;Ia=0;dUb=0
-                        cdata[ij:ij+Dij] = vCAB#[a,a2,1.0,1.0,1.0,1.0,a2,a,1.0]
-                    ij += Dij
-                elif kn.SC == 'ABC'  : # I1=0;I2=0;I0=0
-                    Dij = 3
-                    ri[ij:ij+Dij] = lnId#[nId, nId+1, nId+2]
-                    ci[ij:ij+Dij] = lpId#[pId, pId+1, pId+2]
-                    cdata[ij:ij+Dij] = vA#[1.0,1.0,1.0]
-                    ij += Dij
-                else: raise TypeError('Неизвестный вид обрыва!')
-            else: raise TypeError('Неизвестный вид несимметрии!')
-        #Формирование CSC разреженной матрицы (Разреженный столбцовый формат)
-        LHS = csc_matrix((cdata[0:ij], (ri[0:ij], ci[0:ij])), shape=(n, n))
-        #решение разреженной СЛАУ с помощью функции из состава scipy
-        self.X = spsolve(LHS,RHS)
+                r = 0
+            if not sc in mnq:
+                raise TypeError('Неизвестный вид КЗ!')
+            Cu[k],Cy[k],Cr = NMatrix(mnq[sc])
+            Cy[k] += r*Cr
+        qId = np.array([kq.id-1 for kq in listq], dtype=np.int64)
+        lqId = 3*(self.np+qId)[:,None] + arr012
+        x0 = net.solve(net.rhs())
+        I120 = np.zeros((len(qId),nsc,3), dtype=np.cdouble)
+        U120 = np.zeros((len(qId),nsc,3), dtype=np.cdouble)
+        lkeep = None
+        if store is not None:
+            #Переменные СЛАУ сохраняемых узлов и ветвей
+            lkeep = np.concatenate((3*(self.np+store.keepq-1)[:,None] + arr012,
+                                    3*(store.keepp-1)[:,None] + arr012)).ravel()
+        if nproc is not None and nproc > 1:
+            self.sweepnp(net, x0, lqId, Cu, Cy, lkeep, store, I120, U120, nproc)
+            return I120, U120
+        nch = net.chunk // 3
+        for k in range(0, len(qId), nch):
+            Ik,Uk,Xk = SweepChunk(net.solve, net.n, x0, lqId[k:k+nch], Cu, Cy, lkeep)
+            I120[k:k+nch] = Ik
+            U120[k:k+nch] = Uk
+            if store is not None:
+                store.write(k*nsc, Ik, Uk, Xk)
+        return I120, U120
+
+    def sweepnp(self, net, x0, lqId, Cu, Cy, lkeep, store, I120, U120, nproc):
+        '''Служебный метод, расчет КЗ mdl.sweepn() в nproc процессах: матрица K схемы,
+        решение без КЗ x0 и массивы результатов I120, U120 размещаются в разделяемой памяти,
+        каждый процесс один раз факторизует K (NetLU()) с сохраненными перестановками и
+        рассчитывает КЗ для получаемых групп узлов (SweepInit(), SweepTask()), результаты
+        записываются в разделяемые массивы, а при заданном store - непосредственно в хранилище'''
+        K = csc_matrix(net.K)
+        arrs = dict(data=K.data, indices=K.indices, indptr=K.indptr, x0=x0, I120=I120, U120=U120)
+        if store is not None:
+            store.flush()
+        shms = dict()
+        try:
+            for key,val in arrs.items():
+                shms[key] = SharedMemory(create=True, size=max(val.nbytes, 1))
+                np.ndarray(val.shape, dtype=val.dtype, buffer=shms[key].buf)[...] = val
+            spec = dict(shm={key : (shms[key].name, val.shape, val.dtype.str) for key,val in arrs.items()},
+                        n=net.n, nP=3*self.np, zp=net.zp, arr=net.arr, cache=self.pattern.perm,
+                        setup=net.setup(), lqId=lqId, Cu=Cu, Cy=Cy, lkeep=lkeep,
+                        path=None if store is None else store.path, chunk=net.chunk // 3)
+            with ProcessPoolExecutor(nproc, initializer=SweepInit, initargs=(spec,)) as pool:
+                list(pool.map(SweepTask, range(0, len(lqId), spec['chunk'])))
+            I120[...] = np.ndarray(I120.shape, dtype=I120.dtype, buffer=shms['I120'].buf)
+            U120[...] = np.ndarray(U120.shape, dtype=U120.dtype, buffer=shms['U120'].buf)
+        finally:
+            for shm in shms.values():
+                shm.close()
+                shm.unlink()
+
+    def CalcFull(self):
+        '''Формирование полной разреженной СЛАУ (включая все несимметрии) и ее решение
+        без использования сохраненной факторизации решателем mdl.Setup(solver=...),
+        по умолчанию с помощью spsolve(LHS,RHS)
+        mdl.CalcFull()'''
+        n = 3*(self.nq+self.np+self.nn)# Размерность СЛАУ
+        arr = self.getarr()
+        rr = self.getr(self.bn)
+        X = np.zeros((n, rr.shape[1]), dtype=np.cdouble)
+        #При задании r несимметрий массивами СЛАУ формируется и решается для каждого варианта r
+        for k in range(rr.shape[1]):
+            arr['r'] = rr[:,k]
+            ri,ci,cdata,RHS = self.formslae(arr)
+            #Формирование CSC разреженной матрицы (Разреженный столбцовый формат)
+            LHS = csc_matrix((cdata, (ri, ci)), shape=(n, n))
+            if self.check:
+                self.checkrank(LHS, np.arange(n), self.bn)
+            #решение разреженной СЛАУ, при вырожденной матрице - с помощью spsolve из состава scipy
+            try:
+                X[:,k] = Factorize(LHS, self.solver, self.permc_spec, reuse=False).solve(RHS)
+            except RuntimeError:
+                X[:,k] = spsolve(LHS, RHS, permc_spec=self.permc_spec)
+        self.X = X[:,0] if rr.shape[1] == 1 else X
         return self.X
 
+    def BenchSolvers(self, listsolver=None, repeat=1, apply=False):
+        '''Сравнение быстродействия решателей СЛАУ на расчете mdl.Calc() данной модели
+        bench = mdl.BenchSolvers()
+        bench = mdl.BenchSolvers(listsolver=[('splu','COLAMD'), ('umfpack',None)], repeat=3)
+        где:
+           listsolver - список кортежей (solver, permc_spec), по умолчанию все решатели
+                        реестра msolver, для SuperLU - с перестановками 'COLAMD',
+                        'MMD_ATA' и 'MMD_AT_PLUS_A', каждый решатель настраивается
+                        mdl.Setup(solver=solver, permc_spec=permc_spec) от исходных
+                        настроек модели (permc_spec=None - перестановка модели)
+           repeat - количество повторов расчета, учитывается наименьшее время
+           apply - при True модель настраивается на наиболее быстрый решатель
+        Возвращает список кортежей (время расчета в секундах, solver, permc_spec),
+        упорядоченный по возрастанию времени, первый элемент - наиболее быстрый решатель.
+        Время включает факторизацию схемы замещения сети и учет несимметрий, способ
+        факторизации mdl.Setup(engine=...) сохраняется. Результаты расчета mdl.X
+        и настройки модели (при apply=False) восстанавливаются.'''
+        if listsolver is None:
+            listsolver = []
+            for solver in msolver:
+                if solver in ('splu', 'spsolve'):
+                    listsolver += [(solver, pc) for pc in ('COLAMD', 'MMD_ATA', 'MMD_AT_PLUS_A')]
+                else:
+                    listsolver.append((solver, None))
+        X, solver0, permc_spec0 = self.X, self.solver, self.permc_spec
+        bench = []
+        try:
+            for solver,permc_spec in listsolver:
+                self.solver, self.permc_spec = solver0, permc_spec0
+                self.Setup(solver=solver, permc_spec=permc_spec)
+                dt = np.inf
+                for _ in range(repeat):
+                    self.reset()
+                    t = time.perf_counter()
+                    self.Calc()
+                    dt = min(dt, time.perf_counter() - t)
+                bench.append((dt, solver, permc_spec))
+        finally:
+            self.X, self.solver, self.permc_spec = X, solver0, permc_spec0
+            self.reset()
+        bench.sort(key=lambda b: b[0])
+        if apply and bench:
+            self.Setup(solver=bench[0][1], permc_spec=bench[0][2])
+        return bench
+
+    def Equivalent(self, listq, listp=(), desc=''):
+        '''Эквивалентирование сети относительно граничных узлов
+        mdl_eq,mapel = mdl.Equivalent(listq)
+        mdl_eq,mapel = mdl.Equivalent(listq, listp, desc='Эквивалент')
+        где:
+           listq - список граничных узлов
+           listp - список ветвей сохраняемой части сети (например, исследуемого района),
+                   по умолчанию - пустой, т.е. эквивалентируется вся сеть
+           desc - примечание новой модели
+        Возвращает новую модель mdl_eq и словарь mapel соответствия узлов, ветвей,
+        взаимоиндукций и несимметрий исходной модели (ключи) элементам новой модели.
+        Новая модель состоит из:
+           - граничных узлов и узлов сохраняемой части сети (с теми же наименованиями);
+           - копий ветвей listp, взаимоиндукций между ними и несимметрий в узлах и на ветвях
+             сохраняемой части сети, включая граничные узлы (кроме заземлений 'N0');
+           - эквивалента остальной (эквивалентируемой) части сети: ветвей 'Экв - имя узла'
+             от земли к каждому граничному узлу с сопротивлениями Zb[i,i] и Э.Д.С. Uxx[i]
+             и взаимоиндукций 'Экв - имя узла i <=> имя узла j' между ними с M12 = Zb[i,j],
+             M21 = Zb[j,i] по прямой, обратной и нулевой последовательностям,
+        где Zb - матрица собственных и взаимных сопротивлений эквивалентируемой части сети
+        относительно граничных узлов, Uxx - напряжения граничных узлов в режиме холостого хода.
+        Параметры Y, J и заземления 'N0' граничных узлов относятся к эквивалентируемой части
+        сети, прочие несимметрии эквивалентируемой части сети не учитываются. Граничные узлы,
+        не связанные с землей в схеме нулевой последовательности эквивалентируемой части сети,
+        эквивалентируются ветвями с обрывом 'N0' - 'Экв - N0 - имя узла'.
+        Ветви сохраняемой части сети не должны иметь взаимоиндукций с остальными ветвями,
+        а узлы, к которым подключены ветви обеих частей сети, должны быть граничными.'''
+        if len(listq) == 0:
+            raise ValueError('Ошибка при эквивалентировании сети', '\n',
+                             'Необходимо задать граничные узлы!')
+        for kq in listq:
+            if not isinstance(kq, Q) or not kq.model is self:
+                raise TypeError('Ошибка при эквивалентировании сети', '\n',
+                                'Граничные узлы должны быть объектами Q данной модели!')
+        for kp in listp:
+            if not isinstance(kp, P) or not kp.model is self:
+                raise TypeError('Ошибка при эквивалентировании сети', '\n',
+                                'Ветви сохраняемой части сети должны быть объектами P данной модели!')
+        qb = np.array([kq.id-1 for kq in listq], dtype=np.int64)
+        if np.unique(qb).size != qb.size:
+            raise ValueError('Ошибка при эквивалентировании сети', '\n',
+                             'Граничные узлы не должны повторяться!')
+        nb = qb.size
+        arr = self.getarr()
+        #Разделение ветвей, узлов, взаимоиндукций и несимметрий на сохраняемые и эквивалентируемые
+        pr = np.zeros(self.np, dtype=bool)
+        pr[np.array([kp.id-1 for kp in listp], dtype=np.int64)] = True
+        qq = np.stack((arr['q1'], arr['q2']), axis=1)
+        qr = np.zeros(self.nq, dtype=bool)
+        qe = np.zeros(self.nq, dtype=bool)
+        qr[qq[pr][qq[pr] >= 0]] = True
+        qe[qq[~pr][qq[~pr] >= 0]] = True
+        isb = np.zeros(self.nq, dtype=bool)
+        isb[qb] = True
+        bad = np.nonzero(qr & qe & ~isb)[0]
+        if bad.size:
+            raise ValueError('Ошибка при эквивалентировании сети', '\n',
+                             'Узлы {} связаны с обеими частями сети, но не заданы граничными!'.format(
+                             ', '.join(self.bq[k].name for k in bad[:10])))
+        bad = np.nonzero(isb & ~qe)[0]
+        if bad.size:
+            raise ValueError('Ошибка при эквивалентировании сети', '\n',
+                             'Граничные узлы {} не связаны с эквивалентируемой частью сети!'.format(
+                             ', '.join(self.bq[k].name for k in bad[:10])))
+        if (pr[arr['m1']] != pr[arr['m2']]).any():
+            raise ValueError('Ошибка при эквивалентировании сети', '\n',
+                             'Взаимоиндукции между ветвями сохраняемой и эквивалентируемой частей сети не допускаются!')
+        qkeep = isb | qr
+        qext = qe & (isb | ~qr)
+        isq,ne,SC = arr['isq'],arr['ne'],arr['SC']
+        isN0 = SC == 'N0'
+        iq = np.nonzero(isq)[0]
+        ip = np.nonzero(~isq)[0]
+        nr = np.zeros(self.nn, dtype=bool)
+        nr[iq] = qkeep[ne[iq]] & ~(isb[ne[iq]] & isN0[iq])
+        nr[ip] = pr[ne[ip]]
+        ne0 = np.zeros(self.nn, dtype=bool)
+        ne0[iq] = qext[ne[iq]]
+        ne0[ip] = ~pr[ne[ip]]
+        ne0 = np.nonzero(ne0 & isN0)[0]
+        #Схема замещения эквивалентируемой части сети, к узлам сохраняемой части сети
+        #подключаются проводимости Y=1, исключающие их из расчета
+        ie = np.nonzero(~pr)[0]
+        pidx = np.full(self.np, -1, dtype=np.int64)
+        pidx[ie] = np.arange(ie.size)
+        me = ~pr[arr['m1']]
+        arre = {key: arr[key][ie] for key in ('q1','q2','Z','E','B','Kt')}
+        arre.update({key: arr[key][me] for key in ('M12','M21','mseq')})
+        arre.update(m1=pidx[arr['m1'][me]], m2=pidx[arr['m2'][me]])
+        arre['Y'] = np.where(qext[:,None], arr['Y'], 1)
+        arre['J'] = np.where(qext[:,None], arr['J'], 0)
+        arre.update(isq=isq[ne0], ne=ne[ne0].copy(), SC=SC[ne0], r=arr['r'][ne0])
+        arre['ne'][~arre['isq']] = pidx[arre['ne'][~arre['isq']]]
+        ri,ci,cdata,b = self.formslae(arre)
+        n = b.size
+        K = csc_matrix((cdata, (ri, ci)), shape=(n, n))
+        lq = (3*(ie.size+qb)[:,None] + arr012).ravel()
+        try:
+            LU = Factorize(K, self.solver, self.permc_spec)
+            Yg = 0
+        except RuntimeError:
+            #Заземление граничных узлов проводимостью Yg для выделения граничных узлов,
+            #не связанных с землей в схеме какой-либо последовательности
+            Za = np.abs(arre['Z'])
+            Yg = 1/Za[Za > 0].mean() if (Za > 0).any() else 1.0
+            K = (K - csc_matrix((np.full(3*nb, Yg), (lq, lq)), shape=(n, n))).tocsc()
+            try:
+                LU = Factorize(K, self.solver, self.permc_spec)
+            except RuntimeError:
+                raise ValueError('Ошибка при эквивалентировании сети', '\n',
+                                 'Матрица схемы замещения эквивалентируемой части сети вырождена!')
+        #Напряжения холостого хода и отклик напряжений граничных узлов на токи J=1 в них
+        W = np.empty((3*nb, 1+3*nb), dtype=np.cdouble)
+        for k in range(0, 1+3*nb, Net.chunk):
+            jc = np.arange(k, min(k+Net.chunk, 1+3*nb))
+            Bj = np.zeros((n, jc.size), dtype=np.cdouble)
+            if k == 0:
+                Bj[:,0] = b
+            Bj[lq[jc[jc > 0]-1], np.nonzero(jc > 0)[0]] = -1
+            W[:,jc] = LU.solve(Bj)[lq]
+        Uxx = W[:,0].reshape(nb,3)
+        Ws = W[:,1:].reshape(nb,3,nb,3)
+        Zb = np.stack([Ws[:,k,:,k] for k in range(3)])
+        f0 = np.zeros(nb, dtype=bool)
+        if Yg:
+            #Проводимости эквивалентируемой части сети Yb = Zb^-1 - Yg, ток КЗ Ik = Zb^-1 * U
+            for k in range(3):
+                Zi = np.linalg.inv(Zb[k])
+                Yb = Zi - Yg*np.eye(nb)
+                Ik = Zi @ Uxx[:,k]
+                fk = np.abs(Yb).max(axis=1) <= 1e-8*Yg
+                if fk.any() and k < 2:
+                    raise ValueError('Ошибка при эквивалентировании сети', '\n',
+                                     'Граничные узлы не связаны с землей в схеме прямой или обратной последовательности!')
+                ok = ~fk
+                Zb[k] = 0
+                Uxx[:,k] = 0
+                try:
+                    Zb[k][np.ix_(ok, ok)] = np.linalg.inv(Yb[np.ix_(ok, ok)])
+                except np.linalg.LinAlgError:
+                    raise ValueError('Ошибка при эквивалентировании сети', '\n',
+                                     'Матрица проводимостей эквивалентируемой части сети вырождена!')
+                Uxx[ok,k] = Zb[k][np.ix_(ok, ok)] @ Ik[ok]
+                f0 = fk
+        #Формирование модели эквивалента
+        mdl = Model(desc)
+        mapel = dict()
+        for k in np.nonzero(qkeep)[0]:
+            kq = self.bq[k]
+            if isb[k]:
+                mapel[kq] = Q(mdl, kq.name, desc=kq.desc)
+            else:
+                mapel[kq] = Q(mdl, kq.name, Y=kq.Y, J=kq.J, desc=kq.desc)
+        mq = lambda q: mapel[q] if isinstance(q, Q) else 0
+        for kp in listp:
+            mapel[kp] = P(mdl, kp.name, mq(kp.q1), mq(kp.q2), kp.Z, E=kp.E, T=kp.T, B=kp.B, desc=kp.desc)
+        for km in self.bm:
+            if pr[km.p1.id-1]:
+                mapel[km] = M(mdl, km.name, mapel[km.p1], mapel[km.p2], km.M12, km.M21, desc=km.desc)
+        for k in np.nonzero(nr)[0]:
+            kn = self.bn[k]
+            mapel[kn] = N(mdl, kn.name, mapel[kn.qp], kn.SC, r=kn.r, desc=kn.desc)
+        peq = [P(mdl, 'Экв - {}'.format(kq.name), 0, mapel[kq], tuple(Zb[:,i,i].tolist()), E=tuple(Uxx[i].tolist()))
+               for i,kq in enumerate(listq)]
+        tol = 1e-12*np.abs(Zb).max()
+        for i in range(nb):
+            for j in range(i):
+                if max(np.abs(Zb[:,i,j]).max(), np.abs(Zb[:,j,i]).max()) > tol:
+                    M(mdl, 'Экв - {} <=> {}'.format(listq[i].name, listq[j].name), peq[i], peq[j],
+                      tuple(Zb[:,i,j].tolist()), tuple(Zb[:,j,i].tolist()))
+        for i in np.nonzero(f0)[0]:
+            N(mdl, 'Экв - N0 - {}'.format(listq[i].name), peq[i], 'N0')
+        return mdl, mapel
+
+    def TableQ(self, listpar=None, form='', listq=None, df=False):
+        '''Таблица результатов расчета по узлам модели, формируемая векторными операциями
+        над mdl.X без обращения к объектам узлов
+        tab = mdl.TableQ()
+        tab = mdl.TableQ(['UA','UB','UC'], 'M', listq=[q1,q2])
+        где listpar - список величин (по умолчанию - все напряжения, см. q.res()), кроме
+           напряжений могут быть заданы токи, сопротивления и мощности проводимости Y узлов
+           'I1','IA',...,'Z1',...,'S1',...;
+        form - форма представления: '' - комплексное число (по умолчанию), 'R', 'X', 'M', '<f';
+        listq - список узлов (по умолчанию - все узлы модели);
+        df - при True возвращается pandas.DataFrame (при установленном pandas),
+           величины-вектора разбиваются на столбцы 'UABC[0]', 'UABC[1]', ...
+        Возвращает структурированный массив numpy с полями id, name и полями величин
+        (величины-вектора 'U120', 'UABC', 'UAB_BC_CA' - поля размерностью (3,), при расчете
+        нескольких вариантов mdl.CalcScenarios() - последний индекс поля - номер варианта)'''
+        lel = self.bq if listq is None else listq
+        if listpar is None:
+            listpar = [par for par in mselectz if par[0] == 'U']
+        ui = self.resui('q', lel)
+        return self.table(lel, [(par, '', par) for par in listpar], ui, form, df)
+
+    def TableP(self, listpar=None, form='', listp=None, df=False):
+        '''Таблица результатов расчета по ветвям модели, формируемая векторными операциями
+        над mdl.X без обращения к объектам ветвей
+        tab = mdl.TableP()
+        tab = mdl.TableP(['q1IA','q1IB','q1IC','q2IA','q2IB','q2IC'], 'M')
+        где listpar - список величин с теми же названиями, что и p.ParName (по умолчанию -
+           токи ветви без учета B и все величины со стороны 1-ого и 2-ого узлов), см. p.__getattr__;
+        form, df - см. mdl.TableQ(); listp - список ветвей (по умолчанию - все ветви модели)
+        Возвращает структурированный массив numpy с полями id, name и полями величин'''
+        lel = self.bp if listp is None else listp
+        if listpar is None:
+            listpar = ([par for par in mselectz if par[0] == 'I'] +
+                       ['q1'+par for par in mselectz] + ['q2'+par for par in mselectz])
+        ui = self.resui('p', lel)
+        data = []
+        for par in listpar:
+            key = par[:2] if par[:2] in ('q1', 'q2') else ''
+            data.append((par, key, par[len(key):]))
+        return self.table(lel, data, ui, form, df)
+
+    def TableN(self, listpar=None, form='', listn=None, df=False):
+        '''Таблица результатов расчета по несимметриям модели, формируемая векторными
+        операциями над mdl.X без обращения к объектам несимметрий
+        tab = mdl.TableN()
+        tab = mdl.TableN(['IA','IB','IC','3I0'], 'M')
+        где listpar - список величин с теми же названиями, что и n.ParName (по умолчанию -
+           все величины), для КЗ - напряжения в узле КЗ и токи КЗ, для обрывов - напряжения
+           продольной несимметрии и токи ветви, см. n.__getattr__;
+        form, df - см. mdl.TableQ(); listn - список несимметрий (по умолчанию - все несимметрии модели)
+        Возвращает структурированный массив numpy с полями id, name, kind (вид несимметрии)
+        и полями величин'''
+        lel = self.bn if listn is None else listn
+        if listpar is None:
+            listpar = list(mselectz)
+        ui = self.resui('n', lel)
+        SC = [kn.SC for kn in lel]
+        return self.table(lel, [(par, '', par) for par in listpar], ui, form, df,
+                          [('kind', 'U{}'.format(max([len(sc) for sc in SC], default=1)), SC)])
+
+    def Report(self, f=None, listq=None, listp=None, listn=None, side=0, chunk=10000):
+        '''Вывод сводных таблиц результатов расчета по узлам, ветвям и несимметриям
+        (тех же, что выводят q.res(), p.res1(), p.res2(), n.res()) на экран или в файл,
+        таблицы формируются векторными операциями над mdl.X для групп из chunk элементов
+        и записываются по мере формирования
+        mdl.Report() - вывод на экран результатов по всем элементам модели
+        mdl.Report('res.txt') - запись в файл res.txt (в кодировке utf-8)
+        mdl.Report(f, listq=[], listp=[p1,p2], side=1)
+        где f - имя файла или файловый объект с методом write (по умолчанию - sys.stdout);
+           listq, listp, listn - списки узлов, ветвей и несимметрий (None - все элементы
+           модели данного вида, [] - элементы данного вида не выводятся);
+           side - для ветвей: 0 - со стороны обоих узлов (p.res1() и p.res2()),
+           1 - со стороны 1-ого узла, 2 - со стороны 2-ого узла;
+           chunk - количество элементов, таблицы которых формируются за один раз
+        Для обрывов выводятся напряжения продольной несимметрии и ток ветви'''
+        if isinstance(f, str):
+            with open(f, 'w', encoding='utf-8') as fs:
+                self.Report(fs, listq, listp, listn, side, chunk)
+            return
+        if not side in (0, 1, 2):
+            raise ValueError('Ошибка при выводе результатов расчетов', '\n',
+                             'Недопустимое значение side = {}!'.format(side))
+        if f is None:
+            f = sys.stdout
+        sides = [key for key,k in (('q1', 1), ('q2', 2)) if side in (0, k)]
+        for lel,bel,report in ((listq, self.bq, self.reportq), (listp, self.bp, self.reportp),
+                               (listn, self.bn, self.reportn)):
+            lel = bel if lel is None else list(lel)
+            for k in range(0, len(lel), chunk):
+                f.write(''.join(report(lel[k:k+chunk], sides)))
+
+    def Export(self, fname, fmt=None, listq=None, listp=None, listn=None, chunk=100000):
+        '''Экспорт результатов расчета mdl.X (в симметричных составляющих) вместе с
+        параметрами элементов в виде таблиц по столбцам для обработки в других программах
+        mdl.Export('res.npz')
+        mdl.Export('res.csv', listq=[], listn=[])
+        где fname - имя файла, для csv и parquet - основа имен файлов таблиц (см. ниже);
+           fmt - формат: 'npz' - сжатый архив numpy, 'csv', 'hdf5' (при установленном h5py),
+           'parquet' (при установленном pyarrow), по умолчанию определяется по расширению
+           имени файла (.npz, .csv, .h5, .hdf5, .parquet);
+           listq, listp, listn - списки узлов, ветвей и несимметрий (None - все элементы
+           модели данного вида, [] - таблица не формируется);
+           chunk - количество строк таблиц, формируемых и записываемых за один раз
+        Формируются таблицы:
+           'q' - узлы: id, name, U1, U2, U0;
+           'p' - ветви: id, name, q1, q2 (номера узлов, 0 - земля), I1, I2, I0 (токи ветви
+                 от 1-ого ко 2-ому узлу без учета B);
+           'n' - несимметрии: id, name, SC (вид несимметрии), r, q (номер узла КЗ), p (номер
+                 ветви обрыва), U1, U2, U0, I1, I2, I0 (для КЗ - напряжения узла и токи КЗ,
+                 для обрывов - напряжения продольной несимметрии и токи ветви);
+        при расчете нескольких вариантов (mdl.CalcScenarios()) строки таблиц повторяются
+        для каждого варианта, номер варианта (начиная с 1) - в столбце case.
+        В архиве npz таблицы хранятся в виде массивов 'q/id', 'q/U1', ..., в файле hdf5 -
+        в группах q, p, n; для csv и parquet каждая таблица записывается в отдельный
+        файл, имя которого образуется добавлением к fname перед расширением суффикса
+        _q, _p, _n (для 'res.csv' - res_q.csv, res_p.csv, res_n.csv, файл res.csv
+        не создается), комплексные величины - двумя столбцами U1_re, U1_im'''
+        if self.X is None:
+            raise ValueError('Ошибка при экспорте результатов расчетов', '\n',
+                             'Не произведен расчет электрических величин!')
+        nv = 1 if self.X.ndim == 1 else self.X.shape[1]
+        X = self.X.reshape(-1,3,nv)
+        tabs = []
+        lel = self.bq if listq is None else list(listq)
+        if lel:
+            idx = np.array([kq.id-1 for kq in lel], dtype=np.int64)
+            tabs.append(('q', self.exportcols(len(lel), nv,
+                         [('id', [kq.id for kq in lel]), ('name', [kq.name for kq in lel])],
+                         [('U', X, idx + self.np)])))
+        lel = self.bp if listp is None else list(listp)
+        if lel:
+            arr = self.getarrp(lel)
+            idx = np.array([kp.id-1 for kp in lel], dtype=np.int64)
+            tabs.append(('p', self.exportcols(len(lel), nv,
+                         [('id', [kp.id for kp in lel]), ('name', [kp.name for kp in lel]),
+                          ('q1', arr['q1'] + 1), ('q2', arr['q2'] + 1)],
+                         [('I', X, idx)])))
+        lel = self.bn if listn is None else list(listn)
+        if lel:
+            arrn = self.getarrn(lel)
+            u,i = self.resui('n', lel)['']
+            idx = np.arange(len(lel))
+            tabs.append(('n', self.exportcols(len(lel), nv,
+                         [('id', [kn.id for kn in lel]), ('name', [kn.name for kn in lel]),
+                          ('SC', arrn['SC'].astype(str)), ('r', self.getr(lel)),
+                          ('q', np.where(arrn['isq'], arrn['ne'] + 1, 0)),
+                          ('p', np.where(arrn['isq'], 0, arrn['ne'] + 1))],
+                         [('U', u.reshape(-1,3,nv), idx), ('I', i.reshape(-1,3,nv), idx)])))
+        self.export(fname, fmt, tabs, chunk)
+
+    def ExportSweep(self, fname, listq, listsc, I120, U120, fmt=None, chunk=100000):
+        '''Экспорт результатов расчета КЗ mdl.SweepN() в виде таблицы по столбцам
+        I120,U120 = mdl.SweepN(listq, listsc)
+        mdl.ExportSweep('sweep.npz', listq, listsc, I120, U120)
+        где fname, fmt, chunk - см. mdl.Export(); listq, listsc, I120, U120 - см. mdl.SweepN()
+        Формируется таблица 's' со строками для каждого узла и вида КЗ (в порядке listq,
+        listsc) и столбцами: q (номер узла), name, SC (вид КЗ), r, I1, I2, I0, U1, U2, U0,
+        для csv и parquet - в файл с суффиксом _s (для 'sweep.csv' - sweep_s.csv)'''
+        nsc = len(listsc)
+        n = len(listq)*nsc
+        I120 = np.asarray(I120)
+        U120 = np.asarray(U120)
+        if I120.shape != (len(listq), nsc, 3) or U120.shape != I120.shape:
+            raise ValueError('Ошибка при экспорте результатов расчетов', '\n',
+                             'Размерность I120, U120 не соответствует listq, listsc!')
+        SC = [sc[0] if isinstance(sc, tuple) else sc for sc in listsc]
+        r = [sc[1] if isinstance(sc, tuple) else 0.0 for sc in listsc]
+        idx = np.arange(n)
+        tab = self.exportcols(n, 1,
+                              [('q', np.repeat([kq.id for kq in listq], nsc)),
+                               ('name', np.repeat([kq.name for kq in listq], nsc)),
+                               ('SC', np.tile(SC, len(listq))), ('r', np.tile(np.asarray(r, dtype=np.double), len(listq)))],
+                              [('I', I120.reshape(-1,3,1), idx), ('U', U120.reshape(-1,3,1), idx)])
+        self.export(fname, fmt, [('s', tab)], chunk)
+
+    def Save(self, fname, compress=True):
+        '''Сохранение расчетной модели (узлов, ветвей, взаимоиндукций, несимметрий
+        и настроек mdl.Setup()) в компактный двоичный файл - архив numpy npz
+        mdl.Save('net.npz')
+        mdl.Save('net.npz', compress=False)
+        где fname - имя файла;
+           compress - сжатие архива (по умолчанию True), несжатый файл больше по размеру,
+           но загружается быстрее
+        Параметры элементов каждого вида хранятся массивами по столбцам ('q/Y', 'p/Z', ...),
+        ссылки на узлы и ветви - их номерами, названия и примечания - таблицами строк
+        (массив уникальных строк 'q/name' и номера строк элементов в нем 'q/iname'),
+        названия и примечания сохраняются в виде строк, типы чисел параметров (целое,
+        вещественное, комплексное) - массивами кодов ('q/Yt', 'p/Zt', ...);
+        Результаты расчета mdl.X и сохраненная факторизация схемы не сохраняются.
+        Загрузка модели - mdl.Load(fname)'''
+        for kn in self.bn:
+            if not isinstance(kn.qp, (Q,P)):
+                raise TypeError('Ошибка при сохранении модели', '\n',
+                                'Неизвестный вид несимметрии!')
+        data = dict(format=np.array('mrtkz'), version=np.array(1), desc=np.array(str(self.desc)),
+                    setup=np.array([self.engine, self.solver, self.permc_spec or '', self.precision]),
+                    setupn=np.array([self.nupdate, self.topo, self.check], dtype=np.int64))
+        for key,lst in (('q', self.bq), ('p', self.bp), ('m', self.bm), ('n', self.bn)):
+            data[key+'/name'],data[key+'/iname'] = StrTable([el.name for el in lst])
+            data[key+'/desc'],data[key+'/idesc'] = StrTable([el.desc for el in lst])
+        data['q/Y'] = np.array([kq.Y for kq in self.bq], dtype=np.cdouble).reshape(-1,3)
+        data['q/J'] = np.array([kq.J for kq in self.bq], dtype=np.cdouble).reshape(-1,3)
+        data['q/Yt'] = TypeCodes([kq.Y for kq in self.bq], 3)
+        data['q/Jt'] = TypeCodes([kq.J for kq in self.bq], 3)
+        arr = self.getarrp(self.bp)
+        T = np.array([kp.T for kp in self.bp], dtype=np.double).reshape(-1,2)
+        data['p/q1'] = arr['q1'] + 1
+        data['p/q2'] = arr['q2'] + 1
+        data['p/Z'] = arr['Z']
+        data['p/E'] = arr['E']
+        data['p/B'] = arr['B']
+        data['p/Kt'] = T[:,0]
+        #Группы обмоток, заданные целыми числами, сохраняются целыми
+        data['p/GrT'] = T[:,1].astype(np.int64) if np.all(T[:,1] == np.round(T[:,1])) else T[:,1]
+        for key,m in (('Z', 3), ('E', 3), ('B', 3), ('T', 2)):
+            data['p/'+key+'t'] = TypeCodes([getattr(kp, key) for kp in self.bp], m)
+        arr = self.getarrm(self.bm)
+        data['m/p1'] = arr['m1'] + 1
+        data['m/p2'] = arr['m2'] + 1
+        data['m/M12'] = arr['M12']
+        data['m/M21'] = arr['M21']
+        #Признаки задания взаимоиндукций кортежем (M1, M2, M0), иначе - числом (M0)
+        data['m/seq12'] = np.array([np.ndim(km.M12) > 0 for km in self.bm], dtype=bool)
+        data['m/seq21'] = np.array([np.ndim(km.M21) > 0 for km in self.bm], dtype=bool)
+        seq = lambda Mk: tuple(Mk) if np.ndim(Mk) else (0, 0, Mk)
+        data['m/M12t'] = TypeCodes([seq(km.M12) for km in self.bm], 3)
+        data['m/M21t'] = TypeCodes([seq(km.M21) for km in self.bm], 3)
+        data['n/isq'] = np.array([isinstance(kn.qp, Q) for kn in self.bn], dtype=bool)
+        data['n/qp'] = np.array([kn.qp.id for kn in self.bn], dtype=np.int64)
+        data['n/SC'] = np.array([kn.SC for kn in self.bn], dtype=str)
+        #Переходные сопротивления всех несимметрий подряд, rn - длина массива r (-1 - число)
+        lr = [np.asarray(kn.r, dtype=np.double) for kn in self.bn]
+        data['n/r'] = np.concatenate([r.ravel() for r in lr] + [np.zeros(0)])
+        data['n/rn'] = np.array([r.size if r.ndim else -1 for r in lr], dtype=np.int64)
+        data['n/rt'] = TypeCodes([(kn.r if np.ndim(kn.r) == 0 else 0.0,) for kn in self.bn], 1)
+        with open(fname, 'wb') as f:
+            if compress:
+                np.savez_compressed(f, **data)
+            else:
+                np.savez(f, **data)
+
+    def Load(self, fname):
+        '''Загрузка расчетной модели из файла, сформированного mdl.Save(),
+        текущее содержимое модели предварительно удаляется (см. mdl.Clear())
+        mdl = Model().Load('net.npz')
+        mdl.Load('net.npz')
+        Элементы модели создаются из массивов файла без вызова конструкторов Q, P, M, N
+        и без повторных проверок их аргументов, что многократно ускоряет загрузку больших
+        моделей по сравнению с выполнением скрипта модели (см. ImpModel.Exp2MRTKZ);
+        Параметры элементов восстанавливаются точно, в том числе с типами чисел (целое,
+        вещественное, комплексное; числа numpy - числами Python), взаимоиндукции
+        и переходные сопротивления - числом или кортежем (массивом numpy в float64)
+        как при сохранении.
+        Возвращает модель mdl'''
+        with np.load(fname, allow_pickle=False) as f:
+            if not 'format' in f.files or str(f['format']) != 'mrtkz':
+                raise ValueError('Ошибка при загрузке модели', '\n',
+                                 'Файл {} не является файлом модели МРТКЗ!'.format(fname))
+            if int(f['version']) > 1:
+                raise ValueError('Ошибка при загрузке модели', '\n',
+                                 'Неподдерживаемая версия файла модели {}!'.format(int(f['version'])))
+            data = {key : f[key] for key in f.files}
+        self.Clear()
+        self.desc = str(data['desc'])
+        self.engine,self.solver,permc_spec,self.precision = data['setup'].tolist()
+        self.permc_spec = permc_spec or None
+        self.nupdate,topo,check = data['setupn'].tolist()
+        self.topo = bool(topo)
+        self.check = bool(check)
+        #Сборщик мусора отключается на время создания элементов, т.к. его периодический обход
+        #растущего множества новых объектов многократно замедляет загрузку
+        gcon = gc.isenabled()
+        gc.disable()
+        try:
+            bq = self.bq
+            bp = self.bp
+            name,desc = StrList(data, 'q')
+            for k,(Y,J) in enumerate(zip(TypedList(data['q/Y'], data['q/Yt']),
+                                         TypedList(data['q/J'], data['q/Jt']))):
+                kq = Q.__new__(Q)
+                kq.__dict__.update(id=k+1, model=self, name=name[k], Y=Y, J=J,
+                                   desc=desc[k], plist=[], kn=None)
+                bq.append(kq)
+            name,desc = StrList(data, 'p')
+            arrT = np.stack((data['p/Kt'], data['p/GrT']), axis=1)
+            for k,(q1,q2,Z,E,T,B) in enumerate(zip(data['p/q1'].tolist(), data['p/q2'].tolist(),
+                                                   TypedList(data['p/Z'], data['p/Zt']),
+                                                   TypedList(data['p/E'], data['p/Et']),
+                                                   TypedList(arrT, data['p/Tt']),
+                                                   TypedList(data['p/B'], data['p/Bt']))):
+                kp = P.__new__(P)
+                q1 = bq[q1-1] if q1 else 0
+                q2 = bq[q2-1] if q2 else 0
+                kp.__dict__.update(id=k+1, model=self, name=name[k], desc=desc[k], q1=q1, q2=q2,
+                                   Z=Z, E=E, T=T, B=B, mlist=[], kn=None)
+                if q1:
+                    q1.plist.append(kp)
+                if q2:
+                    q2.plist.append(kp)
+                bp.append(kp)
+            name,desc = StrList(data, 'm')
+            for k,(p1,p2,M12,M21,s12,s21) in enumerate(zip(data['m/p1'].tolist(), data['m/p2'].tolist(),
+                                                            TypedList(data['m/M12'], data['m/M12t']),
+                                                            TypedList(data['m/M21'], data['m/M21t']),
+                                                            data['m/seq12'].tolist(), data['m/seq21'].tolist())):
+                km = M.__new__(M)
+                p1 = bp[p1-1]
+                p2 = bp[p2-1]
+                km.__dict__.update(id=k+1, model=self, name=name[k], desc=desc[k], p1=p1, p2=p2,
+                                   M12=M12 if s12 else M12[2], M21=M21 if s21 else M21[2])
+                p1.mlist.append(km)
+                p2.mlist.append(km)
+                self.bm.append(km)
+            name,desc = StrList(data, 'n')
+            rn = data['n/rn']
+            ir = np.concatenate(([0], np.cumsum(np.where(rn < 0, 1, rn))))
+            r = data['n/r']
+            rt = data['n/rt'].ravel().tolist()
+            for k,(isq,qp,SC) in enumerate(zip(data['n/isq'].tolist(), data['n/qp'].tolist(), data['n/SC'].tolist())):
+                kn = N.__new__(N)
+                qp = bq[qp-1] if isq else bp[qp-1]
+                kn.__dict__.update(id=k+1, model=self, name=name[k], desc=desc[k], qp=qp, SC=SC,
+                                   r=(int, float)[rt[k]](r[ir[k]]) if rn[k] < 0 else r[ir[k]:ir[k+1]].copy())
+                qp.kn = kn
+                self.bn.append(kn)
+        finally:
+            if gcon:
+                gc.enable()
+        self.nq = len(self.bq)
+        self.np = len(self.bp)
+        self.nm = len(self.bm)
+        self.nn = len(self.bn)
+        self.reset()
+        return self
+
+    def resui(self, kind, lel):
+        '''Служебный метод, возвращает словарь массивов (u, i) результатов расчета,
+        передаваемых в mselectz, для списка элементов lel вида kind, массивы имеют
+        размерность (len(lel),3) или (len(lel),3,nv) для нескольких вариантов:
+            kind='q' - узлы: '' - напряжения и токи проводимости Y узлов;
+            kind='p' - ветви: '' - токи ветвей без учета B (u = 0), 'q1', 'q2' - напряжения
+                       узлов и токи со стороны 1-ого и 2-ого узлов (см. p.getresq1(), p.getresq2());
+            kind='n' - несимметрии: '' - для КЗ напряжения узлов и токи КЗ,
+                       для обрывов напряжения обрывов и токи ветвей'''
+        if kind == 'q':
+            u = self.resarr(np.array([kq.id-1 for kq in lel], dtype=np.int64) + self.np)
+            i = self.resarr(np.array([kq.Y for kq in lel], dtype=np.cdouble).reshape(-1,3), u) * u
+            return {'' : (u, i)}
+        if kind == 'p':
+            arr = self.getarrp(lel)
+            i = self.resarr(np.array([kp.id-1 for kp in lel], dtype=np.int64))
+            u1 = np.where(self.resarr(arr['q1'][:,None] >= 0, i), self.resarr(arr['q1'] + self.np), 0)
+            u2 = np.where(self.resarr(arr['q2'][:,None] >= 0, i), self.resarr(arr['q2'] + self.np), 0)
+            B = self.resarr(arr['B'], i)
+            Kt = self.resarr(arr['Kt'][:,[1,0,2]], i)
+            return {'' : (np.zeros_like(i), i),
+                    'q1' : (u1, i + u1 * B/2),
+                    'q2' : (u2, -Kt * i + u2 * B/2)}
+        arrn = self.getarrn(lel)
+        isq,ne = arrn['isq'],arrn['ne']
+        xn = self.resarr(np.array([kn.id-1 for kn in lel], dtype=np.int64) + self.np + self.nq)
+        xe = self.resarr(np.where(isq, ne + self.np, ne))
+        mq = self.resarr(isq[:,None], xn)
+        return {'' : (np.where(mq, xe, xn), np.where(mq, xn, xe))}
+
+    def respar(self, par, u, i):
+        '''Служебный метод, вычисляет величину par (см. mselectz) для всех элементов и вариантов
+        по массивам u, i (см. mdl.resui()) одним вызовом mselectz
+        Возвращает массив (n,) или (n,3) (для величин-векторов), для нескольких вариантов -
+        с последним индексом - номером варианта'''
+        n = u.shape[0]
+        rest = u.shape[2:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            res = mselectz[par](np.moveaxis(u, 1, 0).reshape(3, -1), np.moveaxis(i, 1, 0).reshape(3, -1))
+        if np.ndim(res) == 2:
+            return np.moveaxis(res.reshape((3, n)+rest), 0, 1)
+        return np.reshape(res, (n,)+rest)
+
+    def getcache(self, kind, key, par):
+        '''Служебный метод, возвращает величину par (см. mselectz) для всех элементов вида
+        kind со стороны key (см. mdl.resui()), используется методами q.ParName, p.ParName,
+        n.ParName, q.res(), p.res1(), p.res2(), n.res()
+        Величины вычисляются при первом обращении векторными операциями над mdl.X
+        и сохраняются в кэше mdl.cache до следующего расчета (изменения mdl.X)
+        или изменения параметров элементов (mdl.reset(), mdl.mark())'''
+        cache = self.cache
+        if cache is None or cache['X'] is not self.X:
+            cache = self.cache = dict(X=self.X)
+        if not (kind, key, par) in cache:
+            if not kind in cache:
+                cache[kind] = self.resui(kind, {'q' : self.bq, 'p' : self.bp, 'n' : self.bn}[kind])
+            cache[(kind, key, par)] = self.respar(par, *cache[kind][key])
+        return cache[(kind, key, par)]
+
+    def resarr(self, idx, like=None):
+        '''Служебный метод, возвращает результаты расчета mdl.X для элементов с номерами
+        idx (начиная с 0) в порядке расположения переменных в СЛАУ (ветви, узлы, несимметрии)
+        в виде массива (len(idx),3) или (len(idx),3,nv) для нескольких вариантов
+        При заданном like возвращает параметры элементов idx - массив (len(idx),3),
+        приведенный к размерности like для поэлементного умножения'''
+        if like is not None:
+            return np.reshape(idx, np.shape(idx) + (1,)*(np.ndim(like)-2))
+        if self.X is None:
+            raise ValueError('Ошибка при формировании таблицы результатов расчетов', '\n',
+                             'Не произведен расчет электрических величин!')
+        X = self.X.reshape((-1,3)+self.X.shape[1:])
+        return X[idx]
+
+    def table(self, lel, data, ui, form, df, fields=()):
+        '''Служебный метод, формирует таблицу результатов расчета (см. mdl.TableQ())
+        по списку элементов lel и списку data кортежей (имя поля, сторона, величина),
+        ui - словарь массивов (u, i) сторон элементов (см. mdl.resui()),
+        fields - дополнительные поля (имя, тип, значения)'''
+        if not form in ('', 'R', 'X', 'M', '<f'):
+            raise ValueError('Ошибка при формировании таблицы результатов расчетов', '\n',
+                             'Недопустимая форма представления form = {}!'.format(form))
+        n = len(lel)
+        cols = []
+        for name,key,par in data:
+            cols.append((name, mform1[form](self.respar(par, *ui[key]), par)))
+        dtype = [('id', np.int64), ('name', 'U{}'.format(max([len(el.name) for el in lel], default=1)))]
+        dtype += [(name, tp) for name,tp,_ in fields]
+        dtype += [(name, res.dtype, res.shape[1:]) for name,res in cols]
+        tab = np.empty(n, dtype=dtype)
+        tab['id'] = [el.id for el in lel]
+        tab['name'] = [el.name for el in lel]
+        for name,_,val in fields:
+            tab[name] = val
+        for name,res in cols:
+            tab[name] = res
+        return self.todf(tab) if df else tab
+
+    def todf(self, tab):
+        '''Служебный метод, преобразует таблицу результатов в pandas.DataFrame,
+        поля-массивы разбиваются на столбцы с индексами в названии'''
+        if pd is None:
+            raise ValueError('Ошибка при формировании таблицы результатов расчетов', '\n',
+                             'Не установлен модуль pandas!')
+        cols = dict()
+        for name in tab.dtype.names:
+            val = tab[name]
+            if val.ndim == 1:
+                cols[name] = val
+            else:
+                for k in np.ndindex(val.shape[1:]):
+                    cols[name + str(list(k))] = val[(slice(None),)+k]
+        return pd.DataFrame(cols)
+
+    def reportq(self, lel, sides):
+        '''Служебный метод, возвращает список строк сводных таблиц результатов
+        по узлам lel (см. mdl.Report(), q.res())'''
+        u,i = self.resui('q', lel)['']
+        yi = (i != 0).reshape(len(lel), -1).any(axis=1)
+        strU = StrUArr(u)
+        strI = iter(StrIArr(i[yi]))
+        res = []
+        for kq,su,y in zip(lel, strU, yi.tolist()):
+            res.append('Узел № {} - {}\n{}\n'.format(kq.id, kq.name, su))
+            if y:
+                res.append('Значения токов проводимости узла\n{}\n'.format(next(strI)))
+        return res
+
+    def reportp(self, lel, sides):
+        '''Служебный метод, возвращает список строк сводных таблиц результатов
+        по ветвям lel со сторон sides (см. mdl.Report(), p.res1(), p.res2())'''
+        ui = self.resui('p', lel)
+        strs = [(key, StrIArr(ui[key][1]), StrUArr(ui[key][0])) for key in sides]
+        res = []
+        for k,kp in enumerate(lel):
+            for key,strI,strU in strs:
+                kq = kp.q1 if key == 'q1' else kp.q2
+                qid,qname = (kq.id, kq.name) if isinstance(kq, Q) else (0, 'Земля')
+                res.append('Ветвь № {} - {}\nЗначения токов по ветви со стороны узла №{} - {}\n{}\n'
+                           'Значения напряжения в узле №{} - {}\n{}\n'.format(
+                           kp.id, kp.name, qid, qname, strI[k], qid, qname, strU[k]))
+        return res
+
+    def reportn(self, lel, sides):
+        '''Служебный метод, возвращает список строк сводных таблиц результатов
+        по несимметриям lel (см. mdl.Report(), n.res()), для КЗ выводятся также
+        токи подтекания по ветвям, подключенным к узлу КЗ'''
+        u,i = self.resui('n', lel)['']
+        strU = StrUArr(u)
+        strI = StrIArr(i)
+        listp = []
+        isq1 = []
+        for kn in lel:
+            if isinstance(kn.qp, Q):
+                kn.qp.update()
+                listp.extend(kn.qp.plist)
+                isq1.extend([kn.qp is kp.q1 for kp in kn.qp.plist])
+        strIp = []
+        if listp:
+            ui = self.resui('p', listp)
+            isq1 = self.resarr(np.array(isq1)[:,None], ui['q1'][1])
+            strIp = StrIArr(-np.where(isq1, ui['q1'][1], ui['q2'][1]), 0)
+        strIp = iter(zip(listp, strIp))
+        res = []
+        for kn,su,si in zip(lel, strU, strI):
+            if isinstance(kn.qp, Q):
+                res.append('КЗ № {} - {} - {}\nВ Узле № {} - {}\n{}\n'
+                           'Суммарный ток КЗ в Узле № {} - {}\n{}\nПодтекание токов по ветвям\n'.format(
+                           kn.id, kn.name, kn.SC, kn.qp.id, kn.qp.name, su, kn.qp.id, kn.qp.name, si))
+                for _ in kn.qp.plist:
+                    kp,sp = next(strIp)
+                    res.append('Ветвь № {} - {}\n{}\n'.format(kp.id, kp.name, sp))
+            else:
+                res.append('Обрыв № {} - {} - {}\nНапряжения продольной несимметрии на ветви № {} - {}\n{}\n'
+                           'Ток ветви № {} - {}\n{}\n'.format(
+                           kn.id, kn.name, kn.SC, kn.qp.id, kn.qp.name, su, kn.qp.id, kn.qp.name, si))
+        return res
+
+    def exportcols(self, n, nv, meta, vals):
+        '''Служебный метод, формирует описание таблицы экспорта (см. mdl.Export()) из n
+        элементов для nv вариантов - список столбцов (имя, тип, функция), где функция
+        f(a,b) возвращает значения строк a:b (строка - вариант*n + номер элемента),
+        meta - список (имя, значения параметра элементов),
+        vals - список (имя, массив (m,3,nv), индексы элементов в массиве),
+        параметры meta могут быть заданы массивом (n,nv) - для каждого варианта
+        или (n,1) - одинаковыми для всех вариантов'''
+        cols = []
+        if nv > 1:
+            cols.append(('case', np.dtype(np.int64), lambda a,b: np.arange(a,b)//n + 1))
+        for name,val in meta:
+            val = np.asarray(val)
+            #Параметры, заданные для каждого варианта (массив (n,nv))
+            val = val[:,:1] if val.ndim > 1 and val.shape[1] != nv else val.reshape(n, -1)
+            cols.append((name, val.dtype, lambda a,b,val=val: val[np.arange(a,b) % n, np.arange(a,b)//n % val.shape[1]]))
+        for name,arr,idx in vals:
+            for k,seq in enumerate('120'):
+                cols.append((name+seq, arr.dtype,
+                             lambda a,b,arr=arr,idx=idx,k=k: arr[idx[np.arange(a,b) % n], k, np.arange(a,b)//n]))
+        return (n*nv, cols)
+
+    def export(self, fname, fmt, tabs, chunk):
+        '''Служебный метод, записывает таблицы tabs - список (имя, (количество строк, столбцы))
+        (см. mdl.exportcols()) в файл fname в формате fmt (см. mdl.Export())'''
+        if fmt is None:
+            ext = os.path.splitext(fname)[1].lower()
+            fmt = {'.npz' : 'npz', '.csv' : 'csv', '.h5' : 'hdf5', '.hdf5' : 'hdf5',
+                   '.parquet' : 'parquet'}.get(ext)
+        if not fmt in ('npz', 'csv', 'hdf5', 'parquet'):
+            raise ValueError('Ошибка при экспорте результатов расчетов', '\n',
+                             'Не удалось определить формат файла {}!'.format(fname))
+        if fmt == 'hdf5' and h5py is None:
+            raise ValueError('Ошибка при экспорте результатов расчетов', '\n',
+                             'Не установлен модуль h5py!')
+        if fmt == 'parquet' and pyarrow is None:
+            raise ValueError('Ошибка при экспорте результатов расчетов', '\n',
+                             'Не установлен модуль pyarrow!')
+        chunk = max(int(chunk), 1)
+        if fmt == 'npz':
+            WriteNPZ(fname, tabs, chunk)
+        elif fmt == 'hdf5':
+            WriteHDF5(fname, tabs, chunk)
+        else:
+            root,ext = os.path.splitext(fname)
+            for name,tab in tabs:
+                fn = '{}_{}{}'.format(root, name, ext)
+                if fmt == 'csv':
+                    WriteCSV(fn, tab, chunk)
+                else:
+                    WriteParquet(fn, tab, chunk)
+
+    def getarr(self):
+        '''Служебный метод, собирает параметры узлов, ветвей, взаимоиндукций и несимметрий
+        расчетной модели в вектора numpy, используемые для векторного формирования СЛАУ
+        Возвращает словарь, в котором (индексы узлов и ветвей начинаются с 0, земля - -1):
+            q1,q2 - индексы узлов подключения ветвей;
+            Z,E,B,Kt - матрицы (np,3) параметров ветвей прямой, обратной и нулевой
+                последовательностей, Kt - коэф-ты трансформации в том порядке,
+                в котором они записываются в строки уравнений по 2-ому закону Кирхгофа;
+            Y,J - матрицы (nq,3) параметров узлов;
+            m1,m2 - индексы ветвей взаимоиндукций;
+            M12,M21 - матрицы (nm,3) сопротивлений взаимоиндукций прямой, обратной
+                и нулевой последовательностей, mseq - признаки их наличия (nm,3);
+            nq - признак КЗ (True) или обрыва (False), ne - индекс узла или ветви несимметрии,
+            SC - виды несимметрий, r - переходные сопротивления.'''
+        arr = self.getarrp(self.bp)
+        arr.update(self.getarrq(self.bq))
+        arr.update(self.getarrm(self.bm))
+        arr.update(self.getarrn(self.bn))
+        return arr
+
+    def getarrq(self, listq):
+        '''Служебный метод, собирает параметры узлов из списка listq в вектора numpy
+        Возвращает словарь с ключами Y, J (см. getarr())'''
+        Y = np.array([kq.Y for kq in listq], dtype=np.cdouble).reshape(-1,3)
+        J = np.array([kq.J for kq in listq], dtype=np.cdouble).reshape(-1,3)
+        return dict(Y=Y, J=J)
+
+    def getarrp(self, listp):
+        '''Служебный метод, собирает параметры ветвей из списка listp в вектора numpy
+        Возвращает словарь с ключами q1, q2, Z, E, B, Kt (см. getarr())'''
+        q1 = np.array([kp.q1.id-1 if isinstance(kp.q1, Q) else -1 for kp in listp], dtype=np.int64)
+        q2 = np.array([kp.q2.id-1 if isinstance(kp.q2, Q) else -1 for kp in listp], dtype=np.int64)
+        Z = np.array([kp.Z for kp in listp], dtype=np.cdouble).reshape(-1,3)
+        E = np.array([kp.E for kp in listp], dtype=np.cdouble).reshape(-1,3)
+        B = np.array([kp.B for kp in listp], dtype=np.cdouble).reshape(-1,3)
+        T = np.array([kp.T for kp in listp], dtype=np.double).reshape(-1,2)
+        #Расчет комплексных коэф-ов трансформации прямой, обратной и нулевой последовательностей
+        Kt1 = T[:,0] * np.exp(Kf*T[:,1])
+        Kt2 = np.where(T[:,1] % 2 == 0, Kt1, np.conj(Kt1))
+        Kt = np.stack((Kt2,Kt1,Kt1), axis=1)
+        return dict(q1=q1, q2=q2, Z=Z, E=E, B=B, Kt=Kt)
+
+    def getarrm(self, listm):
+        '''Служебный метод, собирает параметры взаимоиндукций из списка listm в вектора numpy
+        Возвращает словарь с ключами m1, m2, M12, M21, mseq (см. getarr())'''
+        m1 = np.array([km.p1.id-1 for km in listm], dtype=np.int64)
+        m2 = np.array([km.p2.id-1 for km in listm], dtype=np.int64)
+        #Взаимоиндукция, заданная числом, учитывается только в нулевой последовательности
+        seq = lambda Mk: tuple(Mk) if np.ndim(Mk) else (0, 0, Mk)
+        M12 = np.array([seq(km.M12) for km in listm], dtype=np.cdouble).reshape(-1,3)
+        M21 = np.array([seq(km.M21) for km in listm], dtype=np.cdouble).reshape(-1,3)
+        m12 = np.array([np.ndim(km.M12) > 0 or np.ndim(km.M21) > 0 for km in listm], dtype=bool)
+        mseq = np.stack((m12, m12, np.ones_like(m12)), axis=1)
+        return dict(m1=m1, m2=m2, M12=M12, M21=M21, mseq=mseq)
+
+    def getarrn(self, listn):
+        '''Служебный метод, собирает параметры несимметрий из списка listn в вектора numpy
+        Возвращает словарь с ключами isq, ne, SC, r (см. getarr())'''
+        for kn in listn:
+            if not isinstance(kn.qp, (Q,P)):
+                raise TypeError('Неизвестный вид несимметрии!')
+        isq = np.array([isinstance(kn.qp, Q) for kn in listn], dtype=bool)
+        ne = np.array([kn.qp.id-1 for kn in listn], dtype=np.int64)
+        SC = np.array([kn.SC for kn in listn], dtype=object)
+        r = self.getr(listn)[:,0]
+        return dict(isq=isq, ne=ne, SC=SC, r=r)
+
+    def getr(self, listn):
+        '''Служебный метод, возвращает матрицу (len(listn),nv) переходных сопротивлений
+        несимметрий из списка listn для nv вариантов - по длине массивов r (см. N),
+        r, заданные числом, повторяются во всех вариантах, при отсутствии массивов nv = 1
+        При различной длине массивов r - исключение ValueError'''
+        lr = [np.asarray(kn.r, dtype=np.double) for kn in listn]
+        nv = set(r.size for r in lr if r.ndim)
+        if len(nv) > 1:
+            raise ValueError('Ошибка при формировании уравнений несимметрий', '\n',
+                             'Массивы переходных сопротивлений r несимметрий должны иметь одинаковую длину!')
+        nv = nv.pop() if nv else 1
+        return np.array([np.broadcast_to(r.ravel(), nv) for r in lr], dtype=np.double).reshape(len(lr), nv)
+
+    def formslae(self, arr, kn=None):
+        '''Служебный метод, формирует координатную версию разреженной матрицы СЛАУ
+        и вектор правой части по параметрам собранным методом getarr()
+        kn - индексы (начиная с 0) включаемых в СЛАУ несимметрий, уравнения которых
+             записываются в указанном порядке, по умолчанию - все несимметрии модели
+        Возвращает ri,ci,cdata,RHS - номера строк, столбцов, значения ненулевых элементов и RHS
+        Матрица формируется векторными операциями numpy отдельно для каждого класса элементов
+        (узлы, ветви, взаимоиндукции) и каждой группы несимметрий одного вида'''
+        nq = arr['Y'].shape[0]
+        np_ = arr['Z'].shape[0]
+        if kn is None:
+            kn = np.arange(arr['SC'].size)
+        n = 3*(nq+np_+len(kn))# Размерность СЛАУ
+        RHS = np.zeros(n, dtype=np.cdouble)# Вектор правой части СЛАУ, в него записывается э.д.с. ветвей и J узлов
+        RHS[0:3*np_] = arr['E'].ravel()
+        RHS[3*np_:3*(np_+nq)] = -arr['J'].ravel()
+        lri = []; lci = []; ldata = []
+        #Диагональ узлов: суммирование B/2 подключенных к узлу ветвей и собственной Y узла
+        #(np.subtract.at сохраняет порядок суммирования поэлементного алгоритма)
+        qb = np.zeros(3*nq, dtype=np.cdouble)
+        qq = np.stack((arr['q1'],arr['q2']), axis=1)
+        lq = (3*qq[:,:,None] + arr012).ravel()
+        B2 = np.broadcast_to((arr['B']/2)[:,None,:], (np_,2,3)).ravel()
+        mask = np.repeat(qq.ravel() >= 0, 3)
+        np.subtract.at(qb, lq[mask], B2[mask])
+        qb -= arr['Y'].ravel()
+        lri.append(3*np_ + np.arange(3*nq)); lci.append(lri[-1]); ldata.append(qb)
+        #Запись сопротивлений ветвей в разреженную матрицу
+        lpId = 3*np.arange(np_)[:,None] + arr012
+        lri.append(lpId.ravel()); lci.append(lpId.ravel()); ldata.append(arr['Z'].ravel())
+        #Запись матриц соединений A и At в разреженную матрицу (для q1 -> -1)
+        p = np.nonzero(arr['q1'] >= 0)[0]
+        lp = lpId[p].ravel()
+        lq = (3*(np_+arr['q1'][p])[:,None] + arr012).ravel()
+        lri.extend((lp,lq)); lci.extend((lq,lp)); ldata.append(-np.ones(2*lp.size))
+        #Запись матриц соединений A и At в разреженную матрицу (для q2 -> 1 или Кт для трансформаторов)
+        p = np.nonzero(arr['q2'] >= 0)[0]
+        lp = lpId[p].ravel()
+        lq = (3*(np_+arr['q2'][p])[:,None] + arr012).ravel()
+        Kt = arr['Kt'][p]
+        lri.extend((lp,lq)); lci.extend((lq,lp))
+        ldata.extend((Kt.ravel(), Kt[:,[1,0,2]].ravel()))
+        #Запись сопротивлений взаимоиндукций в разреженную матрицу
+        mseq = arr['mseq']
+        pm1 = (3*arr['m1'][:,None] + arr012)[mseq]
+        pm2 = (3*arr['m2'][:,None] + arr012)[mseq]
+        lri.extend((pm1,pm2)); lci.extend((pm2,pm1)); ldata.extend((arr['M12'][mseq],arr['M21'][mseq]))
+        #Запись несимметрий
+        ri,ci,cdata = formn(arr['isq'][kn], arr['ne'][kn], 3*(nq+np_+np.arange(len(kn))),
+                            arr['SC'][kn], arr['r'][kn], np_)
+        lri.append(ri); lci.append(ci); ldata.append(cdata)
+        ri = np.concatenate(lri)
+        ci = np.concatenate(lci)
+        cdata = np.concatenate([np.asarray(d, dtype=np.cdouble) for d in ldata])
+        return ri,ci,cdata,RHS
+
+class SweepStore:
+    '''Хранилище результатов расчета КЗ mdl.SweepNStore() на диске на основе np.memmap,
+    величины считываются с диска только при обращении к соответствующим срезам массивов
+
+    Открытие ранее сформированного хранилища
+    store = SweepStore(path)
+    store = SweepStore(path, mode='r+') - с возможностью записи
+    где path - папка хранилища, содержащая файл индекса index.npz и файлы массивов *.dat
+
+    Индекс расчетных случаев (массивы длиной ncase - количество случаев):
+       store.q, store.name - номер и название узла КЗ, store.SC - вид КЗ, store.r - сопротивление
+       store.keepq, store.keepp - номера сохраняемых узлов и ветвей
+    Результаты в симметричных составляющих:
+       store.I120, store.U120 - токи КЗ и напряжения в узле КЗ, (ncase,3)
+       store.Uq - напряжения сохраняемых узлов, (ncase,len(keepq),3)
+       store.Ip - токи сохраняемых ветвей, (ncase,len(keepp),3)
+    Номер расчетного случая для узла q (объекта или номера) и вида КЗ sc
+       k = store.case(q, sc), например store.Ip[store.case(q1, 'A0')]'''
+    def __init__(self, path, mode='r'):
+        with np.load(os.path.join(path, 'index.npz')) as index:
+            self.q = index['q']
+            self.name = index['name']
+            self.SC = index['SC']
+            self.r = index['r']
+            self.listsc = list(zip(index['listsc'].tolist(), index['listr'].tolist()))
+            self.keepq = index['keepq']
+            self.keepp = index['keepp']
+            self.dtype = np.dtype(str(index['dtype']))
+        self.path = path
+        ncase = len(self.q)
+        self.I120 = self.memmap('I120', mode, (ncase,3))
+        self.U120 = self.memmap('U120', mode, (ncase,3))
+        self.Uq = self.memmap('Uq', mode, (ncase,len(self.keepq),3))
+        self.Ip = self.memmap('Ip', mode, (ncase,len(self.keepp),3))
+
+    def memmap(self, name, mode, shape):
+        '''Служебный метод, открывает (при mode='w+' - создает) массив хранилища name,
+        массивы нулевого размера в файлах не хранятся'''
+        if not np.prod(shape):
+            return np.zeros(shape, dtype=self.dtype)
+        return np.memmap(os.path.join(self.path, name+'.dat'), dtype=self.dtype, mode=mode, shape=shape)
+
+    def case(self, q, sc):
+        '''Номер расчетного случая (начиная с 0) для узла q (объекта узла или его номера)
+        и вида КЗ sc (для КЗ через переходное сопротивление - кортеж (вид КЗ, r)),
+        переходное сопротивление r сравнивается с сохраненным с точностью np.isclose()'''
+        qid = q.id if isinstance(q, Q) else q
+        sc,r = sc if isinstance(sc, tuple) else (sc, 0.0)
+        nsc = len(self.listsc)
+        iq = np.nonzero(self.q[::nsc] == qid)[0] if nsc else []
+        isc = [k for k,(ksc,kr) in enumerate(self.listsc) if ksc == sc and np.isclose(kr, r)]
+        if not isc or len(iq) == 0:
+            raise ValueError('Ошибка при выборе расчетного случая', '\n',
+                             'В хранилище отсутствует КЗ {} в узле № {}!'.format(sc, qid))
+        return int(iq[0])*nsc + isc[0]
+
+    def write(self, k, I120, U120, X):
+        '''Служебный метод, запись результатов расчетных случаев, начиная с k-ого:
+        I120, U120 - токи КЗ и напряжения в узлах КЗ (m,nsc,3), X - значения
+        сохраняемых переменных (напряжения узлов keepq, токи ветвей keepp) (m*nsc,...)'''
+        cases = slice(k, k + I120.shape[0]*I120.shape[1])
+        X = X.reshape(X.shape[0],-1,3)
+        nkq = len(self.keepq)
+        self.I120[cases] = I120.reshape(-1,3)
+        self.U120[cases] = U120.reshape(-1,3)
+        self.Uq[cases] = X[:,:nkq]
+        self.Ip[cases] = X[:,nkq:]
+
+    def flush(self):
+        '''Запись изменений массивов хранилища на диск'''
+        for arr in (self.I120, self.U120, self.Uq, self.Ip):
+            if isinstance(arr, np.memmap):
+                arr.flush()
+
+
+class Net:
+    '''Служебный класс сохраненной (факторизованной) схемы замещения сети без несимметрий,
+    за исключением заземлений и обрывов нейтрали 'N0', создается методом mdl.Calc()
+
+    Переменные СЛАУ схемы: токи ветвей, напряжения узлов, переменные несимметрий 'N0'
+        K * x = b, размерность n = 3*(np+nq+n0)
+    Прочие несимметрии (порты) учитываются окаймлением матрицы K:
+        K * x + Bc * y = b
+        Cr * x + D * y = d
+    где y - токи КЗ и напряжения обрывов, Bc - столбцы связи несимметрий с уравнениями
+    по 1-ому и 2-ому законам Кирхгофа, Cr и D - граничные условия несимметрий.
+    Решение находится через дополнение Шура S = D - Cr * K^-1 * Bc:
+        y = S^-1 * (d - Cr * K^-1 * b)
+        x = K^-1 * (b - Bc * y)
+    Изменение параметров ветвей и взаимоиндукций после факторизации K учитывается
+    низкоранговой поправкой K1 = K + Bu * Cu (см. update()), где Bu - столбцы единичной
+    матрицы для r измененных строк K, Cu - разность строк K1 - K, и по формуле
+    Шермана-Моррисона-Вудбери
+        K1^-1 * b = K^-1 * b - Wu * (I + Cu * Wu)^-1 * Cu * K^-1 * b, Wu = K^-1 * Bu'''
+    chunk = 256 # Количество столбцов K^-1 * Bc, вычисляемых за одно решение
+    nmemo = 4 # Количество сохраняемых последних решений K^-1 * b (с числом столбцов b до 16)
+
+    def __init__(self, model):
+        self.model = model
+        arr = model.getarr()
+        self.bn0 = [kn for kn in model.bn if kn.SC == 'N0']
+        k0 = np.array([kn.id-1 for kn in self.bn0], dtype=np.int64)
+        ri,ci,cdata,_ = model.formslae(arr, k0)
+        self.nqp = 3*(model.np+model.nq)
+        self.n = self.nqp + 3*len(k0)
+        self.arr = arr
+        self.k0 = k0
+        self.dirty = set()
+        self.Wu = None
+        #Вычисленные столбцы K^-1 для строк ru, сохраняются между вызовами update()
+        self.ru = np.zeros(0, dtype=np.int64)
+        self.Wr = np.zeros((self.n, 0), dtype=np.cdouble)
+        self.memo = []
+        #Структура матрицы сохраняется в mdl.pattern и формируется заново только при ее изменении
+        pat = model.pattern
+        if pat is None or not pat.same(ri, ci, self.n):
+            pat = model.pattern = Pattern(ri, ci, self.n)
+        self.LHS = pat.matrix(cdata)
+        self.K = self.LHS
+        #Ветви с нулевым сопротивлением, исключаемые топологической обработкой схемы
+        self.zp = ZeroZ(arr) if model.topo else np.zeros(model.np, dtype=bool)
+        try:
+            self.LU = NetLU(self.LHS, 3*model.np, self.zp, arr, pat.perm, **self.setup())
+        except RuntimeError:
+            self.LU = None
+
+    def setup(self):
+        '''Служебный метод, возвращает настройки факторизации mdl.Setup() для NetLU()'''
+        mdl = self.model
+        return dict(engine=mdl.engine, solver=mdl.solver, permc_spec=mdl.permc_spec,
+                    precision=mdl.precision)
+
+    def valid(self):
+        '''Проверка соответствия сохраненной схемы текущему составу несимметрий 'N0'
+        и отсутствия обрывов на ветвях, исключенных топологической обработкой схемы'''
+        bn0 = [kn for kn in self.model.bn if kn.SC == 'N0']
+        if self.zp.any() and any(isinstance(kn.qp, P) and self.zp[kn.qp.id-1] for kn in self.model.bn):
+            return False
+        return len(bn0) == len(self.bn0) and all(kn1 is kn2 for kn1,kn2 in zip(bn0, self.bn0))
+
+    def solve(self, b):
+        '''Решение K * x = b с помощью сохраненной факторизации, b - вектор или матрица,
+        с учетом поправки на изменение параметров элементов (см. update())'''
+        x = self.lsolve(b)
+        if self.Wu is not None:
+            x -= self.Wu @ (self.Ci @ (self.Cu @ x))
+        return x
+
+    def lsolve(self, b):
+        '''Решение K * x = b с помощью сохраненной факторизации без поправки update(),
+        при совпадении b с одной из последних nmemo правых частей решение не выполняется'''
+        for bm,xm in self.memo:
+            if bm.shape == b.shape and np.array_equal(bm, b):
+                return xm.copy()
+        x = self.LU.solve(b)
+        if b.size <= 16*self.n:
+            self.memo = [(b.copy(), x.copy())] + self.memo[:self.nmemo-1]
+        return x
+
+    def update(self, listel):
+        '''Учет изменения параметров узлов, ветвей и взаимоиндукций из списка listel без
+        повторной факторизации K (см. описание класса), поправка формируется по всем элементам,
+        матрица параметров которых изменена после факторизации (изменение только E и J
+        учитывается в правой части и поправки не требует)
+        Возвращает False, если количество таких элементов превышает mdl.nupdate
+        или поправка невозможна, в этом случае необходима повторная факторизация'''
+        mdl = self.model
+        if self.LU is None:
+            return False
+        arr = self.arr
+        listq = [el for el in listel if isinstance(el, Q)]
+        listp = [el for el in listel if isinstance(el, P)]
+        listm = [el for el in listel if isinstance(el, M)]
+        for lel,getarrel in ((listq,mdl.getarrq), (listp,mdl.getarrp), (listm,mdl.getarrm)):
+            if lel:
+                idx = np.array([el.id-1 for el in lel], dtype=np.int64)
+                changed = np.zeros(len(lel), dtype=bool)
+                for key,val in getarrel(lel).items():
+                    if not key in ('E', 'J'):
+                        changed |= (arr[key][idx] != val).reshape(len(lel), -1).any(axis=1)
+                    arr[key][idx] = val
+                self.dirty.update(el for el,ch in zip(lel, changed) if ch)
+        if len(self.dirty) > mdl.nupdate:
+            return False
+        #Изменение состава ветвей с нулевым сопротивлением меняет топологию схемы
+        if mdl.topo and listp:
+            idx = np.array([el.id-1 for el in listp], dtype=np.int64)
+            if (self.zp[idx] | ZeroZ(arr)[idx]).any():
+                return False
+        ri,ci,cdata,_ = mdl.formslae(arr, self.k0)
+        if mdl.pattern.same(ri, ci, self.n):
+            K1 = mdl.pattern.matrix(cdata)
+        else:
+            K1 = csc_matrix((cdata, (ri, ci)), shape=(self.n, self.n))
+        self.K = K1
+        dK = (K1 - self.LHS).tocsr()
+        dK.eliminate_zeros()
+        ru = np.nonzero(np.diff(dK.indptr))[0]
+        if ru.size == 0:
+            self.Wu = None
+            return True
+        Wu = self.cols(ru)
+        Cu = dK[ru]
+        try:
+            Ci = np.linalg.inv(np.eye(ru.size) + Cu @ Wu)
+        except np.linalg.LinAlgError:
+            return False
+        self.Wu,self.Cu,self.Ci = Wu,Cu,Ci
+        return True
+
+    def cols(self, ru):
+        '''Служебный метод, возвращает столбцы K^-1 для строк ru (Wu = K^-1 * Bu, см. update()),
+        вычисленные столбцы сохраняются в self.Wr, self.ru и повторно не вычисляются'''
+        rn = np.setdiff1d(ru, self.ru)
+        if rn.size:
+            Bu = csc_matrix((np.ones(rn.size), (rn, np.arange(rn.size))), shape=(self.n, rn.size))
+            self.Wr = np.concatenate((self.Wr, self.lsolve(Bu.toarray())), axis=1)
+            self.ru = np.concatenate((self.ru, rn))
+        order = np.argsort(self.ru)
+        return self.Wr[:, order[np.searchsorted(self.ru[order], ru)]]
+
+    def rhs(self, E=None, J=None):
+        '''Формирование вектора правой части b - Э.Д.С. ветвей и J узлов
+        E, J - матрицы (3*np,nv) и (3*nq,nv) Э.Д.С. ветвей и J узлов nv расчетных вариантов,
+        при их задании формируется матрица правой части (n,nv), по умолчанию
+        используются Э.Д.С. и J элементов модели'''
+        mdl = self.model
+        if E is None:
+            E = np.array([kp.E for kp in mdl.bp], dtype=np.cdouble).ravel()
+        if J is None:
+            J = np.array([kq.J for kq in mdl.bq], dtype=np.cdouble).ravel()
+        if np.ndim(E) > 1 and np.ndim(J) == 1:
+            J = np.repeat(J[:,None], E.shape[1], axis=1)
+        elif np.ndim(J) > 1 and np.ndim(E) == 1:
+            E = np.repeat(E[:,None], J.shape[1], axis=1)
+        b = np.zeros((self.n,)+np.shape(E)[1:], dtype=np.cdouble)
+        b[0:3*mdl.np] = E
+        b[3*mdl.np:self.nqp] = -J
+        return b
+
+    def border(self, arrn):
+        '''Формирование окаймления Bc, Cr и D для несимметрий с параметрами arrn (см. getarrn)
+        Возвращает Bc - csc (n,m), Cr - csr (m,n) и D - (m,m), где m = 3*len(arrn['SC'])'''
+        m = 3*len(arrn['SC'])
+        ri,ci,cdata = formn(arrn['isq'], arrn['ne'], self.n + 3*np.arange(m//3),
+                            arrn['SC'], arrn['r'], self.model.np)
+        mb = (ri < self.n) & (ci >= self.n)
+        mc = (ri >= self.n) & (ci < self.n)
+        md = (ri >= self.n) & (ci >= self.n)
+        Bc = csc_matrix((cdata[mb], (ri[mb], ci[mb]-self.n)), shape=(self.n, m))
+        Cr = csc_matrix((cdata[mc], (ri[mc]-self.n, ci[mc])), shape=(m, self.n)).tocsr()
+        D = np.zeros((m, m), dtype=np.cdouble)
+        np.add.at(D, (ri[md]-self.n, ci[md]-self.n), cdata[md])
+        return Bc, Cr, D
+
+    def bsolve(self, b, Bc, Cr, D, d=None):
+        '''Решение окаймленной СЛАУ через дополнение Шура (см. описание класса),
+        D - матрица (m,m) или массив (nv,m,m) граничных условий nv вариантов, для которых
+        дополнение Шура S = D - Cr * K^-1 * Bc решается векторно, а b - вектор или матрица (n,nv)
+        Возвращает x и y'''
+        x0 = self.solve(b)
+        m = D.shape[-1]
+        if m == 0:
+            return x0, np.zeros((0,)+b.shape[1:], dtype=np.cdouble)
+        S = D.copy()
+        for k in range(0, m, self.chunk):
+            W = self.solve(Bc[:,k:k+self.chunk].toarray())
+            S[...,k:k+self.chunk] -= Cr @ W
+        d = -(Cr @ x0) if d is None else d - Cr @ x0
+        if S.ndim > 2:
+            #Векторное решение малых систем вариантов
+            d = np.broadcast_to(d.T if d.ndim > 1 else d, (S.shape[0], m))
+            y = np.linalg.solve(S, d[:,:,None])[:,:,0].T
+            if x0.ndim == 1:
+                x0,b = x0[:,None],b[:,None]
+        else:
+            y = np.linalg.solve(S, d)
+        if m <= self.chunk:
+            x = x0 - W @ y
+        else:
+            x = self.solve(b - Bc @ y)
+        return x, y
+
+    def check(self, b, Bc, Cr, D, listn):
+        '''Проверка структурного ранга окаймленной СЛАУ (см. mdl.Test4Rank()) с учетом
+        изменения параметров элементов (см. update()) и топологической обработки схемы
+        (см. TopoLU), проверяются только острова схемы
+        с ненулевой правой частью b или несимметриями (остальные не рассчитываются, см. IslandLU)
+        При структурной вырожденности - исключение ValueError'''
+        K,rows = self.K,np.arange(self.n)
+        if isinstance(self.LU, TopoLU):
+            #Проверяется СЛАУ схемы с объединенными узлами, строка которой соответствует
+            #первой из объединяемых строк исходной СЛАУ
+            Pr = self.LU.Pr
+            K,Bc,Cr,b = Pr.T @ K @ Pr, Pr.T @ Bc, Cr @ Pr, Pr.T @ b
+            rows = Pr.indices[Pr.indptr[:-1]]
+        nr = K.shape[0]
+        A = bmat([[K, Bc], [Cr, csc_matrix(D)]], format='csr')
+        nc,lab = Components(A)
+        act = np.zeros(nc, dtype=bool)
+        act[lab[:nr][np.asarray(b).reshape(nr, -1).any(axis=1)]] = True
+        act[lab[nr:]] = True
+        idx = np.flatnonzero(act[lab])
+        #Номера строк СЛАУ в формате mdl.formslae(): несимметрии в порядке bn0, listn
+        rows = np.concatenate((rows, self.n + np.arange(D.shape[0])))
+        self.model.checkrank(A[idx][:,idx], rows[idx], self.bn0 + listn)
+
+    def calc(self, b=None):
+        '''Расчет электрических величин для текущего состава несимметрий модели
+        b - вектор или матрица правой части (см. rhs()), по умолчанию - по параметрам модели
+        Возвращает вектор (матрицу) X в формате mdl.Calc()'''
+        mdl = self.model
+        if b is None:
+            b = self.rhs()
+        listn = [kn for kn in mdl.bn if kn.SC != 'N0']
+        arrn = mdl.getarrn(listn)
+        Bc,Cr,D = self.border(arrn)
+        rr = mdl.getr(listn)
+        if rr.shape[1] > 1:
+            #Переходные сопротивления входят только в граничные условия D (строки несимметрий):
+            #D(r) = D(0) + r*(D(1) - D(0)), варианты r решаются векторно (см. bsolve())
+            if b.ndim > 1 and b.shape[1] != rr.shape[1]:
+                raise ValueError('Ошибка при расчете вариантов', '\n',
+                                 'Количество вариантов E, J и массивов r несимметрий должно совпадать!')
+            arrn['r'] = np.zeros(len(listn))
+            D0 = self.border(arrn)[2]
+            arrn['r'] = np.ones(len(listn))
+            D = D0 + np.repeat(rr.T, 3, axis=1)[:,:,None] * (self.border(arrn)[2] - D0)
+        if mdl.check:
+            self.check(b, Bc, Cr, np.abs(D).sum(axis=0) if D.ndim > 2 else D, listn)
+        x,y = self.bsolve(b, Bc, Cr, D)
+        return self.result(x, y, listn)
+
+    def result(self, x, y, listn):
+        '''Служебный метод, формирует вектор (матрицу) X в формате mdl.Calc() по решению
+        x, y окаймленной СЛАУ (см. bsolve()) для несимметрий listn (кроме 'N0')'''
+        mdl = self.model
+        X = np.zeros((3*(mdl.np+mdl.nq+mdl.nn),)+x.shape[1:], dtype=np.cdouble)
+        X[0:self.nqp] = x[0:self.nqp]
+        nId = self.nqp + 3*np.array([kn.id-1 for kn in self.bn0], dtype=np.int64)
+        X[(nId[:,None] + arr012).ravel()] = x[self.nqp:]
+        nId = self.nqp + 3*np.array([kn.id-1 for kn in listn], dtype=np.int64)
+        X[(nId[:,None] + arr012).ravel()] = y
+        return X
+
+    def outage(self, out, live, qb=()):
+        '''Служебный метод, определяет части схемы, теряющие связь с землей и источниками
+        при отключении ветвей out (индексы, начиная с 0), live - признаки (nq,) узлов
+        с источниками тока J или Э.Д.С. подключенных ветвей, qb - индексы узлов, к которым
+        остаются подключенными поперечные проводимости B/2 отключенных ветвей
+        Связность определяется, как в mdl.Islands(), по графу узлов и земли с учетом
+        взаимоиндукций и проводимостей Y узлов, узлы live и qb связываются с землей
+        Возвращает признаки отключенных узлов (nq,) и ветвей (np,), включая ветви out'''
+        arr = self.arr
+        nq = self.model.nq
+        on = np.ones(self.model.np, dtype=bool)
+        on[out] = False
+        q1 = np.where(arr['q1'] >= 0, arr['q1'], nq)[on]
+        q2 = np.where(arr['q2'] >= 0, arr['q2'], nq)[on]
+        qm = np.where(arr['q1'] >= 0, arr['q1'], arr['q2'])
+        qm = np.where(qm >= 0, qm, nq)
+        mon = on[arr['m1']] & on[arr['m2']]
+        qy = np.concatenate((np.flatnonzero(live | (arr['Y'] != 0).any(axis=1)), qb))
+        ri = np.concatenate((q1, qm[arr['m1']][mon], qy))
+        ci = np.concatenate((q2, qm[arr['m2']][mon], np.full(qy.size, nq)))
+        G = csr_matrix((np.ones(ri.size), (ri, ci)), shape=(nq+1, nq+1))
+        _,lab = connected_components(G, directed=False)
+        dq = lab[:nq] != lab[nq]
+        dq1 = np.append(dq, False)
+        dp = ~on | dq1[arr['q1']] | dq1[arr['q2']]
+        return dq, dp
+
+    def contingency(self, outs, ends=None, arrn=None, act=None):
+        '''Расчет текущего состава несимметрий модели для схем с отключенными ветвями
+        (см. mdl.CalcContingency(), mdl.CalcCascade())
+        outs - список массивов индексов (начиная с 0) отключаемых ветвей расчетных случаев;
+        ends - список массивов (len(out),2) признаков отключения ветвей от 1-ого и 2-ого
+               узлов, по умолчанию - ветви отключаются от обоих узлов;
+        arrn - параметры (см. getarrn()) дополнительных несимметрий, учитываемых окаймлением
+               вместе с несимметриями модели (кроме 'N0');
+        act - список массивов признаков учета несимметрий модели (кроме 'N0') и
+              дополнительных несимметрий в расчетных случаях, по умолчанию - все
+        Отключение учитывается низкоранговой поправкой к сохраненной факторизации, как
+        в update(): уравнения отключенной ветви заменяются на I = 0 (Э.Д.С. исключается),
+        для ветви, отключенной с одной стороны, - на уравнения ветви с B/2 на отключенном
+        конце (при B = 0 - на I = 0), к диагонали узлов, от которых ветвь отключена,
+        добавляется B/2 ветви, уравнения
+        частей схемы, потерявших связь с землей и источниками (см. outage()), заменяются
+        на U = 0, I = 0, в том числе уравнения несимметрий 'N0' на них и на отключенных
+        ветвях, токи КЗ и напряжения обрывов в них принимаются равными нулю;
+        Взаимоиндукции отключенной ветви исключаются при нулевом токе ветви, поправка
+        формируется относительно факторизованной K с учетом изменений update()
+        Возвращает X - матрицу (3*(np+nq+nn),len(outs)) в формате mdl.Calc() и
+        Y - матрицу (3*m,len(outs)) токов КЗ и напряжений обрывов несимметрий модели
+        (кроме 'N0') и дополнительных несимметрий, для случаев с вырожденной СЛАУ - nan'''
+        mdl = self.model
+        arr = self.arr
+        b = self.rhs()
+        listn = [kn for kn in mdl.bn if kn.SC != 'N0']
+        if mdl.getr(listn).shape[1] > 1:
+            raise ValueError('Ошибка при расчете отключений ветвей', '\n',
+                             'Расчет с массивами переходных сопротивлений r несимметрий не предусмотрен!')
+        arrn0 = mdl.getarrn(listn)
+        if mdl.check:
+            self.check(b, *self.border(arrn0), listn)
+        if arrn is not None:
+            arrn = {key: np.concatenate((val, arrn[key])) for key,val in arrn0.items()}
+        else:
+            arrn = arrn0
+        Bc,Cr,D = self.border(arrn)
+        m = D.shape[0]
+        #Узлы с источниками
+        live = (arr['J'] != 0).any(axis=1)
+        pe = (arr['E'] != 0).any(axis=1)
+        for q in (arr['q1'], arr['q2']):
+            live[q[pe & (q >= 0)]] = True
+        isq,ne = arrn['isq'],arrn['ne']
+        #Строки несимметрий 'N0' в узлах и на ветвях
+        n0q = np.array([isinstance(kn.qp, Q) for kn in self.bn0], dtype=bool)
+        n0e = np.array([kn.qp.id-1 for kn in self.bn0], dtype=np.int64)
+        K = self.K.tocsr()
+        LHS = self.LHS.tocsr()
+        dK = (K - LHS).tocsr()
+        dK.eliminate_zeros()
+        re = np.nonzero(np.diff(dK.indptr))[0]
+        xb = self.lsolve(b)
+        Wb = self.lsolve(Bc.toarray()) if m else np.zeros((self.n, 0), dtype=np.cdouble)
+        X = np.full((3*(mdl.np+mdl.nq+mdl.nn), len(outs)), np.nan, dtype=np.cdouble)
+        Y = np.full((m, len(outs)), np.nan, dtype=np.cdouble)
+        for k,out in enumerate(outs):
+            out = np.asarray(out, dtype=np.int64)
+            qb = np.stack((arr['q1'][out], arr['q2'][out]), axis=1)
+            mb = np.ones(qb.shape, dtype=bool) if ends is None else np.asarray(ends[k], dtype=bool).reshape(-1,2)
+            #Узлы, к которым остаются подключенными B/2 ветвей, отключенных с одной стороны
+            qy = qb[~mb & (qb >= 0) & (arr['B'][out] != 0).any(axis=1)[:,None]]
+            dq,dp = self.outage(out, live, qy)
+            d0 = np.where(n0q, dq[n0e], dp[n0e])
+            rz = np.concatenate((np.flatnonzero(dp), mdl.np + np.flatnonzero(dq),
+                                 mdl.np + mdl.nq + np.flatnonzero(d0)))
+            rz = (3*rz[:,None] + arr012).ravel()
+            #Ветви, отключенные с одной стороны: ток ветви замыкается через B/2 отключенного
+            #конца, напряжение которого исключается из уравнения ветви (U = -2*I/B для 1-ого
+            #узла, U = 2*Kt'*I/B для 2-ого узла), при B = 0 ток ветви равен нулю
+            dqb = np.append(dq, False)[qb]
+            po = (mb.sum(axis=1) == 1) & ~np.where(mb[:,0], dqb[:,1], dqb[:,0])
+            lp = 3*out[po][:,None] + arr012
+            Bp = arr['B'][out[po]]
+            Kt = arr['Kt'][out[po]]
+            e2 = mb[po][:,1:]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                zp = np.where(e2, 2*Kt*Kt[:,[1,0,2]], 2) / Bp
+            sb = Bp != 0
+            rm = lp[sb]
+            rz = np.setdiff1d(rz, rm)
+            #Исключаемые элементы: напряжение отключенного узла в уравнении ветви
+            #и ток ветви в уравнении отключенного узла
+            qo = np.where(e2, qb[po][:,1:], qb[po][:,:1])[:,0]
+            mo = sb & (qo >= 0)[:,None]
+            ro = (3*(mdl.np + qo)[:,None] + arr012)[mo]
+            drop = np.concatenate((rm[mo[sb]]*self.n + ro, ro*self.n + lp[mo]))
+            #Поперечные проводимости отключенных ветвей в узлах, оставшихся в работе
+            pb = np.repeat(out, 2)
+            qb = qb.ravel()
+            mb = mb.ravel() & (qb >= 0)
+            mb[mb] = ~dq[qb[mb]]
+            rb = (3*(mdl.np + qb[mb])[:,None] + arr012).ravel()
+            B2 = (arr['B'][pb[mb]]/2).ravel()
+            R = np.unique(np.concatenate((re, rz, rb, rm)))
+            KR = K[R].tocoo()
+            keep = ~np.isin(R[KR.row], rz) & ~np.isin(R[KR.row]*self.n + KR.col, drop)
+            iz = np.searchsorted(R, rz)
+            ri = np.concatenate((KR.row[keep], iz, np.searchsorted(R, rb), np.searchsorted(R, rm)))
+            ci = np.concatenate((KR.col[keep], rz, rb, rm))
+            cdata = np.concatenate((KR.data[keep], np.ones(rz.size), B2, zp[sb]))
+            Cu = csr_matrix((cdata, (ri, ci)), shape=(R.size, self.n)) - LHS[R]
+            Wu = self.cols(R)
+            G = np.eye(R.size) + Cu @ Wu
+            try:
+                if R.size and np.linalg.cond(G) * np.finfo(np.double).eps > 1:
+                    continue
+                Ci = np.linalg.inv(G)
+                v = xb - Wu[:, iz] @ b[rz]
+                x0 = v - Wu @ (Ci @ (Cu @ v))
+                #Неучитываемые несимметрии и несимметрии в отключенных частях схемы
+                #исключаются из окаймления
+                ym = ~np.where(isq, dq[ne], dp[ne])
+                if act is not None:
+                    ym &= act[k]
+                ym = np.repeat(ym, 3)
+                W = Wb[:,ym] - Wu @ (Ci @ (Cu @ Wb[:,ym]))
+                S = D[ym][:,ym] - Cr[ym] @ W
+                if S.size and np.linalg.cond(S) * np.finfo(np.double).eps > 1:
+                    continue
+                y = np.zeros(m, dtype=np.cdouble)
+                y[ym] = np.linalg.solve(S, -(Cr[ym] @ x0))
+            except np.linalg.LinAlgError:
+                continue
+            X[:,k] = self.result(x0 - W @ y[ym], y[0:3*len(listn)], listn)
+            Y[:,k] = y
+        return X, Y
+
+    def linefault(self, j, xs, SC, r=0, full=True):
+        '''Расчет КЗ вида SC с переходным сопротивлением r на ветви j (индекс, начиная с 0)
+        на расстояниях xs (доли длины ветви от 1-ого узла) вместе с текущим составом
+        несимметрий модели (см. mdl.CalcLineFault())
+        Ветвь делится местом КЗ k на участки q1-k и k-q2 с сопротивлениями x*Z и (1-x)*Z,
+        поперечными проводимостями x*B и (1-x)*B и взаимоиндукциями x*M и (1-x)*M,
+        переменная тока ветви - ток участка q1-k, напряжение Uk места КЗ, ток I2 участка k-q2
+        и ток КЗ - дополнительные переменные окаймления z, уравнения места КЗ и участка
+        k-q2 - дополнительные строки окаймления:
+            K(x) * x + Bc * yn + Bz(x) * z = b
+            Cr * x + Dn * yn = 0
+            Cz(x) * x + Dz(x) * z = 0
+        где изменение строк K(x) (ветви j, ветвей взаимоиндукций и узлов q1, q2), Bz, Cz и Dz
+        линейно зависят от x, поэтому поправка (см. update()), столбцы K^-1 изменяемых строк
+        и их произведения на строки окаймления вычисляются однократно, а для всех xs
+        решаются только малые системы уравнений (векторно по xs)
+        Возвращает X - матрицу (3*(np+nq+nn),len(xs)) в формате mdl.Calc() (переменная ветви j -
+        ток участка q1-k), при full=False - None, z - массив (len(xs),9) - Uk, I2 и ток КЗ и
+        xj - массив (len(xs),9) - ток участка q1-k и напряжения узлов q1, q2 (для земли - нули)
+        в симметричных составляющих'''
+        mdl = self.model
+        arr = self.arr
+        n = self.n
+        xs = np.asarray(xs, dtype=np.double).ravel()
+        b = self.rhs()
+        listn = [kn for kn in mdl.bn if kn.SC != 'N0']
+        if mdl.getr(listn).shape[1] > 1:
+            raise ValueError('Ошибка при расчете промежуточного КЗ', '\n',
+                             'Расчет с массивами переходных сопротивлений r несимметрий не предусмотрен!')
+        Bc,Cr,D = self.border(mdl.getarrn(listn))
+        if mdl.check:
+            self.check(b, Bc, Cr, D, listn)
+        mn = D.shape[0]
+        K = self.K.tocsr()
+        LHS = self.LHS.tocsr()
+        dK = (K - LHS).tocsr()
+        dK.eliminate_zeros()
+        re = np.nonzero(np.diff(dK.indptr))[0]
+        rj = 3*j + arr012
+        q1,q2 = arr['q1'][j],arr['q2'][j]
+        B2 = arr['B'][j]/2
+        Z = K[rj][:,rj].diagonal()
+        #Взаимоиндукции: элементы строк ветви j и столбцов ветви j в строках других ветвей
+        Kj = K[rj].tocoo()
+        mj = (Kj.col < 3*mdl.np) & (Kj.col // 3 != j)
+        Kl = K[:, rj].tocoo()
+        ml = (Kl.row < 3*mdl.np) & (Kl.row // 3 != j)
+        uq1 = 3*(mdl.np + q1) + arr012
+        uq2 = 3*(mdl.np + q2) + arr012
+        R = [re, rj, Kl.row[ml]]
+        R += [uq1] if q1 >= 0 else []
+        R += [uq2] if q2 >= 0 else []
+        R = np.unique(np.concatenate(R))
+        ir = lambda rows: np.searchsorted(R, rows)
+        #Изменение строк K(x) - K = D0 + x*D1 (строки R), Bz(x) = Bz0 + x*Bz1 (строки R)
+        lri = [ir(rj), ir(rj[Kj.row[mj]]), ir(Kl.row[ml])]
+        lci = [rj, Kj.col[mj], rj[Kl.col[ml]]]
+        l0 = [-Z, -Kj.data[mj], -Kl.data[ml]]
+        l1 = [Z, Kj.data[mj], Kl.data[ml]]
+        bri = [ir(rj), ir(Kl.row[ml])]
+        bci = [arr012, 3 + Kl.col[ml]]
+        b0 = [np.ones(3), Kl.data[ml]]
+        b1 = [np.zeros(3), -Kl.data[ml]]
+        if q2 >= 0:
+            lri += [ir(rj), ir(uq2), ir(uq2)]
+            lci += [uq2, rj, uq2]
+            l0 += [-np.ones(3), -np.ones(3), np.zeros(3)]
+            l1 += [np.zeros(3), np.zeros(3), B2]
+            bri += [ir(uq2)]
+            bci += [3 + arr012]
+            b0 += [np.ones(3)]
+            b1 += [np.zeros(3)]
+        if q1 >= 0:
+            lri += [ir(uq1)]
+            lci += [uq1]
+            l0 += [B2]
+            l1 += [-B2]
+        lri,lci,bri,bci = map(np.concatenate, (lri, lci, bri, bci))
+        C0 = dK[R] + csr_matrix((np.concatenate(l0), (lri, lci)), shape=(R.size, n))
+        C1 = csr_matrix((np.concatenate(l1), (lri, lci)), shape=(R.size, n))
+        Bz0 = np.zeros((R.size, 9), dtype=np.cdouble)
+        Bz1 = np.zeros((R.size, 9), dtype=np.cdouble)
+        np.add.at(Bz0, (bri, bci), np.concatenate(b0))
+        np.add.at(Bz1, (bri, bci), np.concatenate(b1))
+        #Строки окаймления места КЗ: Cz(x) = Cz0 + x*Cz1, Dz(x) = Dz0 + x*Dz1
+        zri = [arr012, 3 + Kj.row[mj]]
+        zci = [rj, Kj.col[mj]]
+        z0 = [np.ones(3), Kj.data[mj]]
+        z1 = [np.zeros(3), -Kj.data[mj]]
+        if q2 >= 0:
+            zri += [3 + arr012]
+            zci += [uq2]
+            z0 += [np.ones(3)]
+            z1 += [np.zeros(3)]
+        zri,zci = map(np.concatenate, (zri, zci))
+        Cz0 = csr_matrix((np.concatenate(z0), (zri, zci)), shape=(9, n))
+        Cz1 = csr_matrix((np.concatenate(z1), (zri, zci)), shape=(9, n))
+        ri,ci,cdata = formn(np.ones(1, dtype=bool), np.zeros(1, dtype=np.int64), np.array([6]),
+                            np.array([SC], dtype=object), np.array([r], dtype=np.double), 0)
+        Dz0 = np.zeros((9, 9), dtype=np.cdouble)
+        np.add.at(Dz0, (ri, ci), cdata)
+        Dz0[arr012, arr012] -= B2
+        Dz0[arr012, 3 + arr012] = -1
+        Dz0[3 + arr012, 3 + arr012] = Z
+        Dz0[3 + arr012, arr012] = -1
+        Dz1 = np.zeros((9, 9), dtype=np.cdouble)
+        Dz1[3 + arr012, 3 + arr012] = -Z
+        #Однократно вычисляемые величины
+        Wu = self.cols(R)
+        xb = self.lsolve(b)
+        Wb = self.lsolve(Bc.toarray()) if mn else np.zeros((n, 0), dtype=np.cdouble)
+        V = np.concatenate((xb[:,None], Wb, Wu), axis=1)
+        CV0 = np.concatenate((C0 @ V, Cz0 @ V, Cr @ V))
+        CV1 = np.concatenate((C1 @ V, Cz1 @ V, np.zeros((mn, V.shape[1]))))
+        CV = CV0[None] + xs[:,None,None] * CV1[None]
+        nr = R.size
+        CuV,CzV,CrV = CV[:,:nr],CV[:,nr:nr+9],CV[:,nr+9:]
+        G = np.eye(nr) + CuV[:,:,1+mn:]
+        Bz = Bz0[None] + xs[:,None,None] * Bz1[None]
+        #a = Ci * [Cu*xb, Cu*Wb, Bz]
+        A = np.linalg.solve(G, np.concatenate((CuV[:,:,:1+mn], Bz), axis=2))
+        ab,an,az = A[:,:,:1],A[:,:,1:1+mn],A[:,:,1+mn:]
+        Cw = np.concatenate((CrV, CzV), axis=1)
+        CWu = Cw[:,:,1+mn:]
+        Dall = np.zeros((xs.size, mn+9, mn+9), dtype=np.cdouble)
+        Dall[:,:mn,:mn] = D
+        Dall[:,mn:,mn:] = Dz0[None] + xs[:,None,None] * Dz1[None]
+        S = Dall - np.concatenate((Cw[:,:,1:1+mn] - CWu @ an, CWu @ az), axis=2)
+        ya = np.linalg.solve(S, -(Cw[:,:,:1] - CWu @ ab))
+        yn,z = ya[:,:mn],ya[:,mn:]
+        yn,c = yn[:,:,0].T,(ab - an @ yn + az @ z)[:,:,0].T
+        lx = np.concatenate((rj, np.where(q1 >= 0, uq1, 0), np.where(q2 >= 0, uq2, 0)))
+        xj = (xb[lx,None] - Wb[lx] @ yn - Wu[lx] @ c).T
+        xj[:,3:6] *= q1 >= 0
+        xj[:,6:9] *= q2 >= 0
+        if not full:
+            return None, z[:,:,0], xj
+        x = xb[:,None] - Wb @ yn - Wu @ c
+        return self.result(x, yn, listn), z[:,:,0], xj
+
+class SeqLU:
+    '''Служебный класс раздельной факторизации схем прямой, обратной и нулевой
+    последовательностей, см. mdl.Setup(engine='seq')
+    Строки и столбцы СЛАУ схемы без несимметрий (кроме 'N0') с номером k относятся
+    к последовательности k % 3 (0 - прямая, 1 - обратная, 2 - нулевая)'''
+    def __init__(self, LHS, solver='auto', permc_spec=None, cache=None, precision='double'):
+        n = LHS.shape[0]
+        self.idx = [np.arange(k, n, 3) for k in range(3)]
+        K = [LHS[ik][:,ik].tocsc() for ik in self.idx]
+        if sum(Kk.nnz for Kk in K) != LHS.nnz:
+            raise ValueError('Ошибка при раздельной факторизации схем последовательностей', '\n',
+                             'Схемы последовательностей связаны друг с другом!')
+        kw = dict(cache=cache, precision=precision)
+        self.LU = [Factorize(K[0], solver, permc_spec, key='seq1', **kw), None,
+                   Factorize(K[2], solver, permc_spec, key='seq0', **kw)]
+        #Схема обратной последовательности совпадает со схемой прямой последовательности
+        self.same12 = (K[0] != K[1]).nnz == 0
+        self.LU[1] = self.LU[0] if self.same12 else Factorize(K[1], solver, permc_spec, key='seq2', **kw)
+
+    def solve(self, b):
+        '''Решение СЛАУ, b - вектор или матрица правой части'''
+        x = np.empty(b.shape, dtype=np.cdouble)
+        i1,i2,i0 = self.idx
+        if self.same12:
+            m = b[i1].reshape(len(i1), -1).shape[1]
+            x12 = self.LU[0].solve(np.concatenate((b[i1].reshape(len(i1),-1), b[i2].reshape(len(i2),-1)), axis=1))
+            x[i1] = x12[:,:m].reshape(b[i1].shape)
+            x[i2] = x12[:,m:].reshape(b[i2].shape)
+        else:
+            x[i1] = self.LU[0].solve(b[i1])
+            x[i2] = self.LU[1].solve(b[i2])
+        x[i0] = self.LU[2].solve(b[i0])
+        return x
+
+class YbusLU:
+    '''Служебный класс факторизации матрицы узловых проводимостей, см. mdl.Setup(engine='ybus')
+    СЛАУ схемы без несимметрий (кроме 'N0') разбивается на блоки
+        Zb * Ip + Ab * Ur = bp
+        Cb * Ip + Dr * Ur = br
+    где Ip - токи ветвей, Ur - напряжения узлов и переменные несимметрий 'N0',
+    Zb - блочно-диагональная матрица сопротивлений ветвей и групп взаимоиндукций.
+    Исключением токов ветвей формируется матрица узловых проводимостей (со знаком минус)
+        Y = Dr - Cb * Zb^-1 * Ab
+    и решение находится в виде
+        Ur = Y^-1 * (br - Cb * Zb^-1 * bp)
+        Ip = Zb^-1 * (bp - Ab * Ur)'''
+    def __init__(self, LHS, nP, solver='auto', permc_spec=None, cache=None, precision='double'):
+        K = LHS.tocsc()
+        self.nP = nP
+        self.Zi = BlockInv(K[:nP,:nP])
+        self.Ab = K[:nP,nP:].tocsr()
+        self.Cb = K[nP:,:nP].tocsr()
+        self.Y = (K[nP:,nP:] - self.Cb @ self.Zi @ self.Ab).tocsc()
+        self.LU = Factorize(self.Y, solver, permc_spec, cache=cache, key='ybus', precision=precision)
+
+    def solve(self, b):
+        '''Решение СЛАУ, b - вектор или матрица правой части'''
+        nP = self.nP
+        x = np.empty(b.shape, dtype=np.cdouble)
+        x[nP:] = self.LU.solve(b[nP:] - self.Cb @ (self.Zi @ b[:nP]))
+        x[:nP] = self.Zi @ (b[:nP] - self.Ab @ x[nP:])
+        return x
+
+class TopoLU:
+    '''Служебный класс топологической обработки схемы, см. mdl.Setup(topo=True)
+    Узлы, связанные ветвями с нулевым сопротивлением zp (см. ZeroZ()), объединяются
+    (система непересекающихся множеств), такие ветви исключаются из СЛАУ схемы:
+        Kr = Pr' * K * Pr
+    где Pr - матрица (n,nr) перехода от переменных схемы с объединенными узлами
+    к переменным исходной схемы (одинаковые напряжения объединенных узлов, нулевые токи
+    исключенных ветвей), умножение на Pr' суммирует уравнения по 1-ому закону Кирхгофа
+    объединяемых узлов, в сумме которых токи исключенных ветвей взаимно уничтожаются.
+    Решение K * x = b находится в виде
+        x = Pr * Kr^-1 * Pr' * b
+    после чего токи исключенных ветвей, вошедших в остовное дерево объединенных узлов,
+    определяются из уравнений по 1-ому закону Кирхгофа узлов дерева (кроме корневого)
+        G * Iz = b[rt] - K[rt] * x
+    токи остальных исключенных ветвей (замыкающих контуры) равны нулю.
+    Правая часть b в строках уравнений по 2-ому закону Кирхгофа исключенных ветвей
+    должна быть нулевой (E=0), Э.Д.С. таких ветвей в mdl.CalcScenarios() не учитываются'''
+    def __init__(self, K, zp, arr, factorize):
+        K = K.tocsr()
+        n = K.shape[0]
+        np_ = arr['Z'].shape[0]
+        nq = arr['Y'].shape[0]
+        q1 = arr['q1'].tolist()
+        q2 = arr['q2'].tolist()
+        #Объединение узлов (система непересекающихся множеств со сжатием путей)
+        root = list(range(nq))
+        def find(q):
+            while root[q] != q:
+                root[q] = root[root[q]]
+                q = root[q]
+            return q
+        tree = np.zeros(np_, dtype=bool)
+        for kp in np.flatnonzero(zp).tolist():
+            r1 = find(q1[kp])
+            r2 = find(q2[kp])
+            if r1 != r2:
+                root[r2] = r1
+                tree[kp] = True
+        root = np.array([find(q) for q in range(nq)], dtype=np.int64)
+        _,gq = np.unique(root, return_inverse=True)
+        nqr = gq.max()+1 if nq else 0
+        pr = np.flatnonzero(~zp)
+        npr = pr.size
+        #Номера переменных схемы с объединенными узлами для переменных исходной схемы
+        red = np.concatenate(((3*np.arange(npr)[:,None] + arr012).ravel(),
+                              (3*(npr+gq)[:,None] + arr012).ravel(),
+                              3*(npr+nqr) + np.arange(n - 3*(np_+nq))))
+        rows = np.concatenate(((3*pr[:,None] + arr012).ravel(), np.arange(3*np_, n)))
+        nr = n - 3*(np_-npr+nq-nqr)
+        self.Pr = csc_matrix((np.ones(red.size), (rows, red)), shape=(n, nr))
+        self.LU = factorize((self.Pr.T @ K @ self.Pr).tocsc(), 3*npr)
+        #Уравнения по 1-ому закону Кирхгофа некорневых узлов деревьев и токи ветвей деревьев
+        self.rt = (3*(np_+np.flatnonzero(root != np.arange(nq)))[:,None] + arr012).ravel()
+        self.ct = (3*np.flatnonzero(tree)[:,None] + arr012).ravel()
+        self.Kt = K[self.rt]
+        self.G = splu(self.Kt[:,self.ct].tocsc()) if self.ct.size else None
+
+    def solve(self, b):
+        '''Решение СЛАУ, b - вектор или матрица правой части'''
+        x = self.Pr @ self.LU.solve(self.Pr.T @ b)
+        if self.G is not None:
+            x[self.ct] = self.G.solve(b[self.rt] - self.Kt @ x)
+        return x
+
+class IslandLU:
+    '''Служебный класс раздельной факторизации электрически независимых частей (островов)
+    схемы без несимметрий (кроме 'N0'), не связанных ветвями, взаимоиндукциями
+    и несимметриями 'N0' (см. Components()), матрица K которых блочно-диагональна
+    с точностью до перестановки. Острова факторизуются и решаются параллельно
+    в пуле из nthread потоков (ThreadPoolExecutor), создаваемом один раз при
+    факторизации и используемом при всех решениях, при вырожденности матрицы острова
+    его факторизация не сохраняется. Острова без Э.Д.С., источников тока и
+    несимметрий (нулевая правая часть) не решаются, их решение - нулевое, при
+    ненулевой правой части вырожденного острова - исключение np.linalg.LinAlgError'''
+    nthread = None # Количество потоков, по умолчанию - по количеству процессоров
+
+    def __init__(self, K, nP, lab, factorize):
+        K = K.tocsr()
+        order = np.argsort(lab, kind='stable')
+        counts = np.bincount(lab)
+        self.idx = np.split(order, np.cumsum(counts)[:-1])
+        def fact(k):
+            idx = self.idx[k]
+            try:
+                return factorize(K[idx][:,idx].tocsc(), np.count_nonzero(idx < nP), k)
+            except RuntimeError:
+                return None
+        self.pool = ThreadPoolExecutor(self.nthread)
+        self.LU = list(self.pool.map(fact, range(len(self.idx))))
+
+    def solve(self, b):
+        '''Решение СЛАУ, b - вектор или матрица правой части'''
+        x = np.zeros(b.shape, dtype=np.cdouble)
+        active = [k for k,idx in enumerate(self.idx) if b[idx].any()]
+        if any(self.LU[k] is None for k in active):
+            raise np.linalg.LinAlgError('Singular matrix')
+        def sol(k):
+            x[self.idx[k]] = self.LU[k].solve(b[self.idx[k]])
+        if len(active) > 1:
+            list(self.pool.map(sol, active))
+        else:
+            for k in active:
+                sol(k)
+        return x
+
+class PermLU:
+    '''Служебный класс LU-разложения SuperLU с заданной симметричной перестановкой строк
+    и столбцов матрицы A (perm), полученной при факторизации матрицы той же структуры,
+    упорядочивание для уменьшения заполнения повторно не вычисляется'''
+    def __init__(self, A, perm):
+        self.perm = perm
+        self.LU = splu(A[perm][:,perm].tocsc(), permc_spec='NATURAL')
+
+    def solve(self, b):
+        '''Решение СЛАУ, b - вектор или матрица правой части'''
+        x = np.empty(b.shape, dtype=np.cdouble)
+        x[self.perm] = self.LU.solve(b[self.perm])
+        return x
+
+class RefineLU:
+    '''Служебный класс решения СЛАУ A * x = b с факторизацией матрицы A в complex64
+    (см. mdl.Setup(precision='single')) и итерационным уточнением решения
+        r = b - A * x (в complex128), x = x + LU^-1 * r
+    до изменения решения не более tol от его величины (не более nrefine шагов),
+    при отсутствии сходимости (плохо обусловленная матрица A) A факторизуется
+    в complex128 с предупреждением RuntimeWarning, дальнейшие решения выполняются
+    по факторизации в complex128 (single = False)'''
+    nrefine = 5 # Максимальное количество шагов уточнения
+    tol = 1e-12 # Относительная величина изменения решения на последнем шаге уточнения
+
+    def __init__(self, A, factorize):
+        self.A = A
+        self.factorize = factorize
+        self.LU = factorize(A.astype(np.complex64))
+        self.single = True
+
+    def solve(self, b):
+        '''Решение СЛАУ, b - вектор или матрица правой части'''
+        if not self.single:
+            return self.LU.solve(b)
+        x = self.LU.solve(b.astype(np.complex64)).astype(np.cdouble)
+        for _ in range(self.nrefine):
+            dx = self.LU.solve((b - self.A @ x).astype(np.complex64))
+            x += dx
+            if (np.abs(dx).max(axis=0) <= self.tol*np.abs(x).max(axis=0)).all():
+                return x
+        warnings.warn('Итерационное уточнение решения по факторизации в одинарной точности '
+                      'не сошлось за {} шагов, выполнена факторизация в двойной точности'.format(self.nrefine),
+                      RuntimeWarning, stacklevel=2)
+        self.LU = self.factorize(self.A)
+        self.single = False
+        return self.LU.solve(b)
+
+class Pattern:
+    '''Служебный класс скомпилированной структуры (шаблона) разреженной матрицы СЛАУ
+    размерностью n, заданной номерами строк ri и столбцов ci ненулевых элементов
+    в порядке их формирования методом mdl.formslae(), хранит:
+        indptr, indices - структуру CSC матрицы;
+        slot - номер элемента data CSC матрицы для каждого элемента ri, ci
+               (т.е. для каждого параметра узлов, ветвей, взаимоиндукций и несимметрий);
+        perm - словарь перестановок, найденных при факторизации матриц данной структуры.
+    Структура матрицы не зависит от значений параметров элементов, поэтому при их
+    изменении CSC матрица формируется записью значений в data, а факторизация
+    выполняется с сохраненной перестановкой (PermLU)'''
+    def __init__(self, ri, ci, n):
+        self.ri = ri.astype(np.int32)
+        self.ci = ci.astype(np.int32)
+        self.n = n
+        u,self.slot = np.unique(ci.astype(np.int64)*n + ri, return_inverse=True)
+        self.indices = (u % n).astype(np.int32)
+        self.indptr = np.searchsorted(u // n, np.arange(n+1)).astype(np.int32)
+        self.perm = dict()
+
+    def same(self, ri, ci, n):
+        '''Проверка совпадения структуры матрицы с сохраненной'''
+        return n == self.n and np.array_equal(ri, self.ri) and np.array_equal(ci, self.ci)
+
+    def matrix(self, cdata):
+        '''Формирование CSC матрицы по значениям cdata ненулевых элементов (с суммированием
+        элементов с совпадающими ri, ci)'''
+        data = np.zeros(self.indices.size, dtype=np.cdouble)
+        np.add.at(data, self.slot, cdata)
+        return csc_matrix((data, self.indices, self.indptr), shape=(self.n, self.n))
+
+class SpSolve:
+    '''Служебный класс решателя 'spsolve' - решение СЛАУ функцией spsolve библиотеки scipy
+    при каждом вызове solve(b) без сохранения факторизации'''
+    def __init__(self, A, permc_spec=None):
+        self.A = A
+        self.permc_spec = permc_spec
+
+    def solve(self, b):
+        '''Решение СЛАУ, b - вектор или матрица правой части'''
+        return spsolve(self.A, b, permc_spec=self.permc_spec).reshape(b.shape)
+
+class UmfpackLU:
+    '''Служебный класс решателя 'umfpack' - LU-разложение UMFPACK (scikits.umfpack)'''
+    def __init__(self, A):
+        self.LU = umfpack_splu(A)
+
+    def solve(self, b):
+        '''Решение СЛАУ, b - вектор или матрица правой части'''
+        if b.ndim == 1:
+            return self.LU.solve(b)
+        x = np.empty(b.shape, dtype=np.cdouble)
+        for k in range(b.shape[1]):
+            x[:,k] = self.LU.solve(np.ascontiguousarray(b[:,k]))
+        return x
+
+#Реестр решателей СЛАУ, см. mdl.Setup(solver=...), каждый решатель - функция (A, permc_spec),
+#возвращающая объект с методом solve(b), при вырожденности A - исключение RuntimeError
+msolver=dict({'splu' : lambda A,permc_spec: splu(A, permc_spec=permc_spec),
+              'spsolve' : lambda A,permc_spec: SpSolve(A, permc_spec)})
+if umfpack_splu is not None:
+    msolver['umfpack'] = lambda A,permc_spec: UmfpackLU(A)
+
 mselectz=dict({'U120' : lambda uq,ip: uq,
               'U1' : lambda uq,ip: uq[0],
               'U2' : lambda uq,ip: uq[1],
@@ -1599,7 +4167,7 @@ mselectz=dict({'U120' : lambda uq,ip: uq,
               'SBC' : lambda uq,ip: (vBC @ uq) * np.conj(vBC @ ip),
               'SCA' : lambda uq,ip: (vCA @ uq) * np.conj(vCA @ ip),
               'SABC' : lambda uq,ip: (Ms2f @ uq) * np.conj(Ms2f @ ip),
-              'S' : lambda uq,ip: np.sum((Ms2f @ uq) * np.conj(Ms2f @ ip)),
+              'S' : lambda uq,ip: np.sum((Ms2f @ uq) * np.conj(Ms2f @ ip), axis=0),
               'SAB_BC_CA' : lambda uq,ip: (Ms2ff @ uq) * np.conj(Ms2ff @ ip)
               })
 
@@ -1622,7 +4190,324 @@ mform3=dict({'' : lambda res,parname: res,
               })
 
 
+def BlockInv(Z):
+    '''Служебная функция, обращение блочно-диагональной (с точностью до перестановки)
+    разреженной матрицы Z, например матрицы сопротивлений ветвей и групп взаимоиндукций
+    Блоки определяются как связные компоненты графа ненулевых элементов Z,
+    блоки одного размера обращаются одновременно
+    При вырожденности какого-либо блока - исключение np.linalg.LinAlgError'''
+    Z = csr_matrix(Z)
+    n = Z.shape[0]
+    G = csr_matrix((np.ones(Z.nnz), Z.indices, Z.indptr), shape=(n, n))
+    nc,lab = connected_components(G, directed=False)
+    order = np.argsort(lab, kind='stable')
+    counts = np.bincount(lab, minlength=nc)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    lri = []; lci = []; ldata = []
+    for sz in np.unique(counts):
+        idx = order[starts[counts == sz][:,None] + np.arange(sz)]
+        ri = np.broadcast_to(idx[:,:,None], idx.shape + (sz,))
+        ci = np.broadcast_to(idx[:,None,:], idx.shape + (sz,))
+        Zd = np.asarray(Z[ri.ravel(), ci.ravel()]).reshape(-1, sz, sz)
+        if sz == 1:
+            if (Zd == 0).any():
+                raise np.linalg.LinAlgError('Singular matrix')
+            Zi = 1/Zd
+        else:
+            Zi = np.linalg.inv(Zd)
+        lri.append(ri.ravel()); lci.append(ci.ravel()); ldata.append(Zi.ravel())
+    return csr_matrix((np.concatenate(ldata), (np.concatenate(lri), np.concatenate(lci))), shape=(n, n))
+
+def Components(A):
+    '''Служебная функция, разбиение матрицы A схемы без несимметрий (кроме 'N0') на
+    электрически независимые части (острова) - связные компоненты графа ненулевых
+    элементов A, в котором тройки строк (столбцов) прямой, обратной и нулевой
+    последовательностей одного элемента (ветви, узла, несимметрии) объединены
+    Возвращает количество островов и номера островов строк (столбцов) A'''
+    A = csr_matrix(A)
+    n = A.shape[0]
+    ri = np.repeat(np.arange(n), np.diff(A.indptr))
+    G = csr_matrix((np.ones(A.nnz), (ri // 3, A.indices // 3)), shape=(n//3, n//3))
+    nc,lab = connected_components(G, directed=False)
+    return nc, np.repeat(lab, 3)
+
+def StructRank(A):
+    '''Служебная функция, структурный ранг разреженной матрицы A по шаблону ее ненулевых
+    элементов - максимальное паросочетание строк и столбцов (maximum_bipartite_matching, scipy)
+    Возвращает rank, rows, cols, где rows - номера строк структурно вырожденной части A,
+    достижимых по чередующимся путям из строк, не вошедших в паросочетание (избыточные
+    уравнения), cols - номера столбцов, достижимых из не вошедших в паросочетание
+    столбцов (неопределенные переменные)'''
+    A = csr_matrix(A)
+    n = A.shape[0]
+    nz = A.data != 0
+    ri = np.repeat(np.arange(n), np.diff(A.indptr))[nz]
+    ci = A.indices[nz]
+    G = csr_matrix((np.ones(ri.size, dtype=np.int8), (ri, ci)), shape=A.shape)
+    mc = maximum_bipartite_matching(G, perm_type='column')# столбец строки
+    mr = np.full(A.shape[1], -1, dtype=np.int64)# строка столбца
+    mr[mc[mc >= 0]] = np.flatnonzero(mc >= 0)
+    rank = int(np.count_nonzero(mc >= 0))
+    def reach(src, dst, start, nv):
+        #Вершины графа src -> dst (nv вершин), достижимые из вершин start
+        if not start.size:
+            return start
+        k = dst >= 0
+        H = csr_matrix((np.ones(k.sum() + start.size, dtype=np.int8),
+                        (np.concatenate((src[k], np.full(start.size, nv))), np.concatenate((dst[k], start)))),
+                       shape=(nv+1, nv+1))
+        return np.setdiff1d(breadth_first_order(H, nv, directed=True, return_predecessors=False), [nv])
+    rows = reach(ri, mr[ci], np.flatnonzero(mc < 0), A.shape[0])
+    cols = reach(ci, mc[ri], np.flatnonzero(mr < 0), A.shape[1])
+    return rank, rows, cols
+
+def ZeroZ(arr):
+    '''Служебная функция, признаки ветвей с нулевым сопротивлением, исключаемых из СЛАУ
+    топологической обработкой схемы (mdl.Setup(topo=True), класс TopoLU), по параметрам
+    собранным методом mdl.getarr(): Z=0 и E=0 во всех последовательностях, Kt=1 (без
+    трансформации), оба узла подключения - не земля, ветвь не входит во взаимоиндукции
+    и на ней нет обрывов'''
+    zp = (arr['Z'] == 0).all(axis=1) & (arr['E'] == 0).all(axis=1) & (arr['Kt'] == 1).all(axis=1)
+    zp &= (arr['q1'] >= 0) & (arr['q2'] >= 0)
+    zp[arr['m1']] = False
+    zp[arr['m2']] = False
+    zp[arr['ne'][~arr['isq']]] = False
+    return zp
+
+def AutoSolver(A, reuse=True):
+    '''Служебная функция, выбор решателя СЛАУ для матрицы A по ее размерности и количеству
+    ненулевых элементов (mdl.Setup(solver='auto')):
+    - однократное решение без сохранения факторизации (reuse=False) - 'spsolve';
+    - крупные матрицы (n >= 20000 или nnz >= 100000) - 'umfpack' при его наличии;
+    - остальные - 'splu' (SuperLU)'''
+    if not reuse:
+        return 'spsolve'
+    if 'umfpack' in msolver and (A.shape[0] >= 20000 or A.nnz >= 100000):
+        return 'umfpack'
+    return 'splu'
+
+def Factorize(A, solver='auto', permc_spec=None, reuse=True, cache=None, key=None, precision='double'):
+    '''Служебная функция, факторизация разреженной матрицы A решателем solver
+    из реестра msolver (при solver='auto' - по AutoSolver()), возвращает объект с
+    методом solve(b), при вырожденности A - исключение RuntimeError
+    cache - словарь для сохранения перестановки SuperLU под ключом (key, permc_spec),
+    при наличии в нем перестановки повторное упорядочивание не выполняется (PermLU)
+    precision - 'single' - факторизация в complex64 с уточнением решения (RefineLU)'''
+    A = csc_matrix(A)
+    if precision == 'single':
+        return RefineLU(A, lambda A1: Factorize(A1, solver, permc_spec, reuse, cache, key))
+    if solver == 'auto':
+        solver = AutoSolver(A, reuse)
+    if solver != 'splu' or cache is None:
+        return msolver[solver](A, permc_spec)
+    perm = cache.get((key, permc_spec))
+    if perm is not None and perm.size == A.shape[0]:
+        return PermLU(A, perm)
+    LU = splu(A, permc_spec=permc_spec)
+    perm = np.empty_like(LU.perm_c)
+    perm[LU.perm_c] = np.arange(perm.size)
+    cache[(key, permc_spec)] = perm
+    return LU
+
+def NetLU(K, nP, zp, arr, cache, engine='full', solver='auto', permc_spec=None, precision='double'):
+    '''Служебная функция, факторизация матрицы K схемы без несимметрий (кроме 'N0')
+    способом mdl.Setup(engine=...), nP - количество строк (столбцов) токов ветвей,
+    zp - признаки ветвей с нулевым сопротивлением, исключаемых топологической обработкой
+    схемы (TopoLU), arr - параметры элементов (см. mdl.getarr()), cache - словарь
+    сохраненных перестановок (см. Pattern)
+    Электрически независимые части (острова) схемы факторизуются раздельно (IslandLU)'''
+    kw = dict(solver=solver, permc_spec=permc_spec, precision=precision)
+    def factorize(K, nP, cache):
+        nc,lab = Components(K)
+        if nc > 1:
+            return IslandLU(K, nP, lab, lambda Kk,nPk,k:
+                            factorize1(Kk, nPk, cache.setdefault(('island', k), dict())))
+        return factorize1(K, nP, cache)
+    def factorize1(K, nP, cache):
+        if engine == 'seq':
+            return SeqLU(K, cache=cache, **kw)
+        if engine == 'ybus':
+            try:
+                return YbusLU(K, nP, cache=cache, **kw)
+            except np.linalg.LinAlgError:
+                pass
+        return Factorize(K, key='full', cache=cache, **kw)
+    if zp.any():
+        #Перестановки для матриц схемы с объединенными узлами сохраняются отдельно
+        #для каждого состава исключаемых ветвей
+        cache = cache.setdefault(('topo', np.flatnonzero(zp).tobytes()), dict())
+        return TopoLU(K, zp, arr, lambda K,nP: factorize(K, nP, cache))
+    return factorize(K, nP, cache)
+
+def SweepChunk(solve, n, x0, lq, Cu, Cy, lkeep=None):
+    '''Служебная функция, расчет КЗ для группы из m узлов (см. mdl.sweepn()), где
+    solve - решение K*x = b для схемы без несимметрий (кроме 'N0') размерностью n,
+    x0 - решение без КЗ, lq - номера переменных напряжений узлов группы (m,3),
+    Cu, Cy - матрицы граничных условий видов КЗ (nsc,3,3) (см. NMatrix()),
+    lkeep - номера сохраняемых переменных СЛАУ
+    Возвращает токи КЗ Ik и напряжения в узлах КЗ Uk размерностью (m,nsc,3), а при
+    заданном lkeep - значения переменных lkeep во всех расчетных случаях Xk (m*nsc,len(lkeep))'''
+    m = lq.shape[0]
+    nsc = Cu.shape[0]
+    Bc = csc_matrix((-np.ones(3*m), (lq.ravel(), np.arange(3*m))), shape=(n, 3*m))
+    W = solve(Bc.toarray())
+    Wqq = W[lq[:,:,None], 3*np.arange(m)[:,None,None] + arr012]
+    U0 = x0[lq]
+    #Граничные условия Cu*U + Cy*Ik = 0, где U = U0 - Wqq*Ik
+    A = Cy[None,:,:,:] - Cu[None,:,:,:] @ Wqq[:,None,:,:]
+    RHS = -(Cu[None,:,:,:] @ U0[:,None,:,None])
+    try:
+        Ik = np.linalg.solve(A, RHS)[...,0]
+    except np.linalg.LinAlgError:
+        Ik = np.full(RHS.shape[:3], np.nan, dtype=np.cdouble)
+        for kq in range(A.shape[0]):
+            for ksc in range(nsc):
+                try:
+                    Ik[kq,ksc] = np.linalg.solve(A[kq,ksc], RHS[kq,ksc])[:,0]
+                except np.linalg.LinAlgError:
+                    pass
+    Uk = U0[:,None,:] - (Wqq[:,None,:,:] @ Ik[...,None])[...,0]
+    if lkeep is None:
+        return Ik, Uk, None
+    #Результаты всех случаев группы X = x0 - W*Ik
+    Wk = W[lkeep].reshape(-1,m,3).transpose(1,2,0)
+    Xk = x0[lkeep][None,None,:] - Ik @ Wk
+    return Ik, Uk, Xk.reshape(m*nsc,-1)
+
+mworker = dict() # Состояние процесса расчета КЗ mdl.sweepnp() (см. SweepInit())
+
+def SweepInit(spec):
+    '''Служебная функция, инициализация процесса расчета КЗ mdl.sweepnp(): подключение
+    к разделяемой памяти, факторизация матрицы K схемы, открытие хранилища результатов'''
+    shms = {key : SharedMemory(name=name) for key,(name,_,_) in spec['shm'].items()}
+    arrs = {key : np.ndarray(shape, dtype=dtype, buffer=shms[key].buf)
+            for key,(_,shape,dtype) in spec['shm'].items()}
+    n = spec['n']
+    K = csc_matrix((arrs['data'], arrs['indices'], arrs['indptr']), shape=(n, n))
+    mworker.clear()
+    mworker.update(spec=spec, shms=shms, arrs=arrs,
+                   LU=NetLU(K, spec['nP'], spec['zp'], spec['arr'], spec['cache'], **spec['setup']),
+                   store=None if spec['path'] is None else SweepStore(spec['path'], 'r+'))
+
+def SweepTask(k):
+    '''Служебная функция, расчет КЗ для группы узлов, начиная с k-ого, в процессе
+    mdl.sweepnp() (см. SweepInit()), результаты записываются в разделяемую память'''
+    spec = mworker['spec']
+    arrs = mworker['arrs']
+    store = mworker['store']
+    lq = spec['lqId'][k:k+spec['chunk']]
+    Ik,Uk,Xk = SweepChunk(mworker['LU'].solve, spec['n'], arrs['x0'], lq, spec['Cu'], spec['Cy'], spec['lkeep'])
+    arrs['I120'][k:k+len(lq)] = Ik
+    arrs['U120'][k:k+len(lq)] = Uk
+    if store is not None:
+        store.write(k*spec['Cu'].shape[0], Ik, Uk, Xk)
+        store.flush()
+    return k
+
+def NMatrix(tmpl):
+    '''Служебная функция, преобразует шаблон уравнений граничных условий несимметрии
+    в плотные матрицы 3x3 Cu, Cy, Cr, такие что граничные условия имеют вид
+    Cu * Uk + (Cy + r*Cr) * Ik = 0 (для КЗ) или Cu * I + (Cy + r*Cr) * dU = 0 (для обрывов)'''
+    rows,kinds,cols,vals,rvals = tmpl
+    Cu = np.zeros((3,3), dtype=np.cdouble)
+    Cy = np.zeros((3,3), dtype=np.cdouble)
+    Cr = np.zeros((3,3), dtype=np.cdouble)
+    np.add.at(Cu, (rows[~kinds], cols[~kinds]), vals[~kinds])
+    np.add.at(Cy, (rows[kinds], cols[kinds]), vals[kinds])
+    np.add.at(Cr, (rows[kinds], cols[kinds]), rvals[kinds])
+    return Cu, Cy, Cr
+
+def formn(isq, ne, nId, SC, r, np_):
+    '''Служебная функция, векторное формирование координатной версии разреженной матрицы
+    для несимметрий, сгруппированных по виду КЗ или обрыва
+    isq - признак КЗ (True) или обрыва (False)
+    ne - индексы узлов (КЗ) или ветвей (обрывы), начиная с 0
+    nId - номера первых строк/столбцов несимметрий в СЛАУ
+    SC - виды несимметрий, r - переходные сопротивления
+    np_ - количество ветвей в расчетной модели
+    Возвращает ri,ci,cdata'''
+    lri = []; lci = []; ldata = []
+    #Первые строки/столбцы узла (КЗ) или ветви (обрыв) несимметрии
+    eId = np.where(isq, 3*(np_+ne), 3*ne)
+    #Запись в разреженную матрицу в уравнения по 1-ому закону Кирхгофа наличие КЗ в узле (-1)
+    #и в уравнения по 2-ому закону Кирхгофа о наличии обрыва на ветви (1)
+    lri.append((eId[:,None] + arr012).ravel())
+    lci.append((nId[:,None] + arr012).ravel())
+    ldata.append(np.repeat(np.where(isq, -1.0, 1.0), 3))
+    #Запись граничных условий по группам несимметрий одного вида
+    for sq,mtmpl,errmsg in ((True,mnq,'Неизвестный вид КЗ!'), (False,mnp,'Неизвестный вид обрыва!')):
+        msq = isq == sq
+        for sc in set(SC[msq]):
+            if not sc in mtmpl:
+                raise TypeError(errmsg)
+            k = np.nonzero(msq & (SC == sc))[0]
+            rows,kinds,cols,vals,rvals = mtmpl[sc]
+            lri.append((nId[k,None] + rows).ravel())
+            lci.append((np.where(kinds, nId[k,None], eId[k,None]) + cols).ravel())
+            ldata.append((vals + r[k,None]*rvals).ravel())
+    ri = np.concatenate(lri)
+    ci = np.concatenate(lci)
+    cdata = np.concatenate(ldata)
+    return ri,ci,cdata
+
+class ElRef:
+    '''Служебный класс ссылки на элемент модели по его номеру в списке модели
+    (bq, bp, bm, bn), используется при сериализации элементов (см. GetState())'''
+    def __init__(self, lst, k):
+        self.lst = lst
+        self.k = k
+
+def GetState(el):
+    '''Служебная функция, возвращает состояние элемента модели el для сериализации (pickle),
+    в котором ссылки на элементы той же модели заменены объектами ElRef, что исключает
+    рекурсивный обход всей схемы по связям между элементами'''
+    model = el.__dict__.get('model')
+    def ref(val):
+        if isinstance(val, list):
+            return [ref(v) for v in val]
+        if isinstance(val, (Q,P,M,N)) and model is not None and val.model is model:
+            lst = {Q : 'bq', P : 'bp', M : 'bm', N : 'bn'}[type(val)]
+            if getattr(model, lst)[val.id-1] is val:
+                return ElRef(lst, val.id-1)
+        return val
+    return {key : ref(val) for key,val in el.__dict__.items()}
+
+def SetState(el, state):
+    '''Служебная функция, восстановление элемента модели el из состояния state (см. GetState()),
+    ссылки ElRef заменяются элементами модели, если она уже восстановлена,
+    иначе - при ее восстановлении (Model.__setstate__())'''
+    el.__dict__.update(state)
+    model = state.get('model')
+    if model is not None and 'bq' in model.__dict__:
+        SetRefs(el)
+
+def SetRefs(el):
+    '''Служебная функция, замена ссылок ElRef в атрибутах элемента el элементами его модели'''
+    model = el.model
+    def deref(val):
+        if isinstance(val, list):
+            return [deref(v) for v in val]
+        if isinstance(val, ElRef):
+            return getattr(model, val.lst)[val.k]
+        return val
+    for key,val in el.__dict__.items():
+        el.__dict__[key] = deref(val)
+
+def Col(v, res):
+    '''Служебная функция, приводит параметр элемента v (Y, B, Kt) к виду вектора столбца
+    для поэлементного умножения на результаты расчета res, в том числе на матрицы
+    результатов нескольких расчетных вариантов (3, nv), см. mdl.CalcScenarios()'''
+    return np.reshape(np.asarray(v), (3,)+(1,)*(np.ndim(res)-1))
+
+def Item(res, k):
+    '''Служебная функция, возвращает результат расчета res[k] для k-ого элемента
+    (копию при результате - векторе, для исключения изменения сохраненных результатов)'''
+    res = res[k]
+    return res.copy() if isinstance(res, np.ndarray) else res
+
 def StrU(u120):
+    if np.ndim(u120) > 1:
+        return ''.join('Вариант № {}\n{}'.format(k+1, StrU(u120[:,k])) for k in range(u120.shape[1]))
     strUABC = "| UA  = {0:>7.0f} ∠ {1:>6.1f} | UB  = {2:>7.0f} ∠ {3:>6.1f} | UC  = {4:>7.0f} ∠ {5:>6.1f} |\n"
     strU120 = "| U1  = {0:>7.0f} ∠ {1:>6.1f} | U2  = {2:>7.0f} ∠ {3:>6.1f} | 3U0 = {4:>7.0f} ∠ {5:>6.1f} |\n"
     strUAB_BC_CA = "| UAB = {0:>7.0f} ∠ {1:>6.1f} | UBC = {2:>7.0f} ∠ {3:>6.1f} | UCA = {4:>7.0f} ∠ {5:>6.1f} |\n"
@@ -1636,6 +4521,8 @@ def StrU(u120):
     return ''.join(resstr)
 
 def StrI(i120, Iff=1):
+    if np.ndim(i120) > 1:
+        return ''.join('Вариант № {}\n{}'.format(k+1, StrI(i120[:,k], Iff)) for k in range(i120.shape[1]))
     strIABC = "| IA  = {0:>7.0f} ∠ {1:>6.1f} | IB  = {2:>7.0f} ∠ {3:>6.1f} | IC  = {4:>7.0f} ∠ {5:>6.1f} |\n"
     strI120 = "| I1  = {0:>7.0f} ∠ {1:>6.1f} | I2  = {2:>7.0f} ∠ {3:>6.1f} | 3I0 = {4:>7.0f} ∠ {5:>6.1f} |\n"
     i1,i2,i0 = i120
@@ -1647,4 +4534,140 @@ def StrI(i120, Iff=1):
         strIAB_BC_CA = "| IAB = {0:>7.0f} ∠ {1:>6.1f} | IBC = {2:>7.0f} ∠ {3:>6.1f} | ICA = {4:>7.0f} ∠ {5:>6.1f} |\n"
         iAB,iBC,iCA = Ms2ff @ i120
         resstr.append(strIAB_BC_CA.format(np.abs(iAB),r2d*np.angle(iAB),np.abs(iBC),r2d*np.angle(iBC),np.abs(iCA),r2d*np.angle(iCA)))
-    return ''.join(resstr)
\ No newline at end of file
+    return ''.join(resstr)
+
+def StrUArr(u120):
+    '''Векторный аналог StrU(), возвращает список сводных таблиц напряжений (строк,
+    совпадающих с StrU()) для массива u120 размерностью (n,3) или (n,3,nv)'''
+    return StrArr(u120, ('UA ','UB ','UC '), ('U1 ','U2 ','3U0'), ('UAB','UBC','UCA'))
+
+def StrIArr(i120, Iff=1):
+    '''Векторный аналог StrI(), возвращает список сводных таблиц токов (строк,
+    совпадающих с StrI()) для массива i120 размерностью (n,3) или (n,3,nv)'''
+    return StrArr(i120, ('IA ','IB ','IC '), ('I1 ','I2 ','3I0'), ('IAB','IBC','ICA') if Iff else None)
+
+def StrArr(x, namef, names, nameff):
+    '''Служебная функция, формирует сводные таблицы StrU(), StrI() для всех строк массива x:
+    модули и углы величин вычисляются векторными операциями (с тем же порядком
+    вычислений, что и в StrU(), StrI()), а каждая таблица формируется одной
+    операцией форматирования по общему шаблону'''
+    if np.ndim(x) > 2:
+        res = [StrArr(x[:,:,k], namef, names, nameff) for k in range(x.shape[2])]
+        return [''.join('Вариант № {}\n{}'.format(k+1, s) for k,s in enumerate(row)) for row in zip(*res)]
+    x = np.asarray(x)
+    xf = (Ms2f @ x[:,:,None])[:,:,0]
+    lines = [(namef, xf, xf), (names, x * np.array([1,1,3]), x)]
+    if nameff is not None:
+        xff = (Ms2ff @ x[:,:,None])[:,:,0]
+        lines.append((nameff, xff, xff))
+    val = np.empty((x.shape[0], 6*len(lines)))
+    for k,(_,xm,xf) in enumerate(lines):
+        val[:,6*k:6*k+6:2] = np.abs(xm)
+        val[:,6*k+1:6*k+6:2] = r2d*np.angle(xf)
+    tmpl = ''.join(''.join('| {} = %7.0f ∠ %6.1f '.format(name) for name in namel) + '|\n'
+                   for namel,_,_ in lines)
+    return [tmpl % tuple(row) for row in val.tolist()]
+
+
+def Chunks(tab, chunk):
+    '''Служебная функция, последовательно возвращает значения столбцов таблицы
+    tab = (количество строк, столбцы) (см. mdl.exportcols()) для групп из chunk строк,
+    комплексные столбцы разбиваются на действительную и мнимую части'''
+    n,cols = tab
+    for a in range(0, n, chunk):
+        b = min(a + chunk, n)
+        res = []
+        for name,dtype,f in cols:
+            val = f(a, b)
+            if dtype.kind == 'c':
+                res.append((name+'_re', val.real))
+                res.append((name+'_im', val.imag))
+            else:
+                res.append((name, val))
+        yield res
+
+def WriteNPZ(fname, tabs, chunk):
+    '''Служебная функция, записывает таблицы tabs (см. mdl.export()) в сжатый архив
+    numpy, каждый столбец - массив 'таблица/столбец', массивы записываются по частям
+    из chunk строк без формирования столбцов целиком'''
+    with zipfile.ZipFile(fname, mode='w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for tname,(n,cols) in tabs:
+            for name,dtype,f in cols:
+                with zf.open('{}/{}.npy'.format(tname, name), 'w', force_zip64=True) as fp:
+                    np.lib.format.write_array_header_1_0(fp, {'descr' : np.lib.format.dtype_to_descr(dtype),
+                                                              'fortran_order' : False, 'shape' : (n,)})
+                    for a in range(0, n, chunk):
+                        fp.write(np.ascontiguousarray(f(a, min(a + chunk, n)), dtype=dtype).tobytes())
+
+def StrTable(lst):
+    '''Служебная функция, формирует таблицу строк для mdl.Save(): возвращает массив
+    уникальных строк списка lst и номера строк списка в этом массиве'''
+    tab,idx = np.unique(np.array([str(s) for s in lst], dtype=str), return_inverse=True)
+    return tab, idx.astype(np.int64)
+
+def TypeCodes(lst, m):
+    '''Служебная функция, формирует для mdl.Save() массив (len(lst),m) кодов типов чисел
+    списка lst кортежей длиной m (параметров элементов): 0 - целое, 1 - вещественное,
+    2 - комплексное число'''
+    vals = list(itertools.chain.from_iterable(lst))
+    codes = list(map({int : 0, float : 1, complex : 2}.get, map(type, vals)))
+    if None in codes:
+        #Числа других типов (numpy и т.п.) - по базовому типу
+        codes = [0 if isinstance(v, (int, np.integer)) else 1 if isinstance(v, (float, np.floating)) else 2
+                 for v in vals]
+    return np.array(codes, dtype=np.int8).reshape(-1, m)
+
+def TypedList(arr, codes):
+    '''Служебная функция, восстанавливает при mdl.Load() из строк массива arr список
+    кортежей чисел с типами по кодам codes (см. TypeCodes())'''
+    obj = arr.astype(object)
+    for code,val in ((0, arr.real.astype(np.int64)), (1, arr.real.astype(np.double))):
+        mask = codes == code
+        obj[mask] = val[mask].astype(object)
+    return [tuple(row) for row in obj.tolist()]
+
+def StrList(data, key):
+    '''Служебная функция, восстанавливает из таблиц строк (см. StrTable()) архива
+    модели data списки названий и примечаний элементов вида key ('q', 'p', 'm', 'n')'''
+    return (data[key+'/name'][data[key+'/iname']].tolist(),
+            data[key+'/desc'][data[key+'/idesc']].tolist())
+
+def WriteCSV(fname, tab, chunk):
+    '''Служебная функция, записывает таблицу tab (см. mdl.export()) в файл csv
+    в кодировке utf-8 по частям из chunk строк'''
+    with open(fname, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([name+ri for name,dtype,_ in tab[1] for ri in (('_re','_im') if dtype.kind == 'c' else ('',))])
+        for res in Chunks(tab, chunk):
+            writer.writerows(zip(*[val.tolist() for _,val in res]))
+
+def WriteHDF5(fname, tabs, chunk):
+    '''Служебная функция, записывает таблицы tabs (см. mdl.export()) в файл hdf5,
+    каждая таблица - группа, столбец - набор данных, запись по частям из chunk строк'''
+    with h5py.File(fname, 'w') as f:
+        for tname,(n,cols) in tabs:
+            grp = f.create_group(tname)
+            for name,dtype,fc in cols:
+                if dtype.kind == 'U':
+                    ds = grp.create_dataset(name, (n,), dtype=h5py.string_dtype())
+                    for a in range(0, n, chunk):
+                        ds[a:min(a + chunk, n)] = fc(a, min(a + chunk, n)).astype(object)
+                else:
+                    ds = grp.create_dataset(name, (n,), dtype=dtype, chunks=(max(min(chunk, n), 1),),
+                                            compression='gzip')
+                    for a in range(0, n, chunk):
+                        ds[a:min(a + chunk, n)] = fc(a, min(a + chunk, n))
+
+def WriteParquet(fname, tab, chunk):
+    '''Служебная функция, записывает таблицу tab (см. mdl.export()) в файл parquet,
+    каждая часть из chunk строк - отдельная группа строк (row group)'''
+    writer = None
+    try:
+        for res in Chunks(tab, chunk):
+            t = pyarrow.table({name : val for name,val in res})
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(fname, t.schema)
+            writer.write_table(t)
+    finally:
+        if writer is not None:
+            writer.close()
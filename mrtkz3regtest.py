@@ -0,0 +1,865 @@
+#Регрессионные проверки модуля расчета ТКЗ сравнением результатов расчетов
+#с результатами независимого расчета той же схемы (заново созданной модели
+#с теми же параметрами, расчета по исходному алгоритму и т.п.)
+#При расхождении результатов более чем на tol - исключение AssertionError
+#Модуль расчета ТКЗ (mrtkz3.py) должен находиться в той же папке, где и настоящий файл
+import numpy as np
+import mrtkz3 as mrtkz
+
+tol = 1e-10
+
+#Параметры исходной схемы
+par0 = {'Sys1' : (0,'Sys1',(2j,2j,3j),(65000,0,0)),
+        'Sys2' : (0,'Sys2',(2j,2j,3j),(65000*np.exp(-0.2j),0,0)),
+        'Sys1-PS1' : ('Sys1','PS1',(10j,10j,30j),(0,0,0)),
+        'Sys1-PS2' : ('Sys1','PS2',(10j,10j,30j),(0,0,0)),
+        'Sys2-PS1' : ('Sys2','PS1',(1+12j,1+12j,3+36j),(0,0,0)),
+        'Sys2-PS2' : ('Sys2','PS2',(1+12j,1+12j,3+36j),(0,0,0)),
+        'PS1' : (0,'PS1',(500,200j,30j),(0,0,0)),
+        'PS2' : (0,'PS2',(500,200j,30j),(0,0,0)),
+        'T1' : ('PS1','PS1 НН',(0.5+40j,0.5+40j,0.5+40j),(0,0,0)),
+        'L1-L2' : 15j,
+        'L3-L4' : 15j,
+        'B' : (1e-4j,1e-4j,6e-5j),
+        'T' : (115/10.5,11),
+        'Y' : (0,0,0),
+        'J' : (0,0,0)}
+
+def Sxema(par={}, off=(), kz=(('PS2','A0'),)):
+    '''Создание расчетной модели сети с параметрами par0, измененными на par,
+    без ветвей off (и их взаимоиндукций) и с КЗ kz - список (название узла, вид КЗ)
+    или (название узла, вид КЗ, r), узлы ветвей par, отсутствующие в исходной схеме,
+    создаются дополнительно; возвращает модель и словари ее узлов, ветвей и КЗ
+    по их названиям (КЗ - по названиям узлов)'''
+    par = dict(par0, **par)
+    mdl = mrtkz.Model()
+    uq = {}
+    for name in ('Sys1','Sys2','PS1','PS2','PS1 НН'):
+        if name == 'PS1 НН':
+            uq[name] = mrtkz.Q(mdl,name,Y=par['Y'],J=par['J'])
+        else:
+            uq[name] = mrtkz.Q(mdl,name)
+    up = {}
+    for name in ('Sys1','Sys2','Sys1-PS1','Sys1-PS2','Sys2-PS1','Sys2-PS2','PS1','PS2','T1'):
+        if name in off:
+            continue
+        q1,q2,Z,E = par[name]
+        for qn in (q1,q2):
+            if qn and not qn in uq:
+                uq[qn] = mrtkz.Q(mdl,qn)
+        up[name] = mrtkz.P(mdl,name,uq.get(q1,0),uq.get(q2,0),Z,E=E,
+                           B=par['B'] if name == 'Sys2-PS1' else (0,0,0),
+                           T=par['T'] if name == 'T1' else (1,0))
+    for name,p1,p2 in (('L1-L2','Sys1-PS1','Sys1-PS2'), ('L3-L4','Sys2-PS1','Sys2-PS2')):
+        if p1 in up and p2 in up:
+            mrtkz.M(mdl,name,up[p1],up[p2],par[name],par[name])
+    un = {}
+    for qn,*SC in kz:
+        un[qn] = mrtkz.N(mdl,'KZ '+qn,uq[qn],*SC)
+    return mdl,uq,up,un
+
+def Check(desc, X, X0):
+    '''Сравнение результатов расчета X с результатами X0 независимого расчета'''
+    err = np.abs(X - X0).max()/np.abs(X0).max()
+    print('{} - погрешность {:.1e}'.format(desc, err))
+    assert err < tol, desc
+
+#Формирование СЛАУ mdl.formslae() по массивам параметров элементов сравнивается
+#с формированием по исходному алгоритму - перебором элементов модели (SLAE0()),
+#на случайных моделях со всеми видами КЗ и обрывов, LHS и RHS должны совпадать точно
+def Random(seed, nq=40):
+    '''Создание случайной модели сети из nq узлов с трансформаторами, поперечными
+    проводимостями, взаимоиндукциями, КЗ и обрывами всех видов'''
+    rnd = np.random.default_rng(seed)
+    mdl = mrtkz.Model()
+    lq = [mrtkz.Q(mdl,'q{}'.format(k),Y=tuple(1e-4j*rnd.random(3)) if k % 5 == 0 else (0,0,0),
+                  J=tuple(10*rnd.random(3)) if k % 7 == 0 else (0,0,0)) for k in range(nq)]
+    lp = [mrtkz.P(mdl,'S{}'.format(k),0,lq[7*k],(1+2j,1+2j,2+3j),E=(65000*np.exp(0.1j*k),0,0)) for k in range(3)]
+    for k in range(1,nq):
+        T = (1+rnd.random(), int(rnd.integers(0,12))) if k % 9 == 0 else (1,0)
+        B = tuple(1j*rnd.random(3)*1e-4) if k % 6 == 0 else (0,0,0)
+        lp.append(mrtkz.P(mdl,'p{}'.format(k),lq[rnd.integers(0,k)],lq[k],
+                          tuple(rnd.random(3)+1j*(5+20*rnd.random(3))),T=T,B=B))
+    lp.append(mrtkz.P(mdl,'g',lq[3],0,(100,100,50j)))
+    for k in range(0,len(lp)-5,4):
+        mrtkz.M(mdl,'m{}'.format(k),lp[k+3],lp[k+4],1j+0.1*(k % 10),1.1j)
+    mrtkz.N(mdl,'n0',lq[5],'N0')
+    for k,SC in enumerate(['A0','B0','C0','A0r','B0r','C0r','AB','BC','CA','ABr','BCr','CAr',
+                           'AB0','BC0','CA0','ABC','ABC0']):
+        mrtkz.N(mdl,'КЗ '+SC,lq[10+k],SC,r=1.5+k)
+    for k,SC in enumerate(['N0','A0','B0','C0','AB','BC','CA','ABC']):
+        mrtkz.N(mdl,'Обрыв '+SC,lp[10+2*k],SC)
+    return mdl
+
+def SLAE0(mdl):
+    '''Формирование LHS и RHS СЛАУ модели перебором ее элементов (исходный алгоритм mdl.Calc())'''
+    a,a2,vA,vB,vC = mrtkz.a,mrtkz.a2,mrtkz.vA,mrtkz.vB,mrtkz.vC
+    vABC,vBCA,vCAB = mrtkz.vABC,mrtkz.vBCA,mrtkz.vCAB
+    n = 3*(mdl.nq+mdl.np+mdl.nn)
+    RHS = np.zeros(n, dtype=np.cdouble)
+    diag = np.zeros(3*mdl.nq, dtype=np.cdouble)
+    ri,ci,cdata = [],[],[]
+    def add(rows, cols, data):
+        ri.extend(rows)
+        ci.extend(cols)
+        cdata.extend(data)
+    for kp in mdl.bp:
+        pId = 3*(kp.id-1)
+        add(pId+np.arange(3), pId+np.arange(3), kp.Z)
+        RHS[pId:pId+3] = kp.E
+        Kt1 = kp.T[0] * np.exp(mrtkz.Kf*kp.T[1])
+        Kt2 = Kt1 if kp.T[1] % 2 == 0 else np.conj(Kt1)
+        for kq,data in ((kp.q1, [-1.0]*6), (kp.q2, [Kt2,Kt1,Kt1,Kt1,Kt2,Kt1])):
+            if isinstance(kq, mrtkz.Q):
+                qId = 3*(mdl.np+kq.id-1)
+                diag[3*(kq.id-1):3*kq.id] -= np.array(kp.B)/2
+                add(np.r_[pId:pId+3,qId:qId+3], np.r_[qId:qId+3,pId:pId+3], data)
+    for km in mdl.bm:
+        pId1 = 3*(km.p1.id-1)+2
+        pId2 = 3*(km.p2.id-1)+2
+        add([pId1,pId2], [pId2,pId1], [km.M12,km.M21])
+    for kq in mdl.bq:
+        qId = 3*(mdl.np+kq.id-1)
+        diag[3*(kq.id-1):3*kq.id] -= np.array(kq.Y)
+        RHS[qId:qId+3] = -np.array(kq.J)
+    #Граничные условия КЗ и обрывов - строки (относительно nId) и столбцы
+    #(0, 1, 2 - переменные узла или ветви, 3, 4, 5 - переменные несимметрии)
+    r012 = [0,0,0,1,1,1,2,2,2]
+    for kn in mdl.bn:
+        nId = 3*(mdl.nq+mdl.np+kn.id-1)
+        r = kn.r
+        if isinstance(kn.qp, mrtkz.Q):
+            eId = 3*(mdl.np+kn.qp.id-1)
+            add(eId+np.arange(3), nId+np.arange(3), [-1.0]*3)
+            rows,cols,data = {
+                'N0' : ([0,1,2], [3,4,2], vA),
+                'A0' : (r012, [0,1,2,3,4,5,3,4,5], vABC),
+                'B0' : (r012, [0,1,2,3,4,5,3,4,5], vBCA),
+                'C0' : (r012, [0,1,2,3,4,5,3,4,5], vCAB),
+                'A0r' : (r012+[0,0,0], [0,1,2,3,4,5,3,4,5,3,4,5], np.concatenate((vABC, -r*vA))),
+                'B0r' : (r012+[0,0,0], [0,1,2,3,4,5,3,4,5,3,4,5], np.concatenate((vBCA, -r*vB))),
+                'C0r' : (r012+[0,0,0], [0,1,2,3,4,5,3,4,5,3,4,5], np.concatenate((vCAB, -r*vC))),
+                'AB' : ([0,0,1,1,2], [0,1,3,4,5], [1.0-a2,1.0-a,1.0+a2,1.0+a,1.0]),
+                'BC' : ([0,0,1,1,2], [0,1,3,4,5], [a2-a,a-a2,a2+a,a+a2,1.0]),
+                'CA' : ([0,0,1,1,2], [0,1,3,4,5], [a-1.0,a2-1.0,a+1.0,a2+1.0,1.0]),
+                'ABr' : ([0,0,1,1,2,0,0], [0,1,3,4,5,3,4], [1.0-a2,1.0-a,1.0+a2,1.0+a,1.0,-r,-r]),
+                'BCr' : ([0,0,1,1,2,0,0], [0,1,3,4,5,3,4], [a2-a,a-a2,a2+a,a+a2,1.0,-r*a2,-r*a]),
+                'CAr' : ([0,0,1,1,2,0,0], [0,1,3,4,5,3,4], [a-1.0,a2-1.0,a+1.0,a2+1.0,1.0,-r*a,-r*a2]),
+                'AB0' : (r012, [0,1,2,0,1,2,3,4,5], vABC),
+                'BC0' : (r012, [0,1,2,0,1,2,3,4,5], vBCA),
+                'CA0' : (r012, [0,1,2,0,1,2,3,4,5], vCAB),
+                'ABC' : ([0,1,2], [0,1,5], vA),
+                'ABC0' : ([0,1,2], [0,1,2], vA)}[kn.SC]
+        else:
+            eId = 3*(kn.qp.id-1)
+            add(eId+np.arange(3), nId+np.arange(3), vA)
+            rows,cols,data = {
+                'N0' : ([0,1,2], [3,4,2], vA),
+                'A0' : (r012, [0,1,2,3,4,5,3,4,5], vABC),
+                'B0' : (r012, [0,1,2,3,4,5,3,4,5], vBCA),
+                'C0' : (r012, [0,1,2,3,4,5,3,4,5], vCAB),
+                'AB' : (r012, [0,1,2,0,1,2,3,4,5], vABC),
+                'BC' : (r012, [0,1,2,0,1,2,3,4,5], vBCA),
+                'CA' : (r012, [0,1,2,0,1,2,3,4,5], vCAB),
+                'ABC' : ([0,1,2], [0,1,2], vA)}[kn.SC]
+        cols = np.array(cols)
+        add(nId+np.array(rows), np.where(cols < 3, eId+cols, nId+cols-3), data)
+    ri = np.concatenate((3*mdl.np+np.arange(3*mdl.nq), ri)).astype(np.int64)
+    ci = np.concatenate((3*mdl.np+np.arange(3*mdl.nq), ci)).astype(np.int64)
+    LHS = mrtkz.csc_matrix((np.concatenate((diag, np.array(cdata, dtype=np.cdouble))), (ri, ci)), shape=(n, n))
+    return LHS,RHS
+
+for seed in range(5):
+    mdl = Random(seed)
+    ri,ci,cdata,RHS = mdl.formslae(mdl.getarr())
+    n = RHS.size
+    LHS = mrtkz.csc_matrix((cdata, (ri, ci)), shape=(n, n))
+    LHS0,RHS0 = SLAE0(mdl)
+    LHS.sort_indices()
+    LHS0.sort_indices()
+    same = (np.array_equal(LHS.indptr, LHS0.indptr) and np.array_equal(LHS.indices, LHS0.indices)
+            and np.array_equal(LHS.data, LHS0.data) and np.array_equal(RHS, RHS0))
+    print('Формирование СЛАУ случайной модели {} - {}'.format(seed, 'совпадает' if same else 'не совпадает'))
+    assert same, 'Формирование СЛАУ случайной модели {}'.format(seed)
+
+#Смена несимметрий (n.edit, mdl.ClearN()) учитывается окаймлением сохраненной
+#факторизации схемы без несимметрий (mdl.net), сравнивается с расчетом модели,
+#в которой КЗ задано при ее создании, и с расчетом полной СЛАУ mdl.CalcFull()
+mdl,uq,up,un = Sxema()
+mdl.Calc()
+net = mdl.net
+for SC in ('B0','CAr','BC0','ABC','AB'):
+    un['PS2'].edit('KZ PS2',SC,r=2.5)
+    X = mdl.Calc()
+    assert mdl.net is net, 'Факторизация при смене КЗ'
+    Check('КЗ {} по сохраненной факторизации'.format(SC), X, Sxema(kz=[('PS2',SC,2.5)])[0].Calc())
+    Check('КЗ {} полной СЛАУ'.format(SC), mdl.CalcFull(), X)
+mdl.ClearN()
+Check('Без несимметрий', mdl.Calc(), Sxema(kz=())[0].Calc())
+
+#КЗ всех видов во всех узлах mdl.SweepN() по одной факторизации схемы
+#сравниваются с расчетом модели с соответствующим КЗ
+listsc = ['A0','BC','BC0','ABC','ABC0',('A0r',2.0),('CAr',5.0)]
+names = ('Sys1','PS1','PS2','PS1 НН')
+mdl,uq,_,_ = Sxema(kz=())
+I120,U120 = mdl.SweepN([uq[qn] for qn in names], listsc)
+for i,qn in enumerate(names):
+    for k,sc in enumerate(listsc):
+        sc = sc if isinstance(sc, tuple) else (sc,)
+        mdl0,_,_,un = Sxema(kz=[(qn,)+sc])
+        mdl0.Calc()
+        Check('КЗ {} в узле {}'.format(sc[0], qn), np.concatenate((I120[i,k], U120[i,k])),
+              np.concatenate((un[qn].I120, un[qn].U120)))
+
+#Варианты Э.Д.С. ветвей и токов J узлов mdl.CalcScenarios() по одной факторизации
+#сравниваются с расчетом моделей с соответствующими параметрами
+variants = [{},
+            {'Sys2' : (0,'Sys2',(2j,2j,3j),(60000,0,0))},
+            {'Sys1' : (0,'Sys1',(2j,2j,3j),(70000,0,0)), 'J' : (100,0,10j)}]
+mdl,uq,up,_ = Sxema()
+E = np.zeros((mdl.np,3,len(variants)), dtype=complex)
+J = np.zeros((mdl.nq,3,len(variants)), dtype=complex)
+for k,var in enumerate(variants):
+    par = dict(par0, **var)
+    for name,kp in up.items():
+        E[kp.id-1,:,k] = par[name][3]
+    J[uq['PS1 НН'].id-1,:,k] = par['J']
+X = mdl.CalcScenarios(E=E, J=J)
+for k,var in enumerate(variants):
+    mdl0,uq0,up0,_ = Sxema(var)
+    Check('Вариант {} Э.Д.С. и J'.format(k), X[:,k], mdl0.Calc())
+    Check('Вариант {} токи ветви Sys2-PS1'.format(k), up['Sys2-PS1'].q2IABC[:,k], up0['Sys2-PS1'].q2IABC)
+
+#Раздельная факторизация схем прямой, обратной и нулевой последовательностей
+#mdl.Setup(engine='seq') сравнивается с факторизацией единой матрицы, в том числе
+#при совпадении схем прямой и обратной последовательностей (одна факторизация)
+for desc,par,same12 in (('схемы прямой и обратной последовательностей различны', {}, False),
+                        ('схемы прямой и обратной последовательностей совпадают',
+                         {'T' : (115/10.5,0), 'PS1' : (0,'PS1',(500,500,30j),(0,0,0)),
+                          'PS2' : (0,'PS2',(500,500,30j),(0,0,0))}, True)):
+    mdl = Sxema(par, kz=[('PS2','A0'),('PS1 НН','BC')])[0]
+    X0 = mdl.Calc()
+    mdl.Setup(engine='seq')
+    Check('Раздельная факторизация, ' + desc, mdl.Calc(), X0)
+    assert mdl.net.LU.same12 == same12, 'Факторизация схемы обратной последовательности'
+
+#Факторизация матрицы узловых проводимостей mdl.Setup(engine='ybus') сравнивается
+#с факторизацией единой матрицы СЛАУ, в том числе с обрывом ветви
+mdl,uq,up,_ = Sxema({'Y' : (1e-3,1e-3,1e-3)}, kz=[('PS2','A0'),('PS1 НН','BC')])
+mrtkz.N(mdl,'Обрыв Sys1-PS2',up['Sys1-PS2'],'BC')
+X0 = mdl.Calc()
+mdl.Setup(engine='ybus')
+Check('Факторизация матрицы узловых проводимостей', mdl.Calc(), X0)
+assert isinstance(mdl.net.LU, mrtkz.YbusLU), 'Способ факторизации'
+
+#Расчет всеми решателями реестра msolver mdl.Setup(solver=..., permc_spec=...)
+#сравнивается с расчетом решателем по умолчанию, mdl.BenchSolvers() не изменяет
+#результаты расчета и настройки модели
+mdl = Sxema(kz=[('PS2','A0'),('PS1 НН','BC')])[0]
+X0 = mdl.Calc()
+for solver in mrtkz.msolver:
+    for permc_spec in ('COLAMD','MMD_ATA','MMD_AT_PLUS_A','NATURAL'):
+        mdl.Setup(solver=solver, permc_spec=permc_spec)
+        Check('Решатель {} ({})'.format(solver, permc_spec), mdl.Calc(), X0)
+mdl.Setup(solver='auto', permc_spec='COLAMD')
+X = mdl.Calc()
+bench = mdl.BenchSolvers()
+assert (mdl.X is X and mdl.solver == 'auto' and mdl.permc_spec == 'COLAMD'
+        and [b[0] for b in bench] == sorted(b[0] for b in bench)), 'Сравнение быстродействия решателей'
+
+#При повторной факторизации схемы (mdl.Setup() сбрасывает сохраненную факторизацию)
+#после изменения параметров ветви используется сохраненная структура матрицы
+#mdl.pattern, после изменения топологии - структура формируется заново
+mdl,uq,up,_ = Sxema()
+mdl.Calc()
+pat = mdl.pattern
+par = {}
+for desc,edit,dpar,same in (('Изменение Z ветви',
+                             lambda: up['Sys1-PS1'].edit('Sys1-PS1',uq['Sys1'],uq['PS1'],(2+15j,2+15j,6+45j)),
+                             {'Sys1-PS1' : ('Sys1','PS1',(2+15j,2+15j,6+45j),(0,0,0))}, True),
+                            ('Перенос ветви в другой узел',
+                             lambda: up['Sys1-PS2'].edit('Sys1-PS2',uq['Sys1'],uq['PS1'],(10j,10j,30j)),
+                             {'Sys1-PS2' : ('Sys1','PS1',(10j,10j,30j),(0,0,0))}, False)):
+    edit()
+    par.update(dpar)
+    mdl.Setup()
+    X = mdl.Calc()
+    assert (mdl.pattern is pat) == same, 'Структура матрицы'
+    Check(desc + (' (сохраненная структура)' if same else ' (новая структура)'), X, Sxema(par)[0].Calc())
+
+#Изменение параметров элементов после факторизации схемы учитывается в mdl.Calc()
+#низкоранговой поправкой (Net.update()), при количестве измененных элементов
+#больше nupdate - повторной факторизацией
+mdl,uq,up,_ = Sxema()
+mdl.Setup(nupdate=4)
+mdl.Calc()
+par = {}
+edits = [('Редактирование Z ветви',
+          lambda: up['Sys1-PS1'].edit('Sys1-PS1',uq['Sys1'],uq['PS1'],(2+15j,2+15j,6+45j)),
+          {'Sys1-PS1' : ('Sys1','PS1',(2+15j,2+15j,6+45j),(0,0,0))}),
+         ('Перенос ветви в другой узел',
+          lambda: up['Sys1-PS2'].edit('Sys1-PS2',uq['Sys1'],uq['PS1'],(10j,10j,30j)),
+          {'Sys1-PS2' : ('Sys1','PS1',(10j,10j,30j),(0,0,0))}),
+         ('Редактирование взаимоиндукции',
+          lambda: mdl.bm[1].edit('L3-L4',18j,18j),
+          {'L3-L4' : 18j}),
+         ('Редактирование B ветви',
+          lambda: up['Sys2-PS1'].edit('Sys2-PS1',uq['Sys2'],uq['PS1'],(1+12j,1+12j,3+36j),B=(2e-4j,2e-4j,1e-4j)),
+          {'B' : (2e-4j,2e-4j,1e-4j)}),
+         ('Редактирование E ветви',
+          lambda: up['Sys2'].edit('Sys2',0,uq['Sys2'],(2j,2j,3j),E=(60000,0,0)),
+          {'Sys2' : (0,'Sys2',(2j,2j,3j),(60000,0,0))}),
+         ('Редактирование T ветви',
+          lambda: up['T1'].edit('T1',uq['PS1'],uq['PS1 НН'],(0.5+40j,0.5+40j,0.5+40j),T=(115/11,1)),
+          {'T' : (115/11,1)})]
+for desc,edit,dpar in edits:
+    net = mdl.net
+    edit()
+    par.update(dpar)
+    X = mdl.Calc()
+    Check(desc + (' (поправка)' if mdl.net is net else ' (факторизация)'), X, Sxema(par)[0].Calc())
+
+#Прямое присваивание параметров элементов (q.Y = ..., p.B = ... и т.п.) также учитывается
+#в mdl.Calc() поправкой к сохраненной факторизации или повторной факторизацией
+mdl,uq,up,_ = Sxema()
+mdl.Setup(nupdate=4)
+mdl.Calc()
+par = {}
+edits = [('Присваивание Y узла',
+          lambda: setattr(uq['PS1 НН'],'Y',(1e-3,1e-3,1e-3)),
+          {'Y' : (1e-3,1e-3,1e-3)}),
+         ('Присваивание J узла',
+          lambda: setattr(uq['PS1 НН'],'J',(10,0,0)),
+          {'J' : (10,0,0)}),
+         ('Присваивание взаимоиндукции',
+          lambda: (setattr(mdl.bm[1],'M12',18j), setattr(mdl.bm[1],'M21',18j)),
+          {'L3-L4' : 18j}),
+         ('Присваивание B ветви',
+          lambda: setattr(up['Sys2-PS1'],'B',(2e-4j,2e-4j,1e-4j)),
+          {'B' : (2e-4j,2e-4j,1e-4j)}),
+         ('Присваивание E ветви',
+          lambda: setattr(up['Sys2'],'E',(60000,0,0)),
+          {'Sys2' : (0,'Sys2',(2j,2j,3j),(60000,0,0))}),
+         ('Присваивание T ветви',
+          lambda: setattr(up['T1'],'T',(115/11,1)),
+          {'T' : (115/11,1)}),
+         ('Присваивание Z ветви',
+          lambda: setattr(up['Sys1-PS1'],'Z',(2+15j,2+15j,6+45j)),
+          {'Sys1-PS1' : ('Sys1','PS1',(2+15j,2+15j,6+45j),(0,0,0))})]
+for desc,edit,dpar in edits:
+    net = mdl.net
+    edit()
+    par.update(dpar)
+    X = mdl.Calc()
+    Check(desc + (' (поправка)' if mdl.net is net else ' (факторизация)'), X, Sxema(par)[0].Calc())
+
+#Факторизация в одинарной точности с итерационным уточнением решения
+#mdl.Setup(precision='single') сравнивается с факторизацией в двойной точности
+for engine in ('full','seq','ybus'):
+    mdl = Sxema(kz=[('PS2','A0'),('PS1 НН','BC')])[0]
+    mdl.Setup(engine=engine)
+    X0 = mdl.Calc()
+    mdl.Setup(precision='single')
+    Check('Одинарная точность, способ факторизации {}'.format(engine), mdl.Calc(), X0)
+
+#Эквивалентирование сети относительно граничных узлов mdl.Equivalent(), токи КЗ
+#и напряжения узлов сохраняемой части сети сравниваются с расчетом исходной модели
+mdl,uq,up,un = Sxema(kz=[('PS1 НН','BC'),('PS2','A0r',3.0)])
+mdl.Calc()
+mdl_eq,mapel = mdl.Equivalent([uq['PS1'],uq['PS2']], [up['PS1'],up['PS2'],up['T1']])
+mdl_eq.Calc()
+for qn in ('PS1','PS2','PS1 НН'):
+    Check('Эквивалент, напряжения узла ' + qn, mapel[uq[qn]].U120, uq[qn].U120)
+for qn,kn in un.items():
+    Check('Эквивалент, ток КЗ в узле ' + qn, mapel[kn].I120, kn.I120)
+#Взаимоиндукция, заданная кортежем (M1, M2, M0) с M1 = M2 = 0, равнозначна заданной числом M0
+Check('Взаимоиндукция (0, 0, M0)', Sxema({'L3-L4' : (0,0,15j)})[0].Calc(), Sxema()[0].Calc())
+#Параметры ветвей и взаимоиндукций эквивалента - числа Python, а не скаляры numpy
+par = [v for kp in mdl_eq.bp for v in kp.Z+kp.E]
+par += [v for km in mdl_eq.bm for M in (km.M12,km.M21) for v in (M if isinstance(M, tuple) else (M,))]
+print('Эквивалент, типы параметров ветвей и взаимоиндукций - {}'.format(sorted(set(type(v).__name__ for v in par))))
+assert not any(isinstance(v, np.generic) for v in par), 'Эквивалент, типы параметров'
+
+#Объединение узлов, связанных ветвями с нулевым сопротивлением (две параллельные
+#СВ между секциями PS1 и PS1 С2), сравнивается с расчетом модели, в которой СВ
+#заданы малым сопротивлением, токи СВ сравниваются суммарно
+def SxemaSV(Z):
+    '''Модель с ветвью Sys2-PS1, подключенной к секции PS1 С2, и двумя СВ с сопротивлением Z'''
+    mdl,uq,up,un = Sxema({'Sys2-PS1' : ('Sys2','PS1 С2')+par0['Sys2-PS1'][2:]},
+                         kz=[('PS1 С2','A0'),('PS2','BC')])
+    for name in ('СВ 1','СВ 2'):
+        up[name] = mrtkz.P(mdl,name,uq['PS1'],uq['PS1 С2'],Z)
+    return mdl,uq,up,un
+mdl,uq,up,_ = SxemaSV((0,0,0))
+X = mdl.Calc()
+assert isinstance(mdl.net.LU, mrtkz.TopoLU), 'Топологическая обработка схемы'
+mdl0,_,up0,_ = SxemaSV((1e-12j,1e-12j,1e-12j))
+X0 = mdl0.Calc()
+nP = 3*(mdl.np-2)
+Check('СВ с нулевым сопротивлением, напряжения узлов и токи КЗ', X[3*mdl.np:], X0[3*mdl.np:])
+Check('СВ с нулевым сопротивлением, токи остальных ветвей', X[:nP], X0[:nP])
+Check('СВ с нулевым сопротивлением, суммарный ток СВ', up['СВ 1'].I120 + up['СВ 2'].I120,
+      up0['СВ 1'].I120 + up0['СВ 2'].I120)
+
+#Модель из трех не связанных между собой частей (исходная схема, остров с источником
+#и КЗ, висящий остров без источников) рассчитывается по островам, результаты
+#сравниваются с расчетом отдельных моделей, висящий остров выявляется mdl.Islands()
+def Ostrov(mdl):
+    '''Добавление в модель острова с источником и КЗ, возвращает КЗ'''
+    q1 = mrtkz.Q(mdl,'Остров 1')
+    q2 = mrtkz.Q(mdl,'Остров 2')
+    mrtkz.P(mdl,'Остров Sys',0,q1,(1j,1j,2j),E=(10000,0,0))
+    mrtkz.P(mdl,'Остров 1-2',q1,q2,(5j,5j,15j))
+    return mrtkz.N(mdl,'КЗ Остров 2',q2,'BC0')
+mdl,uq,up,un = Sxema()
+kn = Ostrov(mdl)
+q1 = mrtkz.Q(mdl,'Висящий 1')
+q2 = mrtkz.Q(mdl,'Висящий 2')
+mrtkz.P(mdl,'Висящий 1-2',q1,q2,(5j,5j,15j))
+mdl.Calc()
+assert isinstance(mdl.net.LU, mrtkz.IslandLU), 'Факторизация по островам'
+isl = mdl.Islands()
+assert isl['hq'].tolist() == [q1.id-1,q2.id-1] and isl['hp'].tolist() == [mdl.np-1], 'Висящие узлы и ветви'
+mdl0,uq0,_,un0 = Sxema()
+mdl0.Calc()
+Check('Острова, напряжения узлов исходной схемы', np.array([uq[qn].U120 for qn in uq]),
+      np.array([uq0[qn].U120 for qn in uq]))
+Check('Острова, ток КЗ исходной схемы', un['PS2'].I120, un0['PS2'].I120)
+mdl0 = mrtkz.Model()
+kn0 = Ostrov(mdl0)
+mdl0.Calc()
+Check('Острова, ток КЗ острова с источником', kn.I120, kn0.I120)
+assert not np.any(q1.U120) and not np.any(q2.U120), 'Напряжения висящего острова'
+#Поиск висящих узлов без рекурсии - на радиальной линии из 5000 узлов
+mdl = mrtkz.Model()
+q = 0
+for k in range(5000):
+    q0,q = q,mrtkz.Q(mdl,'Л{}'.format(k))
+    mrtkz.P(mdl,'Л{}'.format(k),q0,q,(0.1+0.4j,0.1+0.4j,0.3+1.2j))
+mdl.Test4Singularity()
+print('Радиальная линия из 5000 узлов - висящих узлов {}'.format(mdl.Islands()['hq'].size))
+
+#Проверка структурного ранга СЛАУ mdl.Test4Rank(): исходная схема невырождена,
+#два КЗ 'ABC0' в одном узле и обрыв радиальной ветви выявляются с указанием
+#элементов (КЗ, обрыва и отделенного обрывом узла), mdl.Calc() при этом
+#вызывает исключение ValueError
+mdl = Sxema()[0]
+rk = mdl.Test4Rank()
+assert rk['rank'] == rk['n'] and not rk['eq'] and not rk['var'], 'Ранг исходной схемы'
+for desc,kz,brk in (('Два КЗ ABC0 в узле PS1', [('PS1','ABC0'),('PS1','ABC0')], None),
+                    ('Обрыв радиальной ветви T1', [('PS2','A0')], 'T1')):
+    mdl,uq,up,un = Sxema(kz=kz)
+    lel = list(mdl.bn)
+    if brk:
+        lel = [uq['PS1 НН'], mrtkz.N(mdl,'Обрыв '+brk,up[brk],'ABC')]
+    rk = mdl.Test4Rank()
+    print('{} - ранг {} при размерности {}'.format(desc, rk['rank'], rk['n']))
+    assert rk['rank'] < rk['n'] and all(any(el is kel for kel in rk['eq']+rk['var']) for el in lel), desc
+    try:
+        mdl.Calc()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError(desc)
+#Контуры из ветвей с нулевым сопротивлением при mdl.Setup(topo=False): параллельные ветви
+#между узлами PS1 и PS2 выявляются, контур из трех ветвей и параллельные ветви к узлу
+#без других ветвей структурно невырождены и не выявляются
+for desc,lbr,detect in (('Параллельные ветви с Z = 0 между PS1 и PS2', [('PS1','PS2'),('PS1','PS2')], True),
+                        ('Контур из трех ветвей с Z = 0', [('PS1','a'),('a','b'),('b','PS1')], False),
+                        ('Параллельные ветви с Z = 0 к узлу без других ветвей', [('PS1','a'),('PS1','a')], False)):
+    mdl,uq,up,un = Sxema()
+    mdl.Setup(topo=False)
+    for k,(q1,q2) in enumerate(lbr):
+        for qn in (q1,q2):
+            if not qn in uq:
+                uq[qn] = mrtkz.Q(mdl,qn)
+        mrtkz.P(mdl,'Z0 {}'.format(k),uq[q1],uq[q2],(0,0,0))
+    rk = mdl.Test4Rank()
+    print('{} - ранг {} при размерности {}'.format(desc, rk['rank'], rk['n']))
+    assert (rk['rank'] < rk['n']) == detect, desc
+
+#Таблицы результатов mdl.TableQ(), mdl.TableP(), mdl.TableN() сравниваются
+#с результатами, получаемыми через атрибуты узлов, ветвей и несимметрий
+mdl,uq,up,un = Sxema(kz=[('PS2','A0'),('PS1 НН','BC')])
+mrtkz.N(mdl,'Обрыв Sys1-PS2',up['Sys1-PS2'],'BC')
+mdl.Calc()
+for desc,tab,lel in (('узлов', mdl.TableQ(), mdl.bq), ('ветвей', mdl.TableP(), mdl.bp),
+                     ('несимметрий', mdl.TableN(), mdl.bn)):
+    assert tab['id'].tolist() == [el.id for el in lel] and tab['name'].tolist() == [el.name for el in lel], desc
+    names = [name for name in tab.dtype.names if not name in ('id','name','kind')]
+    #Сопротивления Z не сравниваются - в режиме без тока они не определены (0/0),
+    #мощность SC несимметрии недоступна атрибутом n.SC (вид несимметрии)
+    names = [name for name in names if not 'Z' in name and not (lel is mdl.bn and name == 'SC')]
+    Check('Таблица {} ({} величин)'.format(desc, len(names)),
+          np.concatenate([np.ravel(tab[name]) for name in names]),
+          np.concatenate([np.ravel([getattr(el, name) for el in lel]) for name in names]))
+tab = mdl.TableQ(['UA','UB'], 'M', listq=[uq['PS1']])
+Check('Таблица узлов в форме M', np.array([tab['UA'][0], tab['UB'][0]]), np.abs([uq['PS1'].UA, uq['PS1'].UB]))
+E = np.array([kp.E for kp in mdl.bp], dtype=complex)[:,:,None] * np.array([1.0, 0.9])
+mdl.CalcScenarios(E=E)
+Check('Таблица ветвей двух вариантов Э.Д.С.', mdl.TableP(['q1IABC'])['q1IABC'],
+      np.array([kp.q1IABC for kp in mdl.bp]))
+
+#Результаты, получаемые через атрибуты элементов (кэшируются при первом обращении
+#после расчета), обновляются после каждого расчета, в том числе после редактирования
+#ветви и смены вида КЗ, и совпадают с расчетом заново созданной модели
+mdl,uq,up,un = Sxema()
+mdl.Calc()
+lget = [lambda uq,up,un: uq['PS1'].UABC, lambda uq,up,un: up['Sys2-PS1'].q1IABC,
+        lambda uq,up,un: up['T1'].q2UAB_BC_CA, lambda uq,up,un: un['PS2'].IABC]
+val = np.concatenate([get(uq,up,un) for get in lget])
+for desc,edit,par,kz in (('Редактирование ветви', lambda: up['Sys1-PS1'].edit('Sys1-PS1',uq['Sys1'],uq['PS1'],(5j,5j,15j)),
+                          {'Sys1-PS1' : ('Sys1','PS1',(5j,5j,15j),(0,0,0))}, [('PS2','A0')]),
+                         ('Смена вида КЗ', lambda: un['PS2'].edit('KZ PS2','BC0'),
+                          {'Sys1-PS1' : ('Sys1','PS1',(5j,5j,15j),(0,0,0))}, [('PS2','BC0')])):
+    edit()
+    mdl.Calc()
+    val0 = val
+    val = np.concatenate([get(uq,up,un) for get in lget])
+    mdl0,uq0,up0,un0 = Sxema(par, kz=kz)
+    mdl0.Calc()
+    Check(desc + ', результаты по атрибутам', val, np.concatenate([get(uq0,up0,un0) for get in lget]))
+    assert np.abs(val - val0).max() > 1, desc
+assert not hasattr(uq['PS1'], 'UD') and not hasattr(up['T1'], 'q3IA'), 'Неизвестные атрибуты'
+
+#Сводные таблицы mdl.Report() по узлам и ветвям (со стороны 1-ого узла) сравниваются
+#с таблицами, сформированными поэлементно функциями StrU(), StrI(), в том числе
+#при формировании таблиц группами по 2 элемента
+import io
+mdl,uq,up,un = Sxema({'Y' : (1e-3,1e-3,1e-3)})
+mdl.Calc()
+text0 = []
+for kq in mdl.bq:
+    text0 += ['Узел № {} - {}\n'.format(kq.id, kq.name), mrtkz.StrU(kq.U120), '\n']
+    if np.any(kq.I120):
+        text0 += ['Значения токов проводимости узла\n', mrtkz.StrI(kq.I120), '\n']
+for kp in mdl.bp:
+    q1id,q1name = (kp.q1.id,kp.q1.name) if kp.q1 else (0,'Земля')
+    text0 += ['Ветвь № {} - {}\n'.format(kp.id, kp.name),
+              'Значения токов по ветви со стороны узла №{} - {}\n'.format(q1id, q1name),
+              mrtkz.StrI(kp.q1I120), '\n',
+              'Значения напряжения в узле №{} - {}\n'.format(q1id, q1name), mrtkz.StrU(kp.q1U120), '\n']
+for chunk in (10000, 2):
+    f = io.StringIO()
+    mdl.Report(f, listn=[], side=1, chunk=chunk)
+    print('Сводные таблицы по узлам и ветвям (группы по {}) - {}'.format(chunk,
+          'совпадают' if f.getvalue() == ''.join(text0) else 'не совпадают'))
+    assert f.getvalue() == ''.join(text0), 'Сводные таблицы'
+
+#Экспорт результатов mdl.Export(), mdl.ExportSweep() в форматах npz и csv, в том числе
+#по частям из 2 строк, сравнивается с результатами mdl.X и атрибутов элементов
+import os, csv, tempfile
+def ReadExport(fname, key):
+    '''Чтение таблицы key экспорта результатов из файла npz или csv (для csv - из файла
+    с суффиксом _key), комплексные величины csv собираются из столбцов _re, _im'''
+    if fname.endswith('.npz'):
+        with np.load(fname) as data:
+            return {name[len(key)+1:] : data[name] for name in data.files if name.startswith(key+'/')}
+    root,ext = os.path.splitext(fname)
+    with open('{}_{}{}'.format(root, key, ext), newline='', encoding='utf-8') as f:
+        tab = {col[0] : np.array(col[1:]) for col in zip(*csv.reader(f))}
+    for name in [name[:-3] for name in tab if name.endswith('_re')]:
+        tab[name] = tab.pop(name+'_re').astype(float) + 1j*tab.pop(name+'_im').astype(float)
+    return tab
+
+def CheckExport(desc, mdl, fname, chunk):
+    '''Экспорт результатов расчета модели mdl в файл fname и сравнение с mdl.X'''
+    mdl.Export(fname, chunk=chunk)
+    X = mdl.X.reshape(-1,3,1 if mdl.X.ndim == 1 else mdl.X.shape[1])
+    nv = X.shape[2]
+    for key,lel,par,X0 in (('q', mdl.bq, 'U', X[mdl.np:mdl.np+mdl.nq]), ('p', mdl.bp, 'I', X[:mdl.np]),
+                           ('n', mdl.bn, 'I', np.array([kn.I120 for kn in mdl.bn]).reshape(-1,3,nv))):
+        tab = ReadExport(fname, key)
+        assert (tab['id'].astype(int).tolist() == [el.id for el in lel]*nv and
+                tab['name'].tolist() == [el.name for el in lel]*nv), desc
+        Check('{}, таблица {}'.format(desc, key), np.array([tab[par+s] for s in '120']),
+              X0.transpose(1,2,0).reshape(3,-1))
+
+mdl,uq,up,un = Sxema(kz=[('PS2','A0'),('PS1 НН','BCr',2.0)])
+mrtkz.N(mdl,'Обрыв Sys1-PS2',up['Sys1-PS2'],'BC')
+mdl.Calc()
+listsc = ['A0',('BCr',2.0)]
+I120,U120 = mdl.SweepN([uq['PS1'],uq['PS2']], listsc)
+with tempfile.TemporaryDirectory() as path:
+    for fmt in ('npz','csv'):
+        for chunk in (100000, 2):
+            fname = os.path.join(path, 'res.' + fmt)
+            CheckExport('Экспорт {} (по {} строк)'.format(fmt, chunk), mdl, fname, chunk)
+            mdl.ExportSweep(fname, [uq['PS1'],uq['PS2']], listsc, I120, U120, chunk=chunk)
+            tab = ReadExport(fname, 's')
+            assert tab['SC'].tolist() == ['A0','BCr']*2 and tab['r'].astype(float).tolist() == [0,2]*2, fmt
+            Check('Экспорт КЗ в узлах {} (по {} строк)'.format(fmt, chunk),
+                  np.array([tab[par+s] for par in 'IU' for s in '120']),
+                  np.concatenate((I120, U120), axis=2).reshape(-1,6).T)
+
+#Хранилище результатов расчета КЗ mdl.SweepNStore() - напряжения всех узлов и токи
+#выбранных ветвей каждого расчетного случая сравниваются с расчетом модели
+#с соответствующим КЗ, при хранении в complex64 - с погрешностью одинарной точности
+mdl,uq,up,_ = Sxema(kz=())
+listq = [uq['PS1'],uq['PS1 НН']]
+listsc = ['A0','BC0',('CAr',5.0)]
+keepp = [up['Sys2-PS1'],up['T1']]
+with tempfile.TemporaryDirectory() as path:
+    store = mdl.SweepNStore(os.path.join(path, 'sweep'), listq, listsc, keepp=keepp)
+    store32 = mdl.SweepNStore(os.path.join(path, 'sweep32'), listq, listsc, keepp=keepp, dtype='complex64')
+    I120,U120 = mdl.SweepN(listq, listsc)
+    Check('Хранилище, токи КЗ', store.I120, I120.reshape(-1,3))
+    for kq in listq:
+        for sc in listsc:
+            k = store.case(kq, sc)
+            mdl0,uq0,up0,un0 = Sxema(kz=[(kq.name,)+(sc if isinstance(sc, tuple) else (sc,))])
+            mdl0.Calc()
+            X0 = np.concatenate(([uq0[qn].U120 for qn in uq0], [up0[kp.name].I120 for kp in keepp]))
+            Check('Хранилище, КЗ {} в узле {}'.format(store.SC[k], store.name[k]),
+                  np.concatenate((store.Uq[k], store.Ip[k])), X0)
+            err = np.abs(np.concatenate((store32.Uq[k], store32.Ip[k])) - X0).max()/np.abs(X0).max()
+            assert err < 1e-6, 'Хранилище complex64'
+    del store,store32
+
+#Расчет КЗ в узлах в 2 процессах mdl.SweepN(..., nproc=2), mdl.SweepNStore(..., nproc=2)
+#сравнивается с расчетом в текущем процессе, модель, восстановленная из pickle,
+#рассчитывается так же, как исходная (при запуске процессов методом spawn расчет
+#в процессах выполняется только при запуске данного файла)
+import pickle
+mdl,uq,up,_ = Sxema({'Sys1-PS2' : ('Sys1','PS1',(10j,10j,30j),(0,0,0))}, kz=())
+listq = list(mdl.bq)
+listsc = ['A0','BC','BC0','ABC',('A0r',2.0)]
+I120,U120 = mdl.SweepN(listq, listsc)
+mdl1 = pickle.loads(pickle.dumps(mdl))
+Check('Модель, восстановленная из pickle', mdl1.Calc(), mdl.Calc())
+if __name__ == '__main__':
+    Ip,Up = mdl.SweepN(listq, listsc, nproc=2)
+    Check('Расчет КЗ в узлах в 2 процессах', np.concatenate((Ip, Up)), np.concatenate((I120, U120)))
+    with tempfile.TemporaryDirectory() as path:
+        store = mdl.SweepNStore(os.path.join(path, 'sweep'), listq, listsc)
+        storep = mdl.SweepNStore(os.path.join(path, 'sweepp'), listq, listsc, nproc=2)
+        Check('Хранилище, расчет КЗ в узлах в 2 процессах', np.concatenate((storep.Uq, storep.Ip), axis=1),
+              np.concatenate((store.Uq, store.Ip), axis=1))
+        del store,storep
+
+#Отключения ветвей (схемы N-1 и N-2) mdl.CalcContingency() учитываются поправкой
+#к сохраненной факторизации (Net.contingency()), сравниваются напряжения узлов
+#и токи КЗ с расчетом модели без отключенных ветвей
+mdl,uq,up,_ = Sxema()
+cases,tab = mdl.CalcContingency([up['Sys1-PS1'],up['Sys2-PS1'],up['Sys2-PS2']], depth=2)
+for k,case in enumerate(cases):
+    mdl0 = Sxema(off=[kp.name for kp in case])[0]
+    X0 = mdl0.Calc()
+    Check('Отключение ' + ', '.join(kp.name for kp in case) if case else 'Исходная схема',
+          mdl.X[3*mdl.np:,k], X0[3*mdl0.np:])
+
+#Каскадное развитие аварии mdl.CalcCascade() - КЗ с последующим отключением ветви
+#с одной и другой стороны, ветвь, отключенная от узла Sys2, моделируется подключением
+#к отдельному узлу (ток ветви замыкается через B/2 отключенного конца)
+mdl,uq,up,_ = Sxema()
+I120,U120 = mdl.CalcCascade([(uq['PS1'],'A0'), (up['Sys2-PS1'],1), (up['Sys2-PS1'],2)])
+stages = [('КЗ в узле PS1', {}, ()),
+          ('Отключение Sys2-PS1 от узла Sys2', {'Sys2-PS1' : ('Обрыв','PS1')+par0['Sys2-PS1'][2:]}, ()),
+          ('Отключение Sys2-PS1 от узла PS1', {}, ('Sys2-PS1',))]
+for k,(desc,par,off) in enumerate(stages):
+    mdl0,_,_,un = Sxema(par, off, kz=[('PS2','A0'),('PS1','A0')])
+    mdl0.Calc()
+    Check(desc, np.concatenate((I120[k,0], U120[k,0])), np.concatenate((un['PS1'].I120, un['PS1'].U120)))
+
+#Промежуточное КЗ на ветви mdl.CalcLineFault() (линия Sys2-PS1 с поперечной проводимостью
+#и взаимоиндукцией с Sys2-PS2) сравнивается с расчетом модели, в которой ветвь явно
+#разделена узлом места КЗ на участки x*Z, x*B, x*M и (1-x)*Z, (1-x)*B, (1-x)*M
+def SxemaLF(x, SC, r=0):
+    '''Создание модели исходной схемы с ветвью Sys2-PS1, разделенной узлом F
+    (место КЗ SC с переходным сопротивлением r) в доле x от узла Sys2'''
+    mdl,uq,up,un = Sxema(off=('Sys2-PS1',))
+    Z = np.array(par0['Sys2-PS1'][2])
+    B = np.array(par0['B'])
+    uq['F'] = mrtkz.Q(mdl,'F')
+    up['Sys2-F'] = mrtkz.P(mdl,'Sys2-F',uq['Sys2'],uq['F'],tuple(x*Z),B=tuple(x*B))
+    up['F-PS1'] = mrtkz.P(mdl,'F-PS1',uq['F'],uq['PS1'],tuple((1-x)*Z),B=tuple((1-x)*B))
+    M = par0['L3-L4']
+    mrtkz.M(mdl,'L3-L4 1',up['Sys2-F'],up['Sys2-PS2'],x*M,x*M)
+    mrtkz.M(mdl,'L3-L4 2',up['F-PS1'],up['Sys2-PS2'],(1-x)*M,(1-x)*M)
+    un['F'] = mrtkz.N(mdl,'KZ F',uq['F'],SC,r=r)
+    mdl.Calc()
+    return mdl,uq,up,un
+
+xs = np.array([0.1,0.5,0.85])
+for SC,r in (('A0',0),('BC0',0),('ABr',5.0),('ABC',0)):
+    mdl,uq,up,_ = Sxema()
+    I120,U120,I1,I2 = mdl.CalcLineFault(up['Sys2-PS1'], xs, SC, r=r)
+    for k,x in enumerate(xs):
+        mdl0,uq0,up0,un0 = SxemaLF(x, SC, r)
+        Check('Промежуточное КЗ {} на ветви Sys2-PS1, x = {}'.format(SC, x),
+              np.concatenate((I120[k], U120[k], I1[k], I2[k], mdl.X[3*mdl.np:3*(mdl.np+mdl.nq),k])),
+              np.concatenate((un0['F'].I120, un0['F'].U120, up0['Sys2-F'].q1I120, up0['F-PS1'].q2I120,
+                              mdl0.X[3*mdl0.np:3*(mdl0.np+mdl.nq)])))
+mdl,uq,up,_ = Sxema()
+res = mdl.CalcLineFault(up['Sys2-PS1'], xs, 'A0')
+res1 = mdl.CalcLineFault(up['Sys2-PS1'], xs[1], 'A0', full=False)
+Check('Промежуточное КЗ на ветви Sys2-PS1 для числа x', np.concatenate(res1), np.concatenate([v[1] for v in res]))
+
+#Расчет КЗ с массивами переходных сопротивлений r несимметрий (mdl.Calc(), mdl.CalcFull())
+#сравнивается с расчетами моделей с соответствующими числовыми значениями r
+rs = np.array([0.0,0.5,2.0,10.0,100.0])
+rs2 = np.linspace(1.0,5.0,rs.size)
+mdl,uq,up,un = Sxema(kz=[('PS2','A0r',rs),('PS1','BCr',rs2)])
+X = mdl.Calc()
+XF = mdl.CalcFull()
+for k,r in enumerate(rs):
+    mdl0 = Sxema(kz=[('PS2','A0r',r),('PS1','BCr',rs2[k])])[0]
+    X0 = mdl0.Calc()
+    Check('Массив переходных сопротивлений, r = {}'.format(r), X[:,k], X0)
+    Check('Массив переходных сопротивлений, mdl.CalcFull(), r = {}'.format(r), XF[:,k], X0)
+
+#Сохранение и загрузка модели mdl.Save(), mdl.Load() - параметры всех элементов,
+#настройки mdl.Setup() и результаты расчета загруженной модели должны совпадать точно,
+#взаимоиндукции, заданные числом и кортежем, и массивы r сохраняются как были заданы
+def Elements(mdl):
+    '''Параметры элементов модели mdl для сравнения (ссылки на элементы - их номерами)'''
+    ref = lambda el: (type(el).__name__, el.id) if el else 0
+    return ([(kq.name, kq.desc, kq.Y, kq.J) for kq in mdl.bq] +
+            [(kp.name, kp.desc, ref(kp.q1), ref(kp.q2), kp.Z, kp.E, kp.T, kp.B) for kp in mdl.bp] +
+            [(km.name, km.desc, ref(km.p1), ref(km.p2), km.M12, km.M21, np.ndim(km.M12), np.ndim(km.M21))
+             for km in mdl.bm] +
+            [(kn.name, kn.desc, ref(kn.qp), kn.SC, np.ndim(kn.r), np.asarray(kn.r).tolist()) for kn in mdl.bn])
+
+for desc,par,kz in (('Сохранение и загрузка модели', {'L3-L4' : (2j,2j,15j), 'Y' : (1e-3,1e-3,2e-3)},
+                     [('PS2','A0'),('PS1 НН','BCr',2.5)]),
+                    ('Сохранение и загрузка модели с массивом r', {}, [('PS2','A0r',rs),('PS1','BCr',rs2)])):
+    mdl,uq,up,un = Sxema(par, kz=kz)
+    mrtkz.N(mdl,'Обрыв Sys1-PS2',up['Sys1-PS2'],'N0',desc='Обрыв по нулевой последовательности')
+    mdl.desc = 'Схема для проверки mdl.Save()'
+    mdl.Setup(engine='seq', nupdate=3)
+    X0 = mdl.Calc()
+    with tempfile.TemporaryDirectory() as path:
+        fname = os.path.join(path, 'net.npz')
+        mdl.Save(fname)
+        mdl1 = mrtkz.Model().Load(fname)
+    same = (Elements(mdl1) == Elements(mdl) and mdl1.desc == mdl.desc and
+            (mdl1.engine,mdl1.nupdate) == ('seq',3) and np.array_equal(mdl1.Calc(), X0))
+    print('{} - {}'.format(desc, 'совпадает' if same else 'не совпадает'))
+    assert same, desc
+
+#Экспорт результатов расчета нескольких вариантов (mdl.CalcScenarios(), mdl.CalcLineFault(),
+#массив r несимметрии) - строки таблиц повторяются для каждого варианта (столбец case),
+#переходное сопротивление r - одинаковое для всех вариантов или значение варианта
+rs3 = np.array([0.5,2.0,10.0])
+for desc,kz,calc in (('mdl.CalcScenarios()', [('PS2','A0'),('PS1 НН','BCr',2.0)],
+                      lambda mdl,up: mdl.CalcScenarios(E=mdl.getarrp(mdl.bp)['E'][:,:,None]*[1,0.9])),
+                     ('mdl.CalcLineFault()', [('PS2','A0'),('PS1 НН','BCr',2.0)],
+                      lambda mdl,up: mdl.CalcLineFault(up['Sys2-PS1'], [0.2,0.5,0.8], 'A0')),
+                     ('массив r', [('PS2','A0r',rs3),('PS1 НН','BCr',2.0)], lambda mdl,up: mdl.Calc())):
+    mdl,uq,up,un = Sxema(kz=kz)
+    calc(mdl, up)
+    nv = mdl.X.shape[1]
+    r = np.broadcast_to(mdl.getr(mdl.bn), (mdl.nn, nv)).T.ravel()
+    with tempfile.TemporaryDirectory() as path:
+        for fmt in ('npz','csv'):
+            for chunk in (100000, 2):
+                fname = os.path.join(path, 'res.' + fmt)
+                CheckExport('Экспорт {}, {} (по {} строк)'.format(desc, fmt, chunk), mdl, fname, chunk)
+                for key,n in (('q', mdl.nq), ('p', mdl.np), ('n', mdl.nn)):
+                    tab = ReadExport(fname, key)
+                    assert tab['case'].astype(int).tolist() == np.repeat(np.arange(1,nv+1), n).tolist(), desc
+                assert np.array_equal(tab['r'].astype(float), r), desc
+
+#Имена файлов экспорта: для csv fname - основа имен файлов таблиц (res_q.csv, res_p.csv,
+#res_n.csv, для mdl.ExportSweep() - res_s.csv), файл res.csv не создается, формат npz
+#задается аргументом fmt при любом расширении; без модулей h5py и pyarrow экспорт
+#в hdf5 и parquet вызывает исключение ValueError
+mdl,uq,up,un = Sxema()
+mdl.Calc()
+I120,U120 = mdl.SweepN([uq['PS1']], ['A0'])
+with tempfile.TemporaryDirectory() as path:
+    mdl.Export(os.path.join(path, 'res.csv'))
+    mdl.ExportSweep(os.path.join(path, 'res.csv'), [uq['PS1']], ['A0'], I120, U120)
+    mdl.Export(os.path.join(path, 'res.dat'), fmt='npz', listp=[], listn=[])
+    files = sorted(os.listdir(path))
+    print('Экспорт, файлы - {}'.format(', '.join(files)))
+    assert files == ['res.dat', 'res_n.csv', 'res_p.csv', 'res_q.csv', 'res_s.csv'], 'Экспорт, файлы'
+    assert list(ReadExport(os.path.join(path, 'res.csv'), 'q')) == ['id','name','U1','U2','U0'], 'Экспорт, столбцы'
+    with np.load(os.path.join(path, 'res.dat')) as data:
+        assert sorted(data.files) == ['q/U0','q/U1','q/U2','q/id','q/name'], 'Экспорт npz'
+    for fmt,module in (('hdf5', mrtkz.h5py), ('parquet', mrtkz.pyarrow)):
+        if module is None:
+            try:
+                mdl.Export(os.path.join(path, 'res.' + fmt))
+            except ValueError:
+                pass
+            else:
+                raise AssertionError('Экспорт ' + fmt)
+
+#Плохо обусловленная матрица (число обусловленности 1e9): итерационное уточнение решения
+#по факторизации в одинарной точности RefineLU не сходится, выполняется факторизация
+#в двойной точности с предупреждением RuntimeWarning, решение совпадает с решением
+#по факторизации в двойной точности
+import warnings
+rnd = np.random.default_rng(0)
+U = np.linalg.qr(rnd.random((30,30)) + 1j*rnd.random((30,30)))[0]
+V = np.linalg.qr(rnd.random((30,30)) + 1j*rnd.random((30,30)))[0]
+A = mrtkz.csc_matrix((U*np.logspace(0,-9,30)) @ V.conj().T)
+b = rnd.random(30) + 0j
+with warnings.catch_warnings(record=True) as w:
+    warnings.simplefilter('always')
+    LU = mrtkz.RefineLU(A, mrtkz.splu)
+    x = LU.solve(b)
+assert not LU.single and [kw.category for kw in w] == [RuntimeWarning], 'Плохо обусловленная матрица'
+Check('Плохо обусловленная матрица, одинарная точность', x, mrtkz.splu(A).solve(b))
+
+#Пул потоков расчета по островам IslandLU создается один раз при факторизации
+#и используется при всех последующих решениях, количество потоков не растет
+import threading
+mdl,uq,up,un = Sxema()
+kn = Ostrov(mdl)
+X0 = mdl.Calc()
+pool = mdl.net.LU.pool
+nthread = threading.active_count()
+for k in range(20):
+    X = mdl.CalcScenarios(E=mdl.getarrp(mdl.bp)['E'][:,:,None]*[1,k])
+Check('Острова, варианты Э.Д.С. по одному пулу потоков', X, np.outer(X0, [1,k]))
+assert mdl.net.LU.pool is pool and threading.active_count() == nthread, 'Пул потоков IslandLU'
+
+#Открытие сохраненного хранилища SweepStore(path): номер расчетного случая store.case()
+#для КЗ через переходное сопротивление находится при r, отличающемся от сохраненного
+#в пределах np.isclose() (в том числе заданном целым числом), при другом r - исключение ValueError
+mdl,uq,up,_ = Sxema(kz=())
+listq = [uq['PS1'],uq['PS1 НН']]
+listsc = ['A0',('CAr',5.0),('CAr',0.1+0.2)]
+with tempfile.TemporaryDirectory() as path:
+    mdl.SweepNStore(os.path.join(path, 'sweep'), listq, listsc)
+    store = mrtkz.SweepStore(os.path.join(path, 'sweep'))
+    cases = [store.case(uq['PS1 НН'], sc) for sc in ('A0',('CAr',5),('CAr',5.0+1e-12),('CAr',0.3))]
+    print('Хранилище, номера расчетных случаев - {}'.format(cases))
+    assert cases == [3,4,4,5], 'Хранилище, номера расчетных случаев'
+    try:
+        store.case(uq['PS1 НН'], ('CAr',5.5))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('Хранилище, отсутствующий расчетный случай')
+    del store
+
+#Загруженная модель совпадает с сохраненной с учетом типов чисел параметров (целые,
+#вещественные, комплексные): Y=(0,0,0) остается кортежем целых, T=(1,0) - с целым Kt,
+#числа numpy восстанавливаются числами Python
+mdl,uq,up,un = Sxema({'L3-L4' : (2j,2j,15j), 'Y' : (1e-3,0,2e-3j),
+                      'Sys2' : par0['Sys2'][:3]+(tuple(np.array(par0['Sys2'][3]).tolist()),)},
+                     kz=[('PS2','A0'),('PS1 НН','BCr',2.5)])
+mrtkz.N(mdl,'Обрыв Sys1-PS2',up['Sys1-PS2'],'N0')
+with tempfile.TemporaryDirectory() as path:
+    fname = os.path.join(path, 'net.npz')
+    mdl.Save(fname)
+    mdl1 = mrtkz.Model().Load(fname)
+    mrtkz.Model().Save(fname)
+    mdl0 = mrtkz.Model().Load(fname)
+same = repr(Elements(mdl1)) == repr(Elements(mdl)) and not (mdl0.bq or mdl0.bp or mdl0.bm or mdl0.bn)
+print('Сохранение и загрузка модели с типами чисел параметров - {}'.format('совпадает' if same else 'не совпадает'))
+assert same and mdl1.bq[0].Y == (0,0,0) and type(mdl1.bq[0].Y[0]) is int and type(mdl1.bp[0].T[0]) is int, 'Типы чисел'
+
+#mdl.BenchSolvers() настраивает каждый решатель от исходных настроек модели: при permc_spec=None
+#решатель получает перестановку модели, а не перестановку предыдущего решателя списка
+used = []
+mrtkz.msolver['probe'] = lambda A,permc_spec: used.append(permc_spec) or mrtkz.splu(A, permc_spec=permc_spec)
+mdl = Sxema()[0]
+mdl.Setup(solver='splu', permc_spec='NATURAL')
+bench = mdl.BenchSolvers([('splu','MMD_ATA'), ('probe',None), ('probe','COLAMD')], apply=True)
+del mrtkz.msolver['probe']
+print('Сравнение быстродействия решателей, перестановки - {}'.format(sorted(set(used))))
+assert sorted(set(used)) == ['COLAMD','NATURAL'] and mdl.permc_spec == (bench[0][2] or 'NATURAL'), 'BenchSolvers'